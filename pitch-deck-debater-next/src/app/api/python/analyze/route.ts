@@ -6,11 +6,11 @@ export async function POST(request: NextRequest) {
   try {
     const body = await request.json()
 
-    const { slide_index, personas, slides, deck_type } = body
+    const { slide_index, personas, deck_id, slides, deck_type } = body
 
-    if (slide_index === undefined || !personas || !slides) {
+    if (slide_index === undefined || !personas || (!deck_id && !slides)) {
       return NextResponse.json(
-        { error: 'Missing required fields: slide_index, personas, or slides' },
+        { error: 'Missing required fields: slide_index, personas, or deck_id/slides' },
         { status: 400 }
       )
     }
@@ -24,11 +24,17 @@ export async function POST(request: NextRequest) {
       body: JSON.stringify({
         slide_index,
         personas,
+        deck_id,
         slides,
         deck_type,
       }),
     })
 
+    if (response.status === 404 && deck_id) {
+      // Unknown or expired deck_id: the client retries with the slides
+      return NextResponse.json({ error: 'Unknown or expired deck_id' }, { status: 404 })
+    }
+
     if (!response.ok) {
       const errorText = await response.text()
       console.error('Python API error:', errorText)
@@ -0,0 +1,57 @@
+import { NextRequest, NextResponse } from 'next/server'
+
+const PYTHON_API_URL = process.env.PYTHON_API_URL || 'http://localhost:8000'
+
+export async function POST(request: NextRequest) {
+  try {
+    const body = await request.json()
+
+    const { slide_index, personas, deck_id, slides, deck_type, stream_tokens } = body
+
+    if (slide_index === undefined || !personas || (!deck_id && !slides)) {
+      return NextResponse.json(
+        { error: 'Missing required fields: slide_index, personas, or deck_id/slides' },
+        { status: 400 }
+      )
+    }
+
+    // Forward to Python backend and pass the SSE stream straight through
+    const response = await fetch(`${PYTHON_API_URL}/analyze/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        slide_index,
+        personas,
+        deck_id,
+        slides,
+        deck_type,
+        stream_tokens: Boolean(stream_tokens),
+      }),
+      signal: request.signal,
+    })
+
+    if (!response.ok || !response.body) {
+      const errorText = await response.text()
+      console.error('Python API error:', errorText)
+      throw new Error(`Python API returned ${response.status}`)
+    }
+
+    return new Response(response.body, {
+      status: 200,
+      headers: {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        Connection: 'keep-alive',
+        'X-Accel-Buffering': 'no',
+      },
+    })
+  } catch (error: any) {
+    console.error('Error streaming slide analysis:', error)
+    return NextResponse.json(
+      { error: 'Failed to analyze slide', details: error.message },
+      { status: 500 }
+    )
+  }
+}
@@ -33,6 +33,7 @@ export async function POST(request: NextRequest) {
 
     // Transform response to match frontend expectations
     return NextResponse.json({
+      deck_id: data.deck_id,
       deck_name: file.name,
       deck_type: data.deck_type,
       summary: data.summary,
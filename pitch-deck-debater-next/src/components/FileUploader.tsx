@@ -16,7 +16,7 @@ export default function FileUploader() {
     setError(null)
     try {
       const res = await uploadDeck(file)
-      setSlides(res.slides, res.deck_type)
+      setSlides(res.slides, res.deck_type, res.deck_id)
       setSummary(res.summary)
     } catch (e: any) {
       setError(e?.response?.data?.detail || e.message)
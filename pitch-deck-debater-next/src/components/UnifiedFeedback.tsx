@@ -6,7 +6,7 @@ import { useDebateStore } from '@/store/useDebateStore'
 import type { AnalyzeResponse } from '@/types'
 
 export default function UnifiedFeedback() {
-  const { slides, selectedPersonas, debates, setDebateResult, deckType } = useDebateStore()
+  const { slides, selectedPersonas, debates, setDebateResult, deckType, deckId } = useDebateStore()
   const [selectedSlideIdx, setSelectedSlideIdx] = useState(0)
   const [analyzing, setAnalyzing] = useState(false)
   const [error, setError] = useState<string | null>(null)
@@ -34,12 +34,21 @@ export default function UnifiedFeedback() {
 
     try {
       setProgress(20)
-      const { data } = await axios.post<AnalyzeResponse>('/api/python/analyze', {
+      const request = {
         slide_index: selectedSlideIdx,
         personas: selectedPersonas,
-        slides: slides,
         deck_type: deckType || 'AI/ML Platform'
-      })
+      }
+      const analyze = async (body: object) =>
+        (await axios.post<AnalyzeResponse>('/api/python/analyze', { ...request, ...body })).data
+      // The uploaded deck is kept server-side; the slides are only sent once it has expired
+      let data: AnalyzeResponse
+      try {
+        data = await analyze(deckId ? { deck_id: deckId } : { slides })
+      } catch (err: any) {
+        if (!deckId || err.response?.status !== 404) throw err
+        data = await analyze({ slides })
+      }
 
       setProgress(100)
       setDebateResult(selectedSlideIdx, {
@@ -20,7 +20,7 @@ export default function UploadDeck() {
       const { data } = await axios.post<UploadResponse>('/api/python/upload', form, {
         headers: { 'Content-Type': 'multipart/form-data' },
       })
-      setUpload(data.deck_name, data.deck_type, data.summary, data.slides)
+      setUpload(data.deck_name, data.deck_type, data.summary, data.slides, data.deck_id)
     } catch (e: any) {
       setError(e?.response?.data?.detail || e?.message || 'Upload failed')
     } finally {
@@ -33,7 +33,7 @@ export default function UploadSection() {
         headers: { 'Content-Type': 'multipart/form-data' }
       })
 
-      setUpload(data.deck_name, data.deck_type, data.summary, data.slides)
+      setUpload(data.deck_name, data.deck_type, data.summary, data.slides, data.deck_id)
       setSuccess(true)
     } catch (err: any) {
       // If backend is not available, use mock data for demo
@@ -14,14 +14,16 @@ export async function uploadDeck(file: File) {
   const { data } = await axios.post('/api/python/upload', form, {
     headers: { 'Content-Type': 'multipart/form-data' },
   })
-  return data as { slides: Slide[]; summary: any; deck_type: string }
+  return data as { deck_id: string; slides: Slide[]; summary: any; deck_type: string }
 }
 
 export async function analyzeSlide(params: {
   slide_index: number
   personas: string[]
-  slides: Slide[]
-  deck_type: string
+  // Either the deck_id returned by uploadDeck or the full slides list
+  deck_id?: string
+  slides?: Slide[]
+  deck_type?: string
 }) {
   // FastAPI handler accepts two bodies; axios merges into one JSON object
   const { data } = await axios.post('/api/python/analyze', params)
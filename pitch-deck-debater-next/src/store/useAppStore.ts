@@ -14,6 +14,8 @@ type State = {
   selectedPersonas: string[]
   slides: Slide[]
   deckType: string
+  // Server-side handle for the uploaded deck; analyze requests send it instead of slides
+  deckId?: string
   currentSlide: number
   debates: Record<number, DebateResult>
 }
@@ -21,7 +23,7 @@ type State = {
 type Actions = {
   setPersonas: (p: Persona[], by: Record<string, string[]>) => void
   togglePersona: (id: string) => void
-  setSlides: (slides: Slide[], deckType: string) => void
+  setSlides: (slides: Slide[], deckType: string, deckId?: string) => void
   setCurrentSlide: (idx: number) => void
   setDebate: (idx: number, res: DebateResult) => void
   reset: () => void
@@ -33,6 +35,7 @@ export const useAppStore = create<State & Actions>((set, get) => ({
   selectedPersonas: [],
   slides: [],
   deckType: '',
+  deckId: undefined,
   currentSlide: 0,
   debates: {},
 
@@ -42,9 +45,9 @@ export const useAppStore = create<State & Actions>((set, get) => ({
       ? selectedPersonas.filter(x => x !== id)
       : [...selectedPersonas, id],
   })),
-  setSlides: (slides, deckType) => set({ slides, deckType, currentSlide: 0, debates: {} }),
+  setSlides: (slides, deckType, deckId) => set({ slides, deckType, deckId, currentSlide: 0, debates: {} }),
   setCurrentSlide: (idx) => set({ currentSlide: idx }),
   setDebate: (idx, res) => set(({ debates }) => ({ debates: { ...debates, [idx]: res } })),
-  reset: () => set({ slides: [], deckType: '', currentSlide: 0, debates: {} }),
+  reset: () => set({ slides: [], deckType: '', deckId: undefined, currentSlide: 0, debates: {} }),
 }))
 
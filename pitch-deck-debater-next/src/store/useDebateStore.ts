@@ -13,13 +13,15 @@ type State = {
   selectedPersonas: string[]
   deckName?: string
   deckType?: string
+  // Server-side handle for the uploaded deck; analyze requests send it instead of slides
+  deckId?: string
   summary?: Record<string, any>
   slides: Slide[]
   debates: Record<number, DebateResult>
   setPersonas: (p: Persona[], c: Record<string, string[]>) => void
   togglePersona: (id: string) => void
   setSelectedPersonas: (ids: string[]) => void
-  setUpload: (name: string, type: string, summary: Record<string, any>, slides: Slide[]) => void
+  setUpload: (name: string, type: string, summary: Record<string, any>, slides: Slide[], deckId?: string) => void
   setDebateResult: (slideIndex: number, r: DebateResult) => void
 }
 
@@ -29,6 +31,7 @@ export const useDebateStore = create<State>((set, get) => ({
   selectedPersonas: [],
   deckName: undefined,
   deckType: undefined,
+  deckId: undefined,
   summary: undefined,
   slides: [],
   debates: {},
@@ -42,7 +45,7 @@ export const useDebateStore = create<State>((set, get) => ({
     })
   },
   setSelectedPersonas: (ids) => set({ selectedPersonas: ids }),
-  setUpload: (name, type, summary, slides) => set({ deckName: name, deckType: type, summary, slides }),
+  setUpload: (name, type, summary, slides, deckId) => set({ deckName: name, deckType: type, summary, slides, deckId }),
   setDebateResult: (idx, r) => set(state => ({ debates: { ...state.debates, [idx]: r } })),
 }))
 
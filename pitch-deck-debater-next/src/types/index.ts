@@ -95,6 +95,7 @@ export interface PersonasPayload {
 }
 
 export interface UploadResponse {
+  deck_id?: string;
   deck_name: string;
   deck_type: string;
   summary: Record<string, any>;
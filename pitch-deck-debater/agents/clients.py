@@ -0,0 +1,101 @@
+"""
+Process-wide, pooled Anthropic clients
+
+Building an ``anthropic.Anthropic`` per request (or per engine, coordinator
+and generator) also builds a fresh httpx connection pool, so every request
+paid new TLS handshakes. These providers hand out one client per API key
+(per event loop for the async client), backed by a tuned keep-alive pool:
+
+- max connections sized to the concurrency cap (DEBATE_MAX_INFLIGHT when
+  set, otherwise LLM_MAX_CONNECTIONS);
+- keep-alive connections held for LLM_KEEPALIVE_EXPIRY seconds;
+- HTTP/2 when the optional ``h2`` package is installed.
+
+The SDK's own retries are disabled; agents.llm_gateway owns the retry policy.
+With LLM_BACKEND set to record/replay/stub the providers return the matching
+agents.llm_backends client instead (see that module).
+
+Environment:
+    LLM_MAX_CONNECTIONS    Pool size when DEBATE_MAX_INFLIGHT is unset (default: 64)
+    LLM_KEEPALIVE_EXPIRY   Seconds an idle connection is kept open (default: 30)
+"""
+import asyncio
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+
+import anthropic
+import httpx
+
+from agents.llm_backends import build_client
+
+try:
+    import h2  # noqa: F401  (httpx only needs it importable for http2=True)
+    _HAS_H2 = True
+except ImportError:
+    _HAS_H2 = False
+
+_clients: Dict[Optional[str], anthropic.Anthropic] = {}
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_loopless_async_clients: Dict[Optional[str], anthropic.AsyncAnthropic] = {}
+_lock = threading.Lock()
+
+
+def max_connections() -> int:
+    """Connection pool size, matched to the cap on model calls in flight"""
+    return max(1, int(os.getenv("DEBATE_MAX_INFLIGHT") or os.getenv("LLM_MAX_CONNECTIONS", 64)))
+
+
+def connection_limits() -> httpx.Limits:
+    size = max_connections()
+    return httpx.Limits(
+        max_connections=size,
+        max_keepalive_connections=size,
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30)),
+    )
+
+
+def _resolve_key(api_key: Optional[str]) -> Optional[str]:
+    return api_key or os.getenv("ANTHROPIC_API_KEY")
+
+
+def get_anthropic_client(api_key: Optional[str] = None) -> anthropic.Anthropic:
+    """Shared sync client for ``api_key`` (defaults to ANTHROPIC_API_KEY)"""
+    key = _resolve_key(api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = build_client(lambda: anthropic.Anthropic(
+                api_key=key,
+                max_retries=0,
+                http_client=anthropic.DefaultHttpxClient(limits=connection_limits(), http2=_HAS_H2),
+            ))
+            _clients[key] = client
+        return client
+
+
+def get_async_anthropic_client(api_key: Optional[str] = None) -> anthropic.AsyncAnthropic:
+    """
+    Shared async client for ``api_key``
+
+    httpx async connections belong to the event loop that opened them, so
+    clients are kept per running loop (one loop under uvicorn).
+    """
+    key = _resolve_key(api_key)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    with _lock:
+        pool = _loopless_async_clients if loop is None else _async_clients.setdefault(loop, {})
+        client = pool.get(key)
+        if client is None:
+            client = build_client(lambda: anthropic.AsyncAnthropic(
+                api_key=key,
+                max_retries=0,
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=connection_limits(), http2=_HAS_H2),
+            ), is_async=True)
+            pool[key] = client
+        return client
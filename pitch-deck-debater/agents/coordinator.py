@@ -1,26 +1,145 @@
 """
 Orchestration layer for the debate process
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+from .clients import get_anthropic_client
 from .debate_engine import DebateEngine
-from anthropic import Anthropic
+from .llm_gateway import get_llm_gateway
+from utils.ttl_cache import TTLCache
+import copy
+import hashlib
 import os
 import json
 
 
+# Recommendations by debate content hash, shared by every coordinator in the
+# process (ReportGenerator and DeckGenerator both extract from the same results)
+_recommendations_cache = TTLCache(maxsize=int(os.getenv("RECOMMENDATIONS_CACHE_SIZE", 32)), ttl=None)
+
+
+def recommendations_key(debate_results: Dict[str, Any]) -> str:
+    """Content hash of the parts of debate results that recommendations depend on"""
+    material = {
+        "synthesis": debate_results.get("synthesis", ""),
+        "rounds": debate_results.get("rounds", []),
+    }
+    blob = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+SEVERITIES = ("critical", "moderate", "minor")
+PRIORITIES = ("high", "medium", "low")
+
+RECOMMENDATIONS_TOOL = {
+    "name": "record_recommendations",
+    "description": "Record the structured recommendations extracted from a pitch deck debate.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "key_strengths": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Key strengths mentioned positively across the debate"
+            },
+            "critical_issues": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "issue": {"type": "string"},
+                        "severity": {"type": "string", "enum": list(SEVERITIES)}
+                    },
+                    "required": ["issue", "severity"]
+                },
+                "description": "Critical issues and weaknesses, categorized by severity"
+            },
+            "improvement_actions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "action": {"type": "string"},
+                        "priority": {"type": "string", "enum": list(PRIORITIES)},
+                        "slide": {"type": ["integer", "null"]}
+                    },
+                    "required": ["action", "priority", "slide"]
+                },
+                "description": "Actionable recommendations prioritized by impact"
+            },
+            "consensus_points": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Points where multiple expert personas agree"
+            }
+        },
+        "required": ["key_strengths", "critical_issues", "improvement_actions", "consensus_points"]
+    }
+}
+
+
+def _valid_strings(value: Any) -> Optional[List[str]]:
+    """Non-empty list of non-empty strings, else None"""
+    if not isinstance(value, list) or not value:
+        return None
+    if not all(isinstance(v, str) and v.strip() for v in value):
+        return None
+    return [v.strip() for v in value]
+
+
+def _valid_issues(value: Any) -> Optional[List[Dict[str, Any]]]:
+    """Non-empty list of {issue, severity} with a known severity, else None"""
+    if not isinstance(value, list) or not value:
+        return None
+    issues = []
+    for item in value:
+        if not isinstance(item, dict) or not isinstance(item.get("issue"), str):
+            return None
+        severity = str(item.get("severity", "")).lower()
+        if severity not in SEVERITIES:
+            return None
+        issues.append({"issue": item["issue"], "severity": severity})
+    return issues
+
+
+def _valid_actions(value: Any) -> Optional[List[Dict[str, Any]]]:
+    """Non-empty list of {action, priority, slide} with a known priority, else None"""
+    if not isinstance(value, list) or not value:
+        return None
+    actions = []
+    for item in value:
+        if not isinstance(item, dict) or not isinstance(item.get("action"), str):
+            return None
+        priority = str(item.get("priority", "")).lower()
+        if priority not in PRIORITIES:
+            return None
+        slide = item.get("slide")
+        if isinstance(slide, bool) or not (slide is None or isinstance(slide, int)):
+            return None
+        actions.append({"action": item["action"], "priority": priority, "slide": slide})
+    return actions
+
+
 class DebateCoordinator:
     """Coordinates the overall debate process"""
 
-    def __init__(self, num_rounds: int = 3):
+    def __init__(
+        self,
+        num_rounds: int = 3,
+        engine: Optional[DebateEngine] = None,
+        client: Optional[Any] = None
+    ):
         """
         Initialize coordinator
 
         Args:
             num_rounds: Number of debate rounds to run (default: 3)
+            engine: Debate engine to use (a new one on the shared client by default)
+            client: Anthropic client (the process-wide pooled client by default)
         """
         self.num_rounds = num_rounds
-        self.debate_engine = DebateEngine()
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.client = client if client is not None else get_anthropic_client()
+        self.debate_engine = engine if engine is not None else DebateEngine(client=self.client)
+        self.gateway = get_llm_gateway()
 
     def run_debate(self, deck_content: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -51,23 +170,118 @@ class DebateCoordinator:
             "status": "completed"
         }
 
-    def get_recommendations(self, debate_results: Dict[str, Any]) -> Dict[str, Any]:
+    def get_recommendations(self, debate_results: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
         """
         Extract structured recommendations from debate results
 
+        All four sections come from one structured (tool use) call; any
+        section that is missing or fails validation is re-extracted with its
+        dedicated per-section call. Results are memoized by a content hash
+        of the synthesis and rounds, so repeated requests for the same
+        debate (e.g. several report sections) cost no extra LLM calls.
+
         Args:
             debate_results: Complete debate results
+            use_cache: Serve/store results in the shared recommendations cache
 
         Returns:
             Structured recommendations
         """
+        key = recommendations_key(debate_results)
+        if use_cache:
+            cached = _recommendations_cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+        recommendations, complete = self._build_recommendations(debate_results)
+        # A section left empty by a failed call is not cached, so the next
+        # report for this debate extracts it again
+        if use_cache and complete:
+            _recommendations_cache.set(key, copy.deepcopy(recommendations))
+        return recommendations
+
+    def _build_recommendations(self, debate_results: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run the extraction behind get_recommendations
+
+        Returns:
+            (recommendations, complete); complete is False when any section
+            is empty because its extraction call failed
+        """
+        sections = self._extract_all_sections(debate_results)
+        fallbacks = {
+            "key_strengths": self._extract_strengths,
+            "critical_issues": self._extract_issues,
+            "improvement_actions": self._extract_actions,
+            "consensus_points": self._extract_consensus,
+        }
+        complete = True
+        for name, extract in fallbacks.items():
+            if name not in sections:
+                sections[name] = extract(debate_results)
+                if sections[name] is None:
+                    complete = False
+                    sections[name] = []
+
         return {
             "overall_score": self._extract_score(debate_results["synthesis"]),
-            "key_strengths": self._extract_strengths(debate_results),
-            "critical_issues": self._extract_issues(debate_results),
-            "improvement_actions": self._extract_actions(debate_results),
-            "consensus_points": self._extract_consensus(debate_results)
+            "key_strengths": sections["key_strengths"],
+            "critical_issues": sections["critical_issues"],
+            "improvement_actions": sections["improvement_actions"],
+            "consensus_points": sections["consensus_points"]
+        }, complete
+
+    def _extract_all_sections(self, debate_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract strengths, issues, actions and consensus in a single tool-use call
+
+        Returns:
+            Only the sections that passed validation (possibly none)
+        """
+        prompt = f"""Analyze the following debate about a pitch deck and record structured recommendations with the record_recommendations tool.
+
+Debate Synthesis:
+{debate_results.get('synthesis', '')}
+
+Debate Rounds:
+{self._format_rounds_for_extraction(debate_results.get('rounds', []))}
+
+Fill in every field:
+- key_strengths: 3-5 key strengths that were mentioned positively across the debate. Be specific and concise.
+- critical_issues: 5-8 critical issues and weaknesses, each with severity critical, moderate or minor.
+- improvement_actions: 5-10 specific, actionable recommendations prioritized by impact (high, medium, low). Include the slide number if the action is specific to a slide, otherwise null.
+- consensus_points: 3-5 key points where at least 2-3 different experts expressed agreement or similar concerns."""
+
+        try:
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 4096,
+                "tools": [RECOMMENDATIONS_TOOL],
+                "tool_choice": {"type": "tool", "name": RECOMMENDATIONS_TOOL["name"]},
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        except Exception:
+            return {}
+
+        payload = next(
+            (block.input for block in response.content if getattr(block, "type", None) == "tool_use"),
+            None
+        )
+        if not isinstance(payload, dict):
+            return {}
+
+        validators = {
+            "key_strengths": _valid_strings,
+            "critical_issues": _valid_issues,
+            "improvement_actions": _valid_actions,
+            "consensus_points": _valid_strings,
         }
+        sections = {}
+        for name, validate in validators.items():
+            value = validate(payload.get(name))
+            if value is not None:
+                sections[name] = value
+        return sections
 
     def _extract_score(self, synthesis: str) -> float:
         """Extract overall score from synthesis"""
@@ -76,8 +290,8 @@ class DebateCoordinator:
         match = re.search(r'(\d+(?:\.\d+)?)\s*/\s*10', synthesis)
         return float(match.group(1)) if match else 5.0
 
-    def _extract_strengths(self, debate_results: Dict[str, Any]) -> List[str]:
-        """Extract key strengths mentioned across rounds"""
+    def _extract_strengths(self, debate_results: Dict[str, Any]) -> Optional[List[str]]:
+        """Extract key strengths mentioned across rounds (None if the call failed)"""
         prompt = f"""Analyze the following debate about a pitch deck and extract the KEY STRENGTHS that were identified.
 
 Debate Synthesis:
@@ -86,11 +300,15 @@ Debate Synthesis:
 Extract 3-5 key strengths that were mentioned positively across the debate. Be specific and concise.
 Return ONLY a JSON array of strings, e.g., ["strength 1", "strength 2", "strength 3"]"""
 
-        response = self.client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        try:
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 1024,
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        except Exception:
+            # Retries are exhausted; the section is left empty rather than failing the report
+            return None
 
         try:
             return json.loads(response.content[0].text)
@@ -98,8 +316,8 @@ Return ONLY a JSON array of strings, e.g., ["strength 1", "strength 2", "strengt
             # Fallback if JSON parsing fails
             return [response.content[0].text]
 
-    def _extract_issues(self, debate_results: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Extract critical issues mentioned across rounds"""
+    def _extract_issues(self, debate_results: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Extract critical issues mentioned across rounds (None if the call failed)"""
         prompt = f"""Analyze the following debate about a pitch deck and extract CRITICAL ISSUES and WEAKNESSES.
 
 Debate Synthesis:
@@ -114,11 +332,14 @@ Extract 5-8 critical issues, categorized by severity. Return ONLY valid JSON in
 
 Severity levels: critical, moderate, minor"""
 
-        response = self.client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=1536,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        try:
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 1536,
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        except Exception:
+            return None
 
         try:
             return json.loads(response.content[0].text)
@@ -126,8 +347,8 @@ Severity levels: critical, moderate, minor"""
             # Fallback if JSON parsing fails
             return [{"issue": response.content[0].text, "severity": "moderate"}]
 
-    def _extract_actions(self, debate_results: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Extract actionable recommendations"""
+    def _extract_actions(self, debate_results: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Extract actionable recommendations (None if the call failed)"""
         prompt = f"""Analyze the following debate about a pitch deck and extract ACTIONABLE RECOMMENDATIONS.
 
 Debate Synthesis:
@@ -143,11 +364,14 @@ Extract 5-10 specific, actionable recommendations prioritized by impact. Return
 Priority levels: high, medium, low
 Include slide number if action is specific to a slide, otherwise use null"""
 
-        response = self.client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=2048,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        try:
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 2048,
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        except Exception:
+            return None
 
         try:
             return json.loads(response.content[0].text)
@@ -155,8 +379,8 @@ Include slide number if action is specific to a slide, otherwise use null"""
             # Fallback if JSON parsing fails
             return [{"action": response.content[0].text, "priority": "medium", "slide": None}]
 
-    def _extract_consensus(self, debate_results: Dict[str, Any]) -> List[str]:
-        """Extract points where multiple personas agree"""
+    def _extract_consensus(self, debate_results: Dict[str, Any]) -> Optional[List[str]]:
+        """Extract points where multiple personas agree (None if the call failed)"""
         rounds = debate_results.get('rounds', [])
 
         prompt = f"""Analyze the following multi-round debate and identify CONSENSUS POINTS where multiple expert personas AGREE.
@@ -167,11 +391,14 @@ Debate Rounds:
 Extract 3-5 key points where at least 2-3 different experts expressed agreement or similar concerns.
 Return ONLY a JSON array of strings, e.g., ["consensus point 1", "consensus point 2"]"""
 
-        response = self.client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        try:
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 1024,
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        except Exception:
+            return None
 
         try:
             return json.loads(response.content[0].text)
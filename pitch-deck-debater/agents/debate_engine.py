@@ -3,11 +3,31 @@ Core debate engine for multi-agent pitch deck analysis
 """
 import os
 import re
+import asyncio
 import json
 import time
-from typing import List, Dict, Optional
-
-import anthropic
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Tuple
+
+from agents.clients import get_anthropic_client, get_async_anthropic_client, max_connections
+from agents.llm_gateway import LLMGateway, get_llm_gateway
+from agents.response_cache import ResponseCache, get_response_cache
+from agents.prompts import (
+    critique_system_blocks,
+    mark_shared_prefix_warm,
+    prompt_layout_report,
+    shared_prefix_key,
+    shared_prefix_warm,
+)
+from agents.usage import UsageTracker, get_usage_tracker
+from utils.metrics import (
+    PHASE_LLM_SECONDS,
+    PHASE_SECONDS,
+    PHASE_TOKENS,
+    QUEUE_WAIT_SECONDS,
+    record_error,
+)
 
 
 # ---- optional lenient parser (json5) ----
@@ -58,88 +78,312 @@ def _parse_jsonish(text: str) -> Optional[Dict]:
     return None
 
 
+def _positive_int(value: Any, name: str) -> int:
+    """``value`` as an int >= 1, or a ValueError naming the setting it came from"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a positive integer, got {value!r}") from None
+    if number < 1:
+        raise ValueError(f"{name} must be a positive integer, got {value!r}")
+    return number
+
+
 class DebateEngine:
-    def __init__(self, api_key: Optional[str] = None):
-        self.client = anthropic.Anthropic(
-            api_key=api_key or os.getenv("ANTHROPIC_API_KEY")
-        )
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        bypass_cache: bool = False,
+        deck_profile: Optional[Dict] = None,
+        gateway: Optional[LLMGateway] = None,
+        client: Optional[Any] = None
+    ):
+        # Pooled client shared process-wide, so engines are cheap to build per request
+        self.client = client if client is not None else get_anthropic_client(api_key)
+        # Rate limits and retries shared by every call site in the process
+        self.gateway = gateway if gateway is not None else get_llm_gateway()
         self.cache_stats = {"hits": 0, "misses": 0}
+        # Deck-level context (utils.deck_context.build_deck_context) shared as a
+        # cacheable prefix by every slide x persona critique of the deck
+        self.deck_profile = deck_profile
+        # Per-call token accounting; also rolls up into the process-wide tracker
+        self.usage = UsageTracker(parent=get_usage_tracker())
+        # Local critique cache (shared process-wide unless one is injected);
+        # bypass_cache skips lookups but still refreshes stored entries
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        self.bypass_cache = bypass_cache
+        self.response_cache_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+        # Number of persona critiques allowed in flight at once (1 = serial)
+        if max_concurrency:
+            self.max_concurrency = _positive_int(max_concurrency, "max_concurrency")
+        else:
+            self.max_concurrency = _positive_int(os.getenv("DEBATE_MAX_CONCURRENCY", 6), "DEBATE_MAX_CONCURRENCY")
+        self._stats_lock = threading.Lock()
+        # Shared prefix key -> event set once the round priming it is done
+        self._priming: Dict[str, Any] = {}
+        self._priming_lock = threading.Lock()
 
     def create_debate_round(
         self,
         slide_data: Dict,
         personas: List[str],
         round_number: int = 1,
-        previous_debates: Optional[List] = None
+        previous_debates: Optional[List] = None,
+        max_concurrency: Optional[int] = None,
+        bypass_cache: Optional[bool] = None
     ) -> Dict:
-        """Run one round of debate on a slide with selected personas"""
+        """
+        Run one round of debate on a slide with selected personas
+
+        Persona critiques are fanned out over a thread pool bounded by
+        ``max_concurrency`` (defaults to the engine setting). The ``debates``
+        list always follows the input persona order. Critiques already in the
+        response cache are served from it unless ``bypass_cache`` is set.
+        """
+        start_time = time.time()
+        workers = self._fan_out_width(personas, max_concurrency)
+
+        def run(persona_id: str) -> Optional[Dict]:
+            return self._run_persona_critique(slide_data, persona_id, round_number, previous_debates, bypass_cache)
+
+        results = self._prime_shared_prefix(personas, run)
+        rest = personas[len(results):]
+        if workers <= 1:
+            results += [run(persona_id) for persona_id in rest]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results += list(pool.map(run, rest))
+
+        return self._round_result(slide_data, round_number, results, start_time, workers)
+
+    def _prime_shared_prefix(self, personas: List[str], run: Callable[[str], Optional[Dict]]) -> List[Optional[Dict]]:
+        """
+        Run the first persona alone while the shared prompt prefix is cold
+
+        Returns its result (or nothing when the prefix is already cached), so
+        the caller fans out the remaining personas as cache readers. Rounds
+        that find another round priming the same prefix wait for it instead.
+        """
+        key = self._shared_prefix_key()
+        if len(personas) < 2 or shared_prefix_warm(key):
+            return []
+
+        with self._priming_lock:
+            event = self._priming.get(key)
+            primer = event is None
+            if primer:
+                event = self._priming[key] = threading.Event()
+        if not primer:
+            event.wait()
+            return []
+
+        try:
+            return [run(personas[0])]
+        finally:
+            with self._priming_lock:
+                self._priming.pop(key, None)
+            event.set()
+
+    def _run_persona_critique(
+        self,
+        slide_data: Dict,
+        persona_id: str,
+        round_number: int,
+        previous_debates: Optional[List],
+        bypass_cache: Optional[bool] = None
+    ) -> Optional[Dict]:
+        """Get one persona's critique; returns None for unknown personas"""
         from agents.personas import get_persona
 
-        debates = []
+        persona = get_persona(persona_id)
+        if not persona:
+            return None
+
+        request = self._critique_request(slide_data, persona_id, persona, round_number, previous_debates)
         start_time = time.time()
+        cache_key, cached = self._lookup_critique(request, round_number, persona_id, persona, start_time, bypass_cache)
+        if cached is not None:
+            return cached
 
-        for persona_id in personas:
-            persona = get_persona(persona_id)
-            if not persona:
-                continue
+        try:
+            response = self._call_model(request, "critique", persona_id)
+            return self._store_critique(cache_key, self._critique_entry(persona_id, persona, request, response, start_time))
+        except Exception as e:
+            return self._critique_error(persona_id, persona, e, start_time)
 
-            context = self._build_context(slide_data, previous_debates, persona_id)
+    def synthesize_feedback(self, debate_round: Dict, deck_context: Optional[str] = None) -> Dict:
+        """Synthesize feedback from all agents into actionable recommendations"""
+        request, combined_feedback = self._synthesis_request(debate_round, deck_context)
 
-            try:
-                response = self.client.messages.create(
-                    model="claude-3-5-haiku-20241022",
-                    max_tokens=2500,
-                    temperature=0.7,
-                    system=[
-                        {
-                            "type": "text",
-                            "text": persona["system_prompt"],
-                            "cache_control": {"type": "ephemeral"}
-                        },
-                        {
-                            "type": "text",
-                            "text": context,
-                            "cache_control": {"type": "ephemeral"}
-                        }
-                    ],
-                    messages=[{
-                        "role": "user",
-                        "content": self._create_analysis_prompt(slide_data, round_number)
-                    }]
-                )
+        try:
+            response = self._call_model(request, "synthesis")
+            return self._synthesis_result(request, response)
+        except Exception as e:
+            record_error("debate_engine", e, phase="synthesis", model=request["model"])
+            return {
+                "error": str(e),
+                "raw_feedback": combined_feedback
+            }
 
-                usage = response.usage
-                if getattr(usage, "cache_read_input_tokens", 0) > 0:
-                    self.cache_stats["hits"] += 1
-                else:
-                    self.cache_stats["misses"] += 1
-
-                critique_text = response.content[0].text
-                critique = self._parse_critique(critique_text)
-
-                # ensure parsed flag so UI knows
-                if isinstance(critique, dict) and "parsed" not in critique:
-                    critique["parsed"] = True
-
-                debates.append({
-                    "persona_id": persona_id,
-                    "persona_name": persona["name"],
-                    "emoji": persona["emoji"],
-                    "role": persona["role"],
-                    "color": persona["color"],
-                    "critique": critique,
-                    "raw_response": critique_text,
-                    "tokens_used": getattr(usage, "input_tokens", 0) + getattr(usage, "output_tokens", 0)
-                })
+    def collaborative_debate_round(self, debate_round: Dict, deck_context: Optional[str] = None) -> Dict:
+        """
+        Run a collaborative debate where agents discuss together and produce unified feedback
 
-            except Exception as e:
-                debates.append({
-                    "persona_id": persona_id,
-                    "persona_name": persona["name"],
-                    "emoji": persona["emoji"],
-                    "error": str(e)
-                })
+        Args:
+            debate_round: Initial individual critiques from agents
+            deck_context: Context about the deck type
+
+        Returns:
+            Unified feedback with consensus and questions for the client
+        """
+        request, participating_experts = self._collaborative_request(debate_round, deck_context)
+
+        try:
+            response = self._call_model(request, "collaborative_debate")
+            return self._collaborative_result(request, response, participating_experts)
+        except Exception as e:
+            record_error("debate_engine", e, phase="collaborative_debate", model=request["model"])
+            return {
+                "error": str(e),
+                "participating_experts": participating_experts
+            }
+
+    def analyze_slide(
+        self,
+        slide_data: Dict,
+        personas: List[str],
+        deck_context: Optional[str] = None
+    ) -> Dict:
+        """
+        Run the full slide analysis: individual critiques, then the collaborative
+        debate and the synthesis. The last two only depend on the critiques, so
+        the phase runner executes them concurrently.
+        """
+        results, timings = self.run_phases(self._analysis_phases(slide_data, personas, deck_context))
+        return self._analysis_result(results, timings)
+
+    def run_phases(self, phases: Dict[str, Tuple[Callable, List[str]]]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Run a graph of phases, starting each one as soon as its dependencies finish
+
+        Args:
+            phases: name -> (fn, dependency names); ``fn`` receives a dict of
+                its dependencies' results
+
+        Returns:
+            (results by phase name, wall-clock seconds by phase name)
+        """
+        self._check_phases(phases)
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        pending = dict(phases)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=len(phases) or 1) as pool:
+            while pending or running:
+                for name in [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]:
+                    fn, deps = pending.pop(name)
+                    future = pool.submit(self._timed_phase, fn, {d: results[d] for d in deps})
+                    running[future] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name], timings[name] = future.result()
+
+        return results, timings
+
+    def _call_model(self, request: Dict, phase: str, persona_id: Optional[str] = None):
+        """Send a request through the gateway, recording time spent on the model"""
+        start = time.perf_counter()
+        try:
+            return self.gateway.create(self.client, request)
+        finally:
+            self._observe_llm(phase, request, start, persona_id)
+
+    # ---- request/response helpers shared by the sync and async engines ----
+
+    @staticmethod
+    def _observe_llm(phase: str, request: Dict, start: float, persona_id: Optional[str] = None) -> None:
+        PHASE_LLM_SECONDS.observe(
+            time.perf_counter() - start, phase=phase, persona=persona_id or "", model=request.get("model", "")
+        )
 
+    @staticmethod
+    def _observe_phases(timings: Dict[str, float]) -> None:
+        for name, seconds in timings.items():
+            PHASE_SECONDS.observe(seconds, phase=name)
+
+    def _analysis_phases(
+        self,
+        slide_data: Dict,
+        personas: List[str],
+        deck_context: Optional[str]
+    ) -> Dict[str, Tuple[Callable, List[str]]]:
+        """Phase graph for a single-slide analysis"""
+        return {
+            "debate_round": (lambda deps: self.create_debate_round(slide_data, personas, 1), []),
+            "collaborative_debate": (
+                lambda deps: self.collaborative_debate_round(deps["debate_round"], deck_context),
+                ["debate_round"]
+            ),
+            "synthesis": (
+                lambda deps: self.synthesize_feedback(deps["debate_round"], deck_context),
+                ["debate_round"]
+            ),
+        }
+
+    def _analysis_result(self, results: Dict[str, Any], timings: Dict[str, float]) -> Dict:
+        """Shape phase results like the /analyze response"""
+        self._observe_phases(timings)
+        return {
+            "debate_round": results["debate_round"],
+            "collaborative_debate": results["collaborative_debate"],
+            "synthesis": results["synthesis"],
+            "phase_timings": timings,
+        }
+
+    @staticmethod
+    def _check_phases(phases: Dict[str, Tuple[Callable, List[str]]]) -> None:
+        """Reject unknown dependencies and cycles before anything runs"""
+        for name, (_, deps) in phases.items():
+            unknown = [d for d in deps if d not in phases]
+            if unknown:
+                raise ValueError(f"Phase '{name}' depends on unknown phase(s): {', '.join(unknown)}")
+
+        resolved = set()
+        remaining = dict(phases)
+        while remaining:
+            ready = [n for n, (_, deps) in remaining.items() if all(d in resolved for d in deps)]
+            if not ready:
+                raise ValueError(f"Phase dependencies contain a cycle: {', '.join(sorted(remaining))}")
+            for name in ready:
+                resolved.add(name)
+                remaining.pop(name)
+
+    @staticmethod
+    def _timed_phase(fn: Callable, deps: Dict[str, Any]) -> Tuple[Any, float]:
+        start_time = time.time()
+        result = fn(deps)
+        return result, time.time() - start_time
+
+    def _fan_out_width(self, personas: List[str], max_concurrency: Optional[int]) -> int:
+        """Number of persona critiques to run at once for this round"""
+        limit = max(1, int(max_concurrency or self.max_concurrency))
+        return min(limit, len(personas)) if personas else 1
+
+    def _round_result(
+        self,
+        slide_data: Dict,
+        round_number: int,
+        results: List[Optional[Dict]],
+        start_time: float,
+        workers: int
+    ) -> Dict:
+        """Assemble a debate round from per-persona results (in persona order)"""
+        debates = [d for d in results if d is not None]
         elapsed_time = time.time() - start_time
 
         return {
@@ -148,11 +392,148 @@ class DebateEngine:
             "slide_title": slide_data['title'],
             "debates": debates,
             "elapsed_time": elapsed_time,
-            "cache_stats": self.cache_stats.copy()
+            # A list in persona order, so repeated personas each keep their latency
+            "persona_latencies": [{"persona_id": d["persona_id"], "latency": d["latency"]} for d in debates],
+            "max_concurrency": workers,
+            "cache_stats": self.cache_stats.copy(),
+            "response_cache_stats": self.response_cache_stats.copy()
         }
 
-    def synthesize_feedback(self, debate_round: Dict, deck_context: Optional[str] = None) -> Dict:
-        """Synthesize feedback from all agents into actionable recommendations"""
+    def _critique_request(
+        self,
+        slide_data: Dict,
+        persona_id: str,
+        persona: Dict,
+        round_number: int,
+        previous_debates: Optional[List]
+    ) -> Dict:
+        """
+        Build the messages.create kwargs for one persona critique
+
+        The system prompt is the shared rubric, the deck context (if any) and
+        the persona, each a cache breakpoint; everything slide-specific goes in
+        the user message so the cached prefix is identical across slides.
+        """
+        context = self._build_context(slide_data, previous_debates, persona_id)
+
+        return {
+            "model": "claude-3-5-haiku-20241022",
+            "max_tokens": 2500,
+            "temperature": 0.7,
+            "system": critique_system_blocks(
+                persona["system_prompt"],
+                self.deck_profile.get("prompt_block") if self.deck_profile else None
+            ),
+            "messages": [{
+                "role": "user",
+                "content": f"{context}\n\n{self._create_analysis_prompt(slide_data, round_number)}"
+            }]
+        }
+
+    def _lookup_critique(
+        self,
+        request: Dict,
+        round_number: int,
+        persona_id: str,
+        persona: Dict,
+        start_time: float,
+        bypass_cache: Optional[bool]
+    ) -> Tuple[Optional[str], Optional[Dict]]:
+        """Return (cache key, cached debate entry or None) for a critique request"""
+        if self.response_cache is None:
+            return None, None
+
+        cache_key = self.response_cache.make_key(request, round_number)
+        bypass = self.bypass_cache if bypass_cache is None else bypass_cache
+        if bypass:
+            with self._stats_lock:
+                self.response_cache_stats["bypassed"] += 1
+            return cache_key, None
+
+        cached = self.response_cache.get(cache_key)
+        with self._stats_lock:
+            self.response_cache_stats["hits" if cached is not None else "misses"] += 1
+        if cached is None:
+            return cache_key, None
+
+        entry = self._build_critique_entry(persona_id, persona, cached["text"], 0, start_time)
+        entry["cached"] = True
+        return cache_key, entry
+
+    def _shared_prefix_key(self) -> str:
+        return shared_prefix_key(self.deck_profile.get("prompt_block") if self.deck_profile else None)
+
+    def _store_critique(self, cache_key: Optional[str], entry: Dict) -> Dict:
+        """Remember a freshly generated critique under its cache key"""
+        if cache_key is not None and self.response_cache is not None:
+            self.response_cache.set(cache_key, {"text": entry["raw_response"]})
+        return entry
+
+    def _critique_entry(self, persona_id: str, persona: Dict, request: Dict, response, start_time: float) -> Dict:
+        """Turn a persona critique response into a debate entry"""
+        # The request wrote (or refreshed) the shared prefix in the prompt cache
+        mark_shared_prefix_warm(self._shared_prefix_key())
+        tokens = self._record_usage("critique", request, response, persona_id)
+        with self._stats_lock:
+            if tokens["cache_read_input_tokens"] > 0:
+                self.cache_stats["hits"] += 1
+            else:
+                self.cache_stats["misses"] += 1
+
+        tokens_used = tokens["input_tokens"] + tokens["output_tokens"]
+        entry = self._build_critique_entry(persona_id, persona, response.content[0].text, tokens_used, start_time)
+        PHASE_SECONDS.observe(entry["latency"], phase="critique")
+        entry["usage"] = tokens
+        entry["prompt_layout"] = prompt_layout_report(request["model"], request["system"])
+        return entry
+
+    def _record_usage(self, phase: str, request: Dict, response, persona_id: Optional[str] = None) -> Dict[str, int]:
+        """Record a call's token usage against this engine (and the process totals)"""
+        tokens = self.usage.record(request.get("model"), phase, getattr(response, "usage", None), persona_id)
+        for kind, count in tokens.items():
+            if count:
+                PHASE_TOKENS.inc(count, phase=phase, persona=persona_id or "", model=request.get("model", ""), kind=kind)
+        return tokens
+
+    def _build_critique_entry(
+        self,
+        persona_id: str,
+        persona: Dict,
+        critique_text: str,
+        tokens_used: int,
+        start_time: float
+    ) -> Dict:
+        critique = self._parse_critique(critique_text)
+
+        # ensure parsed flag so UI knows
+        if isinstance(critique, dict) and "parsed" not in critique:
+            critique["parsed"] = True
+
+        return {
+            "persona_id": persona_id,
+            "persona_name": persona["name"],
+            "emoji": persona["emoji"],
+            "role": persona["role"],
+            "color": persona["color"],
+            "critique": critique,
+            "raw_response": critique_text,
+            "tokens_used": tokens_used,
+            "latency": time.time() - start_time
+        }
+
+    def _critique_error(self, persona_id: str, persona: Dict, error: Exception, start_time: float) -> Dict:
+        """Debate entry for a persona whose critique call failed"""
+        record_error("debate_engine", error, phase="critique", persona=persona_id)
+        return {
+            "persona_id": persona_id,
+            "persona_name": persona["name"],
+            "emoji": persona["emoji"],
+            "error": str(error),
+            "latency": time.time() - start_time
+        }
+
+    def _synthesis_request(self, debate_round: Dict, deck_context: Optional[str]) -> Tuple[Dict, str]:
+        """Build the messages.create kwargs for the synthesis call"""
         all_feedback = []
         for d in debate_round['debates']:
             if 'error' not in d:
@@ -196,132 +577,36 @@ Provide a comprehensive synthesis in JSON format:
 
 Be specific and actionable."""
 
-        try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=4000,
-                temperature=0.5,
-                system="You are an expert AI/ML pitch deck consultant providing structured, actionable feedback.",
-                messages=[{
-                    "role": "user",
-                    "content": coordinator_prompt
-                }]
-            )
-
-            synthesis_text = response.content[0].text
-            synthesis = self._parse_json_response(synthesis_text) or {}
-            synthesis["synthesis_timestamp"] = time.time()
-            synthesis["raw_synthesis"] = synthesis_text
-
-            return synthesis
-
-        except Exception as e:
-            return {
-                "error": str(e),
-                "raw_feedback": combined_feedback
-            }
-
-    def _create_analysis_prompt(self, slide_data: Dict, round_number: int) -> str:
-        """Create the analysis prompt for agents"""
-        return f"""Analyze slide #{slide_data['number']} from an AI/ML company pitch deck.
-
-**Slide Title:** {slide_data['title']}
-
-**Slide Content:**
-{slide_data['content']}
-
-**Speaker Notes:**
-{slide_data.get('notes', 'None provided')}
-
-Provide your expert critique in JSON format:
-{{
-    "overall_score": 1-10,
-    "key_strengths": ["Specific strength 1"],
-    "critical_issues": [
-        {{
-            "issue": "Specific problem",
-            "severity": "Critical|Major|Minor",
-            "reasoning": "Why this is a problem"
-        }}
-    ],
-    "recommendations": [
-        {{
-            "action": "Specific fix",
-            "rationale": "Why this helps",
-            "priority": "High|Medium|Low"
-        }}
-    ],
-    "questions_to_answer": ["Question 1"]
-}}
-
-Be specific, technical, and actionable."""
-
-    def _build_context(self, slide_data: Dict, previous_debates: Optional[List], current_persona_id: str) -> str:
-        """Build context from previous debate rounds"""
-        if not previous_debates:
-            return f"""This is the first analysis of slide {slide_data['number']}: "{slide_data['title']}"
-
-Approach this with fresh eyes and deep technical expertise."""
-
-        context_parts = [
-            f"Previous analysis context for slide {slide_data['number']}:",
-            "\nConsider these perspectives but provide your independent expert analysis."
-        ]
-
-        return "\n".join(context_parts)
-
-    def _parse_critique(self, critique_text: str) -> Dict:
-        """Parse critique text into structured format"""
-        parsed = self._parse_json_response(critique_text)
-        if parsed:
-            if "parsed" not in parsed:
-                parsed["parsed"] = True
-            return parsed
-
-        return {
-            "overall_score": 5,
-            "critique_text": critique_text,
-            "parsed": False
+        request = {
+            "model": "claude-sonnet-4-5-20250929",
+            "max_tokens": 4000,
+            "temperature": 0.5,
+            "system": "You are an expert AI/ML pitch deck consultant providing structured, actionable feedback.",
+            "messages": [{
+                "role": "user",
+                "content": coordinator_prompt
+            }]
         }
+        return request, combined_feedback
 
-    def _parse_json_response(self, text: str) -> Optional[Dict]:
-        """Extract and parse JSON from text response (robust)"""
-        if not isinstance(text, str) or not text.strip():
-            return None
-
-        # 1) strict json
-        try:
-            return json.loads(text)
-        except Exception:
-            pass
-
-        # 2) try jsonish (fences, trailing commas)
-        js = _parse_jsonish(text)
-        if isinstance(js, dict):
-            return js
-
-        return None
-
-    def collaborative_debate_round(self, debate_round: Dict, deck_context: Optional[str] = None) -> Dict:
-        """
-        Run a collaborative debate where agents discuss together and produce unified feedback
+    def _synthesis_result(self, request: Dict, response) -> Dict:
+        """Parse the synthesis response"""
+        self._record_usage("synthesis", request, response)
+        synthesis_text = response.content[0].text
+        synthesis = self._parse_json_response(synthesis_text) or {}
+        synthesis["synthesis_timestamp"] = time.time()
+        synthesis["raw_synthesis"] = synthesis_text
 
-        Args:
-            debate_round: Initial individual critiques from agents
-            deck_context: Context about the deck type
-
-        Returns:
-            Unified feedback with consensus and questions for the client
-        """
-        from agents.personas import get_persona
+        return synthesis
 
+    def _collaborative_request(self, debate_round: Dict, deck_context: Optional[str]) -> Tuple[Dict, int]:
+        """Build the messages.create kwargs for the moderated debate"""
         # Gather all individual critiques
         all_critiques = []
         participating_personas = []
 
         for d in debate_round['debates']:
             if 'error' not in d and 'critique' in d:
-                persona = get_persona(d['persona_id'])
                 all_critiques.append({
                     "name": d['persona_name'],
                     "role": d['role'],
@@ -394,48 +679,483 @@ Output format (JSON):
 
 Be specific and actionable. Highlight where experts converged vs diverged."""
 
+        request = {
+            "model": "claude-sonnet-4-5-20250929",
+            "max_tokens": 5000,
+            "temperature": 0.6,
+            "system": "You are an expert moderator facilitating collaborative AI/ML pitch deck reviews.",
+            "messages": [{
+                "role": "user",
+                "content": debate_prompt
+            }]
+        }
+        return request, len(all_critiques)
+
+    def _collaborative_result(self, request: Dict, response, participating_experts: int) -> Dict:
+        """Parse the moderated debate response"""
+        self._record_usage("collaborative_debate", request, response)
+        debate_text = response.content[0].text
+        debate_result = self._parse_json_response(debate_text) or {}
+
+        return {
+            "collaborative_debate": debate_result,
+            "raw_debate": debate_text,
+            "participating_experts": participating_experts,
+            "timestamp": time.time()
+        }
+
+    def _create_analysis_prompt(self, slide_data: Dict, round_number: int) -> str:
+        """Create the slide-specific analysis prompt (the JSON schema lives in the shared prefix)"""
+        return f"""Analyze slide #{slide_data['number']} from an AI/ML company pitch deck (debate round {round_number}).
+
+**Slide Title:** {slide_data['title']}
+
+**Slide Content:**
+{slide_data['content']}
+
+**Speaker Notes:**
+{slide_data.get('notes', 'None provided')}
+
+Provide your expert critique as the JSON object described in your instructions."""
+
+    def _build_context(self, slide_data: Dict, previous_debates: Optional[List], current_persona_id: str) -> str:
+        """Build context from previous debate rounds (up to 800 chars per analysis)"""
+        if not previous_debates:
+            return f"""This is the first analysis of slide {slide_data['number']}: "{slide_data['title']}"
+
+Approach this with fresh eyes and deep technical expertise."""
+
+        context_parts = [f"Previous analysis context for slide {slide_data['number']}:"]
+
+        for previous in previous_debates:
+            context_parts.append(f"\n--- Round {previous.get('round', '?')} ---")
+            for d in previous.get('debates', []):
+                if 'error' in d or d.get('persona_id') == current_persona_id:
+                    continue
+                excerpt = d.get('raw_response', '')[:800]
+                context_parts.append(f"{d.get('emoji', '')} {d['persona_name']} ({d.get('role', '')}):\n{excerpt}")
+
+        context_parts.append("\nConsider these perspectives but provide your independent expert analysis.")
+
+        return "\n".join(context_parts)
+
+    def _parse_critique(self, critique_text: str) -> Dict:
+        """Parse critique text into structured format"""
+        parsed = self._parse_json_response(critique_text)
+        if parsed:
+            if "parsed" not in parsed:
+                parsed["parsed"] = True
+            return parsed
+
+        return {
+            "overall_score": 5,
+            "critique_text": critique_text,
+            "parsed": False
+        }
+
+    def _parse_json_response(self, text: str) -> Optional[Dict]:
+        """Extract and parse JSON from text response (robust)"""
+        if not isinstance(text, str) or not text.strip():
+            return None
+
+        # 1) strict json
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=5000,
-                temperature=0.6,
-                system="You are an expert moderator facilitating collaborative AI/ML pitch deck reviews.",
-                messages=[{
-                    "role": "user",
-                    "content": debate_prompt
-                }]
-            )
+            return json.loads(text)
+        except Exception:
+            pass
+
+        # 2) try jsonish (fences, trailing commas)
+        js = _parse_jsonish(text)
+        if isinstance(js, dict):
+            return js
+
+        return None
+
+    def get_cache_efficiency(self) -> Dict:
+        """
+        Prompt-cache and token statistics for this engine
+
+        ``cache_hits``/``cache_misses`` count critique calls that did or did
+        not read from Anthropic's prompt cache. The token figures are summed
+        from each call's usage, so ``cached_token_ratio`` is the share of
+        prompt tokens actually served from cache and
+        ``estimated_cost_savings`` is the input-cost saving after paying the
+        cache-write premium.
+        """
+        total = self.cache_stats["hits"] + self.cache_stats["misses"]
+        hit_rate = (self.cache_stats["hits"] / total) * 100 if total > 0 else 0
+        tokens = self.usage.totals()
+
+        return {
+            "cache_hits": self.cache_stats["hits"],
+            "cache_misses": self.cache_stats["misses"],
+            "hit_rate_percent": round(hit_rate, 1),
+            "input_tokens": tokens["input_tokens"],
+            "output_tokens": tokens["output_tokens"],
+            "cache_creation_input_tokens": tokens["cache_creation_input_tokens"],
+            "cache_read_input_tokens": tokens["cache_read_input_tokens"],
+            "cached_token_ratio": tokens["cached_token_ratio"],
+            "estimated_cost_savings": f"{tokens['input_cost_savings_percent']}%",
+            "response_cache": {
+                **self.response_cache_stats,
+                "shared": self.response_cache.get_stats() if self.response_cache is not None else None
+            }
+        }
+
+    def get_usage(self) -> Dict:
+        """Per-call token usage with per-model, per-phase and per-persona breakdowns"""
+        return self.usage.summary()
+
+
+class AsyncDebateEngine(DebateEngine):
+    """
+    asyncio-native DebateEngine on ``anthropic.AsyncAnthropic``.
+
+    Same prompts, parsing and result shapes as DebateEngine; the LLM calls
+    are awaited instead of blocking a worker thread, so a single event loop
+    can hold many debates in flight.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        bypass_cache: bool = False,
+        deck_profile: Optional[Dict] = None,
+        max_inflight: Optional[int] = None,
+        gateway: Optional[LLMGateway] = None,
+        client: Optional[Any] = None
+    ):
+        super().__init__(
+            api_key=api_key,
+            max_concurrency=max_concurrency,
+            response_cache=response_cache,
+            bypass_cache=bypass_cache,
+            deck_profile=deck_profile,
+            gateway=gateway,
+            client=client if client is not None else get_async_anthropic_client(api_key)
+        )
+        # Global cap on model calls in flight across every slide and persona
+        # this engine is working on. Defaults to the connection pool size
+        # (DEBATE_MAX_INFLIGHT or LLM_MAX_CONNECTIONS); ``max_inflight`` can
+        # only lower it
+        self.max_inflight = max_connections()
+        if max_inflight:
+            self.max_inflight = min(self.max_inflight, _positive_int(max_inflight, "max_inflight"))
+        self._call_slots = asyncio.Semaphore(self.max_inflight)
+
+    async def create_debate_round(
+        self,
+        slide_data: Dict,
+        personas: List[str],
+        round_number: int = 1,
+        previous_debates: Optional[List] = None,
+        max_concurrency: Optional[int] = None,
+        bypass_cache: Optional[bool] = None
+    ) -> Dict:
+        """Run one round of debate concurrently; ``debates`` follows persona order"""
+        start_time = time.time()
+        workers = self._fan_out_width(personas, max_concurrency)
+        semaphore = asyncio.Semaphore(workers)
+
+        async def run(persona_id: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self._run_persona_critique(
+                    slide_data, persona_id, round_number, previous_debates, bypass_cache
+                )
+
+        results = await self._prime_shared_prefix(personas, run)
+        results += await asyncio.gather(*(run(persona_id) for persona_id in personas[len(results):]))
+
+        return self._round_result(slide_data, round_number, results, start_time, workers)
+
+    async def _prime_shared_prefix(self, personas: List[str], run) -> List[Optional[Dict]]:
+        """Async counterpart of DebateEngine._prime_shared_prefix (``run`` is a coroutine function)"""
+        key = self._shared_prefix_key()
+        if len(personas) < 2 or shared_prefix_warm(key):
+            return []
+
+        event = self._priming.get(key)
+        if event is not None:
+            await event.wait()
+            return []
+
+        event = self._priming[key] = asyncio.Event()
+        try:
+            return [await run(personas[0])]
+        finally:
+            self._priming.pop(key, None)
+            event.set()
+
+    async def _run_persona_critique(
+        self,
+        slide_data: Dict,
+        persona_id: str,
+        round_number: int,
+        previous_debates: Optional[List],
+        bypass_cache: Optional[bool] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Optional[Dict]:
+        """Get one persona's critique; returns None for unknown personas"""
+        from agents.personas import get_persona
+
+        persona = get_persona(persona_id)
+        if not persona:
+            return None
+
+        request = self._critique_request(slide_data, persona_id, persona, round_number, previous_debates)
+        start_time = time.time()
+        cache_key, cached = self._lookup_critique(request, round_number, persona_id, persona, start_time, bypass_cache)
+        if cached is not None:
+            if on_text is not None:
+                on_text(cached["raw_response"])
+            return cached
+
+        try:
+            response = await self._create_message(request, on_text, "critique", persona_id)
+            return self._store_critique(cache_key, self._critique_entry(persona_id, persona, request, response, start_time))
+        except Exception as e:
+            return self._critique_error(persona_id, persona, e, start_time)
 
-            debate_text = response.content[0].text
-            debate_result = self._parse_json_response(debate_text) or {}
+    async def synthesize_feedback(
+        self,
+        debate_round: Dict,
+        deck_context: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """Synthesize feedback from all agents into actionable recommendations"""
+        request, combined_feedback = self._synthesis_request(debate_round, deck_context)
 
+        try:
+            response = await self._create_message(request, on_text, "synthesis")
+            return self._synthesis_result(request, response)
+        except Exception as e:
+            record_error("debate_engine", e, phase="synthesis", model=request["model"])
             return {
-                "collaborative_debate": debate_result,
-                "raw_debate": debate_text,
-                "participating_experts": len(all_critiques),
-                "timestamp": time.time()
+                "error": str(e),
+                "raw_feedback": combined_feedback
             }
 
+    async def collaborative_debate_round(
+        self,
+        debate_round: Dict,
+        deck_context: Optional[str] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """Run the moderated collaborative debate (see DebateEngine)"""
+        request, participating_experts = self._collaborative_request(debate_round, deck_context)
+
+        try:
+            response = await self._create_message(request, on_text, "collaborative_debate")
+            return self._collaborative_result(request, response, participating_experts)
         except Exception as e:
+            record_error("debate_engine", e, phase="collaborative_debate", model=request["model"])
             return {
                 "error": str(e),
-                "participating_experts": len(all_critiques)
+                "participating_experts": participating_experts
             }
 
-    def get_cache_efficiency(self) -> Dict:
-        """Get cache performance statistics - FIXED FOR DIVISION BY ZERO"""
-        total = self.cache_stats["hits"] + self.cache_stats["misses"]
+    async def _create_message(
+        self,
+        request: Dict,
+        on_text: Optional[Callable[[str], None]] = None,
+        phase: str = "",
+        persona_id: Optional[str] = None
+    ):
+        """
+        Send a request; with ``on_text`` the response is streamed and every text
+        delta is handed to the callback before the final message is returned.
+        """
+        queued = time.perf_counter()
+        async with self._call_slots:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, queue="inflight_slots")
+            return await self._timed_send(request, on_text, phase, persona_id)
 
-        if total > 0:
-            hit_rate = (self.cache_stats["hits"] / total) * 100
-            cost_savings = round(hit_rate * 0.9, 0)
-        else:
-            hit_rate = 0
-            cost_savings = 0
+    async def _timed_send(self, request: Dict, on_text, phase: str, persona_id: Optional[str]):
+        start = time.perf_counter()
+        try:
+            return await self._send(request, on_text)
+        finally:
+            self._observe_llm(phase, request, start, persona_id)
+
+    async def _send(self, request: Dict, on_text: Optional[Callable[[str], None]]):
+        if on_text is None:
+            return await self.gateway.acreate(self.client, request)
+
+        return await self.gateway.astream(self.client, request, on_text)
+
+    async def stream_analysis(
+        self,
+        slide_data: Dict,
+        personas: List[str],
+        deck_context: Optional[str] = None,
+        stream_tokens: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Run analyze_slide's phases and yield ``(event, data)`` pairs as results land
+
+        Events, in order: ``critique`` once per persona as each finishes,
+        ``debate_round`` when all critiques are in, ``collaborative_debate`` and
+        ``synthesis`` as each completes, then ``done`` (or ``error``). With
+        ``stream_tokens`` every model call is streamed and raw text deltas are
+        interleaved as ``token`` events tagged with their phase and persona.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def token_sink(phase: str, persona_id: Optional[str] = None) -> Optional[Callable[[str], None]]:
+            if not stream_tokens:
+                return None
+            return lambda text: queue.put_nowait(
+                ("token", {"phase": phase, "persona_id": persona_id, "text": text})
+            )
+
+        async def critique(persona_id: str, semaphore: asyncio.Semaphore) -> Optional[Dict]:
+            async with semaphore:
+                entry = await self._run_persona_critique(
+                    slide_data, persona_id, 1, None, on_text=token_sink("critique", persona_id)
+                )
+            if entry is not None:
+                queue.put_nowait(("critique", entry))
+            return entry
+
+        async def phase(name: str, coro) -> Dict:
+            start_time = time.time()
+            result = await coro
+            timings[name] = time.time() - start_time
+            queue.put_nowait((name, result))
+            return result
+
+        async def produce():
+            try:
+                start_time = time.time()
+                workers = self._fan_out_width(personas, None)
+                semaphore = asyncio.Semaphore(workers)
+                results = await self._prime_shared_prefix(personas, lambda p: critique(p, semaphore))
+                results += await asyncio.gather(*(critique(p, semaphore) for p in personas[len(results):]))
+                debate_round = self._round_result(slide_data, 1, results, start_time, workers)
+                timings["debate_round"] = debate_round["elapsed_time"]
+                queue.put_nowait(("debate_round", debate_round))
+
+                await asyncio.gather(
+                    phase("collaborative_debate", self.collaborative_debate_round(
+                        debate_round, deck_context, on_text=token_sink("collaborative_debate")
+                    )),
+                    phase("synthesis", self.synthesize_feedback(
+                        debate_round, deck_context, on_text=token_sink("synthesis")
+                    )),
+                )
+                self._observe_phases(timings)
+                queue.put_nowait(("done", {
+                    "phase_timings": timings,
+                    "cache_stats": self.get_cache_efficiency(),
+                    "usage": self.get_usage()
+                }))
+            except Exception as e:
+                queue.put_nowait(("error", {"error": str(e)}))
+
+        timings: Dict[str, float] = {}
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event in ("done", "error"):
+                    break
+        finally:
+            # Consumer went away (e.g. client disconnect): stop the spend
+            if not producer.done():
+                producer.cancel()
+
+    async def analyze_slide(
+        self,
+        slide_data: Dict,
+        personas: List[str],
+        deck_context: Optional[str] = None
+    ) -> Dict:
+        """Full slide analysis; collaborative debate and synthesis overlap"""
+        results, timings = await self.run_phases(self._analysis_phases(slide_data, personas, deck_context))
+        return self._analysis_result(results, timings)
+
+    async def analyze_deck(
+        self,
+        slides: List[Dict],
+        personas: List[str],
+        deck_context: Optional[str] = None,
+        slide_indices: Optional[List[int]] = None,
+        on_result: Optional[Callable[[str, Dict], None]] = None
+    ) -> Dict:
+        """
+        Analyze several slides concurrently (all of them by default)
+
+        Every slide runs the analyze_slide pipeline; model calls from all
+        slides share the engine's ``max_inflight`` cap. A failing slide is
+        reported under ``errors`` without affecting the others.
+
+        Args:
+            on_result: Called with (slide number, analysis) as each slide finishes
+
+        Returns:
+            ``results`` and ``errors`` keyed by slide number (as a string)
+        """
+        start_time = time.time()
+        indices = range(len(slides)) if slide_indices is None else slide_indices
+        selected = [slides[i] for i in dict.fromkeys(indices)]
+
+        async def analyze(slide: Dict) -> Dict:
+            result = await self.analyze_slide(slide, personas, deck_context)
+            if on_result is not None:
+                on_result(str(slide['number']), result)
+            return result
+
+        outcomes = await asyncio.gather(
+            *(analyze(slide) for slide in selected),
+            return_exceptions=True
+        )
+
+        results: Dict[str, Dict] = {}
+        errors: Dict[str, str] = {}
+        for slide, outcome in zip(selected, outcomes):
+            key = str(slide['number'])
+            if isinstance(outcome, BaseException):
+                errors[key] = str(outcome)
+            else:
+                results[key] = outcome
 
         return {
-            "cache_hits": self.cache_stats["hits"],
-            "cache_misses": self.cache_stats["misses"],
-            "hit_rate_percent": round(hit_rate, 1),
-            "estimated_cost_savings": f"{int(cost_savings)}%"
+            "results": results,
+            "errors": errors,
+            "slides_analyzed": len(selected),
+            "elapsed_time": time.time() - start_time,
+            "cache_stats": self.get_cache_efficiency(),
+            "usage": self.get_usage()
         }
+
+    async def run_phases(self, phases: Dict[str, Tuple[Callable, List[str]]]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """
+        Async counterpart of DebateEngine.run_phases; each ``fn`` returns an
+        awaitable and starts as soon as its dependencies have resolved.
+        """
+        self._check_phases(phases)
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Future] = {}
+
+        async def run(name: str):
+            fn, deps = phases[name]
+            dep_results = {d: await tasks[d] for d in deps}
+            start_time = time.time()
+            result = await fn(dep_results)
+            timings[name] = time.time() - start_time
+            return result
+
+        for name in phases:
+            tasks[name] = asyncio.ensure_future(run(name))
+
+        try:
+            values = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return dict(zip(tasks.keys(), values)), timings
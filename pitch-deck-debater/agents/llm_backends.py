@@ -0,0 +1,515 @@
+"""
+Offline LLM backends for load tests and benchmarks
+
+The engines, coordinator and generators only talk to ``client.messages``
+(``create`` and, for async clients, ``stream``), so a backend is just an
+object with that shape. agents.clients hands one out instead of a live
+Anthropic client when LLM_BACKEND selects it:
+
+- ``live``   (default) the real API.
+- ``record`` the real API; every request -> response pair (and its latency)
+             is saved to a cassette store.
+- ``replay`` serves responses from the cassette store with synthetic
+             latency, no network. Unknown requests raise CassetteMiss.
+- ``stub``   generates schema-valid fake responses (critiques, synthesis,
+             moderated debate, tool_use payloads, extractor lists) from the
+             request itself, deterministically per request.
+
+Responses are real ``anthropic.types.Message`` objects, so parsing and
+usage accounting run exactly as in production.
+
+Environment:
+    LLM_BACKEND            live|record|replay|stub (default: live)
+    LLM_CASSETTE_PATH      SQLite cassette store (default: llm_cassettes.sqlite)
+    LLM_SYNTHETIC_LATENCY  Latency for replay/stub: "recorded" (replay default),
+                           "0" / "fixed:S", "uniform:LO,HI", "normal:MEAN,SD" or
+                           "lognormal:MU,SIGMA" (seconds; stub default: 0)
+    LLM_LATENCY_SEED       Seed for sampled latencies (default: 0)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from anthropic.types import Message
+
+from agents.llm_gateway import estimate_request_tokens
+from utils.ttl_cache import SQLiteTTLCache
+
+BACKENDS = ("live", "record", "replay", "stub")
+
+# Chunks a replayed/stubbed text response is split into when streamed
+STREAM_CHUNKS = 8
+
+
+class CassetteMiss(LookupError):
+    """Replay was asked for a request that was never recorded"""
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Hash of everything in a messages request that shapes the response"""
+    material = {k: v for k, v in request.items() if k not in ("timeout", "extra_headers")}
+    blob = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """Recorded responses by request_key, kept in SQLite (never expire)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LLM_CASSETTE_PATH", "llm_cassettes.sqlite")
+        self._store = SQLiteTTLCache(self.path, maxsize=1_000_000, ttl=None, table="cassettes")
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self._store.get(request_key(request))
+
+    def put(self, request: Dict[str, Any], response: Any, latency: float) -> None:
+        self._store.set(request_key(request), {
+            "model": request.get("model"),
+            "latency": latency,
+            "response": response.model_dump(mode="json"),
+        })
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class LatencyModel:
+    """Synthetic latency distribution parsed from an LLM_SYNTHETIC_LATENCY spec"""
+
+    def __init__(self, spec: str = "0", seed: Optional[int] = None):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args.split(",") if a.strip()]
+        if self.kind not in ("recorded", "fixed", "uniform", "normal", "lognormal"):
+            # A bare number means a fixed latency
+            self.args, self.kind = [float(spec)], "fixed"
+        self._rng = random.Random(int(os.getenv("LLM_LATENCY_SEED", 0)) if seed is None else seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded: Optional[float] = None) -> float:
+        with self._lock:
+            if self.kind == "recorded":
+                return recorded or 0.0
+            if self.kind == "fixed":
+                return self.args[0] if self.args else 0.0
+            if self.kind == "uniform":
+                return self._rng.uniform(self.args[0], self.args[1])
+            if self.kind == "normal":
+                return max(0.0, self._rng.gauss(self.args[0], self.args[1]))
+            return self._rng.lognormvariate(self.args[0], self.args[1])
+
+
+def _message(request: Dict[str, Any], content: List[Dict[str, Any]], output_chars: int) -> Message:
+    return Message.model_validate({
+        "id": f"msg_offline_{request_key(request)[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "offline"),
+        "content": content,
+        "stop_reason": "tool_use" if any(c["type"] == "tool_use" for c in content) else "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": estimate_request_tokens(request),
+            "output_tokens": max(1, output_chars // 4),
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    })
+
+
+# ---- stub responses ----
+
+def _request_text(request: Dict[str, Any]) -> str:
+    parts = []
+    system = request.get("system")
+    if isinstance(system, str):
+        parts.append(system)
+    elif isinstance(system, list):
+        parts.extend(block.get("text", "") for block in system if isinstance(block, dict))
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(block.get("text", "") for block in content if isinstance(block, dict))
+    return "\n".join(parts)
+
+
+def _phrase(rng: random.Random, what: str) -> str:
+    topics = ("model evaluation", "data rights", "unit economics", "go-to-market", "defensibility",
+              "inference cost", "market sizing", "team depth", "latency", "compliance")
+    return f"{what} on {rng.choice(topics)} ({rng.randint(100, 999)})"
+
+
+def _fake_from_schema(schema: Dict[str, Any], rng: random.Random, name: str = "value") -> Any:
+    """Random value that validates against a (tool input) JSON schema"""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            key: _fake_from_schema(sub, rng, key)
+            for key, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_fake_from_schema(schema.get("items", {}), rng, name) for _ in range(rng.randint(2, 4))]
+    if kind == "integer":
+        return rng.randint(1, 10)
+    if kind == "number":
+        return round(rng.uniform(1, 10), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return _phrase(rng, f"Stub {name.replace('_', ' ')}")
+
+
+def _stub_tool_input(tool: Dict[str, Any], text: str, rng: random.Random) -> Dict[str, Any]:
+    payload = _fake_from_schema(tool.get("input_schema", {}), rng)
+    slide_numbers = [int(n) for n in re.findall(r"^Slide (\d+):", text, flags=re.MULTILINE)]
+    if slide_numbers and isinstance(payload.get("slides"), list):
+        # Cover exactly the slides the request asked about
+        payload["slides"] = [
+            {"slide_number": n, "improvements": [_phrase(rng, "Tighten") for _ in range(3)]}
+            for n in slide_numbers
+        ]
+    return payload
+
+
+def _stub_critique(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "overall_score": rng.randint(3, 9),
+        "key_strengths": [_phrase(rng, "Clear point") for _ in range(2)],
+        "critical_issues": [
+            {"issue": _phrase(rng, "Missing evidence"), "severity": rng.choice(["Critical", "Major", "Minor"]),
+             "reasoning": _phrase(rng, "Investors will ask")}
+            for _ in range(rng.randint(1, 3))
+        ],
+        "recommendations": [
+            {"action": _phrase(rng, "Add a metric"), "rationale": _phrase(rng, "Builds credibility"),
+             "priority": rng.choice(["High", "Medium", "Low"])}
+            for _ in range(rng.randint(1, 3))
+        ],
+        "questions_to_answer": [_phrase(rng, "What is the baseline") for _ in range(2)],
+    }
+
+
+def _stub_synthesis(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "overall_score": rng.randint(3, 9),
+        "consensus_issues": [_phrase(rng, "Shared concern")],
+        "technical_concerns": [_phrase(rng, "Technical risk")],
+        "business_concerns": [_phrase(rng, "Business risk")],
+        "ethical_concerns": [_phrase(rng, "Ethics risk")],
+        "priority_fixes": [
+            {"severity": rng.choice(["Critical", "Major", "Minor"]),
+             "category": rng.choice(["Technical", "Business", "Ethics", "Product"]),
+             "issue": _phrase(rng, "Gap"), "fix": _phrase(rng, "Fix"), "impact": _phrase(rng, "Impact")}
+            for _ in range(2)
+        ],
+        "improved_slide_content": {
+            "title": _phrase(rng, "Improved title"),
+            "key_points": [_phrase(rng, "Point") for _ in range(3)],
+            "speaker_notes": _phrase(rng, "Say"),
+        },
+        "questions_investors_will_ask": [_phrase(rng, "Question") for _ in range(2)],
+        "strengths_to_emphasize": [_phrase(rng, "Strength")],
+    }
+
+
+def _stub_collaborative(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "unified_feedback": {
+            "overall_consensus_score": rng.randint(3, 9),
+            "areas_of_agreement": [
+                {"point": _phrase(rng, "Agreed"), "supporting_experts": ["Expert A", "Expert B"],
+                 "severity": rng.choice(["Critical", "Major", "Minor"])}
+            ],
+            "areas_of_disagreement": [
+                {"topic": _phrase(rng, "Disputed"),
+                 "viewpoint_a": {"expert": "Expert A", "position": _phrase(rng, "For")},
+                 "viewpoint_b": {"expert": "Expert B", "position": _phrase(rng, "Against")},
+                 "resolution": _phrase(rng, "Balance")}
+            ],
+            "priority_actions": [
+                {"action": _phrase(rng, "Do"), "rationale": _phrase(rng, "Because"),
+                 "priority": rng.choice(["High", "Medium", "Low"]),
+                 "estimated_effort": rng.choice(["Hours", "Days", "Weeks"])}
+            ],
+            "questions_for_client": [
+                {"question": _phrase(rng, "Question"), "why_important": _phrase(rng, "Matters"),
+                 "asked_by": ["Expert A"]}
+            ],
+            "strengths_to_maintain": [_phrase(rng, "Strength")],
+            "deal_breakers": [],
+            "recommended_next_steps": [_phrase(rng, "Step") for _ in range(3)],
+        },
+        "debate_summary": _phrase(rng, "Experts converged"),
+    }
+
+
+def _stub_text(text: str, rng: random.Random) -> str:
+    """Text reply in whatever shape the prompt asks for"""
+    if '"unified_feedback"' in text:
+        return json.dumps(_stub_collaborative(rng))
+    if '"priority_fixes"' in text:
+        return json.dumps(_stub_synthesis(rng))
+    if '"questions_to_answer"' in text:
+        return json.dumps(_stub_critique(rng))
+    if '"severity": "critical"' in text:
+        return json.dumps([{"issue": _phrase(rng, "Issue"), "severity": s} for s in ("critical", "moderate", "minor")])
+    if '"priority": "high", "slide"' in text:
+        return json.dumps([{"action": _phrase(rng, "Action"), "priority": p, "slide": rng.choice([None, 1, 2])}
+                           for p in ("high", "medium", "low")])
+    if "JSON array of strings" in text:
+        return json.dumps([_phrase(rng, "Point") for _ in range(3)])
+    if "numbered list" in text:
+        return "\n".join(f"{i}. {_phrase(rng, 'Recommendation')}" for i in range(1, 6))
+    if "bulleted improvements" in text:
+        return "\n".join(f"- {_phrase(rng, 'Improve')}" for _ in range(3))
+    return _phrase(rng, "Stub response")
+
+
+def stub_message(request: Dict[str, Any]) -> Message:
+    """Deterministic, schema-valid fake response for a messages request"""
+    rng = random.Random(request_key(request))
+    text = _request_text(request)
+
+    tool_choice = request.get("tool_choice") or {}
+    tools = {tool["name"]: tool for tool in request.get("tools") or []}
+    tool = tools.get(tool_choice.get("name")) if tool_choice.get("type") == "tool" else None
+    if tool is not None:
+        payload = _stub_tool_input(tool, text, rng)
+        content = [{"type": "tool_use", "id": f"toolu_offline_{rng.randint(0, 10 ** 9)}",
+                    "name": tool["name"], "input": payload}]
+        return _message(request, content, len(json.dumps(payload)))
+
+    reply = _stub_text(text, rng)
+    return _message(request, [{"type": "text", "text": reply}], len(reply))
+
+
+# ---- client-shaped backends ----
+
+class _OfflineCore:
+    """Turns a request into (message, latency) for the replay and stub clients"""
+
+    def __init__(self, mode: str, store: Optional[CassetteStore] = None, latency: Optional[LatencyModel] = None):
+        self.mode = mode
+        self.store = store
+        default_spec = "recorded" if mode == "replay" else "0"
+        self.latency = latency or LatencyModel(os.getenv("LLM_SYNTHETIC_LATENCY", default_spec))
+
+    def respond(self, request: Dict[str, Any]) -> Tuple[Message, float]:
+        request = {k: v for k, v in request.items() if k != "timeout"}
+        if self.mode == "stub":
+            return stub_message(request), self.latency.sample()
+
+        record = self.store.get(request)
+        if record is None:
+            raise CassetteMiss(f"No recorded response for request {request_key(request)[:12]}")
+        return Message.model_validate(record["response"]), self.latency.sample(record.get("latency"))
+
+
+def _text_of(message: Message) -> str:
+    return "".join(getattr(block, "text", "") for block in message.content)
+
+
+class _OfflineMessages:
+    def __init__(self, core: _OfflineCore):
+        self._core = core
+
+    def create(self, **request) -> Message:
+        message, latency = self._core.respond(request)
+        if latency:
+            time.sleep(latency)
+        return message
+
+
+class _OfflineStream:
+    """messages.stream context manager over a precomputed message"""
+
+    def __init__(self, message: Message, latency: float):
+        self._message = message
+        self._latency = latency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        return False
+
+    @property
+    async def text_stream(self):
+        text = _text_of(self._message)
+        step = max(1, -(-len(text) // STREAM_CHUNKS))
+        chunks = [text[i:i + step] for i in range(0, len(text), step)] or [""]
+        for chunk in chunks:
+            await asyncio.sleep(self._latency / len(chunks))
+            if chunk:
+                yield chunk
+
+    async def get_final_message(self) -> Message:
+        return self._message
+
+
+class _AsyncOfflineMessages:
+    def __init__(self, core: _OfflineCore):
+        self._core = core
+
+    async def create(self, **request) -> Message:
+        message, latency = self._core.respond(request)
+        if latency:
+            await asyncio.sleep(latency)
+        return message
+
+    def stream(self, **request) -> _OfflineStream:
+        return _OfflineStream(*self._core.respond(request))
+
+
+class OfflineClient:
+    """Replay/stub stand-in for anthropic.Anthropic"""
+
+    max_retries = 0
+
+    def __init__(self, core: _OfflineCore):
+        self.messages = _OfflineMessages(core)
+
+
+class AsyncOfflineClient:
+    """Replay/stub stand-in for anthropic.AsyncAnthropic"""
+
+    max_retries = 0
+
+    def __init__(self, core: _OfflineCore):
+        self.messages = _AsyncOfflineMessages(core)
+
+
+class _RecordingMessages:
+    def __init__(self, messages: Any, store: CassetteStore):
+        self._messages = messages
+        self._store = store
+
+    def create(self, **request) -> Message:
+        start = time.monotonic()
+        response = self._messages.create(**request)
+        self._store.put(request, response, time.monotonic() - start)
+        return response
+
+
+class _RecordingStream:
+    """Wraps a live async stream and records its final message on exit"""
+
+    def __init__(self, manager: Any, request: Dict[str, Any], store: CassetteStore):
+        self._manager = manager
+        self._request = request
+        self._store = store
+
+    async def __aenter__(self):
+        self._start = time.monotonic()
+        self._stream = await self._manager.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> bool:
+        return await self._manager.__aexit__(*exc)
+
+    @property
+    def text_stream(self):
+        return self._stream.text_stream
+
+    async def get_final_message(self) -> Message:
+        message = await self._stream.get_final_message()
+        self._store.put(self._request, message, time.monotonic() - self._start)
+        return message
+
+
+class _AsyncRecordingMessages:
+    def __init__(self, messages: Any, store: CassetteStore):
+        self._messages = messages
+        self._store = store
+
+    async def create(self, **request) -> Message:
+        start = time.monotonic()
+        response = await self._messages.create(**request)
+        self._store.put(request, response, time.monotonic() - start)
+        return response
+
+    def stream(self, **request) -> _RecordingStream:
+        return _RecordingStream(self._messages.stream(**request), request, self._store)
+
+
+class RecordingClient:
+    """Live client (sync or async) whose responses are saved to a cassette store"""
+
+    def __init__(self, client: Any, store: CassetteStore, is_async: bool = False):
+        self.client = client
+        self.max_retries = getattr(client, "max_retries", 0)
+        messages_class = _AsyncRecordingMessages if is_async else _RecordingMessages
+        self.messages = messages_class(client.messages, store)
+
+
+_stores: Dict[str, CassetteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _cassette_store() -> CassetteStore:
+    path = os.getenv("LLM_CASSETTE_PATH", "llm_cassettes.sqlite")
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CassetteStore(path)
+        return _stores[path]
+
+
+def backend_mode() -> str:
+    mode = os.getenv("LLM_BACKEND", "live").strip().lower() or "live"
+    if mode not in BACKENDS:
+        raise ValueError(f"LLM_BACKEND must be one of {', '.join(BACKENDS)}")
+    return mode
+
+
+def build_client(live_factory: Callable[[], Any], is_async: bool = False) -> Any:
+    """
+    Client for the configured LLM_BACKEND
+
+    Args:
+        live_factory: Builds the real Anthropic client (only called for live/record)
+        is_async: Build the async flavour (messages.create awaitable, plus stream)
+    """
+    mode = backend_mode()
+    if mode == "live":
+        return live_factory()
+    if mode == "record":
+        return RecordingClient(live_factory(), _cassette_store(), is_async)
+
+    return offline_client(mode, is_async=is_async)
+
+
+def offline_client(
+    mode: str = "stub",
+    latency: Optional[str] = None,
+    is_async: bool = False,
+    store: Optional[CassetteStore] = None
+) -> Any:
+    """
+    Replay or stub client built directly (e.g. by benchmarks), independent of LLM_BACKEND
+
+    Args:
+        mode: "replay" or "stub"
+        latency: LLM_SYNTHETIC_LATENCY-style spec (defaults to that env var)
+        is_async: Build the async flavour
+        store: Cassette store for replay (defaults to LLM_CASSETTE_PATH)
+    """
+    if mode not in ("replay", "stub"):
+        raise ValueError("offline_client mode must be replay or stub")
+    if mode == "replay" and store is None:
+        store = _cassette_store()
+    core = _OfflineCore(mode, store, LatencyModel(latency) if latency is not None else None)
+    return AsyncOfflineClient(core) if is_async else OfflineClient(core)
@@ -0,0 +1,377 @@
+"""
+Central gateway for Anthropic calls: rate limiting, retries and deadlines
+
+Every call site (DebateEngine, DebateCoordinator, DeckGenerator) sends its
+messages.create / messages.stream requests through one process-wide
+LLMGateway so that, once calls run in parallel, they share:
+
+- a token-bucket limiter per model for requests/min and tokens/min, so we
+  queue locally instead of tripping the provider's limits;
+- bounded retries with decorrelated jitter on 408/409/429/5xx/529 and connection
+  errors, honoring the server's ``retry-after`` header;
+- a per-attempt timeout and an optional overall deadline.
+
+Environment:
+    LLM_RPM          Default requests/min per model (default: 4000)
+    LLM_TPM          Default input+output tokens/min per model (default: 400000)
+    LLM_RATE_LIMITS  JSON overrides by model, e.g. {"claude-sonnet-4-5-20250929": {"rpm": 50, "tpm": 30000}}
+    LLM_MAX_RETRIES  Retries after the first attempt (default: 4)
+    LLM_TIMEOUT      Seconds per attempt (default: 120)
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import anthropic
+
+from agents.usage import usage_to_dict
+from utils.metrics import LLM_REQUEST_SECONDS, LLM_RETRIES, LLM_TOKENS, QUEUE_WAIT_SECONDS, record_error
+
+# Rough characters-per-token ratio used to size requests for the limiter
+CHARS_PER_TOKEN = 4
+
+# OverloadedError (529) and ServiceUnavailableError (503) only exist in newer
+# SDKs and subclass APIStatusError directly, not InternalServerError
+RETRYABLE_ERRORS = tuple(
+    cls for cls in (
+        anthropic.RateLimitError,
+        anthropic.InternalServerError,
+        getattr(anthropic, "OverloadedError", None),
+        getattr(anthropic, "ServiceUnavailableError", None),
+        anthropic.APIConnectionError,
+    )
+    if cls is not None
+)
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call cannot complete (or be retried) before its deadline"""
+
+
+class TokenBucket:
+    """Continuously refilling bucket; reservations may go negative and wait it out"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` now and return how many seconds the caller must wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # A request bigger than the bucket waits for a full bucket, not forever
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def debit(self, amount: float) -> None:
+        """Charge tokens after the fact (e.g. output tokens once known)"""
+        with self._lock:
+            self.tokens -= amount
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """Approximate input tokens of a messages request from its text length"""
+    chars = 0
+    system = request.get("system")
+    if isinstance(system, str):
+        chars += len(system)
+    elif isinstance(system, list):
+        chars += sum(len(block.get("text", "")) for block in system if isinstance(block, dict))
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            chars += sum(len(block.get("text", "")) for block in content if isinstance(block, dict))
+    if request.get("tools"):
+        chars += len(json.dumps(request["tools"]))
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, overload, 5xx, request timeouts/conflicts and connection errors"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    return (
+        isinstance(error, anthropic.APIStatusError)
+        and isinstance(status, int)
+        and (status in RETRYABLE_STATUS_CODES or status >= 500)
+    )
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, if it said so"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class LLMGateway:
+    """Rate-limited, retrying front door for Anthropic clients (sync and async)"""
+
+    def __init__(
+        self,
+        default_rpm: Optional[float] = None,
+        default_tpm: Optional[float] = None,
+        model_limits: Optional[Dict[str, Dict[str, float]]] = None,
+        max_retries: Optional[int] = None,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        timeout: Optional[float] = None
+    ):
+        self.default_rpm = float(default_rpm or os.getenv("LLM_RPM", 4000))
+        self.default_tpm = float(default_tpm or os.getenv("LLM_TPM", 400000))
+        if model_limits is None:
+            model_limits = json.loads(os.getenv("LLM_RATE_LIMITS", "{}") or "{}")
+        self.model_limits = model_limits
+        self.max_retries = int(max_retries if max_retries is not None else os.getenv("LLM_MAX_RETRIES", 4))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = float(timeout or os.getenv("LLM_TIMEOUT", 120))
+        self.stats = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    # ---- limiter ----
+
+    def _limits_for(self, model: str) -> Dict[str, TokenBucket]:
+        with self._lock:
+            buckets = self._buckets.get(model)
+            if buckets is None:
+                limits = self.model_limits.get(model, {})
+                buckets = {
+                    "requests": TokenBucket(limits.get("rpm", self.default_rpm)),
+                    "tokens": TokenBucket(limits.get("tpm", self.default_tpm)),
+                }
+                self._buckets[model] = buckets
+            return buckets
+
+    def _reserve(self, request: Dict[str, Any]) -> float:
+        buckets = self._limits_for(request.get("model", "unknown"))
+        delay = max(
+            buckets["requests"].reserve(1),
+            buckets["tokens"].reserve(estimate_request_tokens(request)),
+        )
+        QUEUE_WAIT_SECONDS.observe(delay, queue="rate_limit")
+        if delay:
+            with self._lock:
+                self.stats["throttled_seconds"] += delay
+        return delay
+
+    def _settle(self, request: Dict[str, Any], response: Any, started: float) -> None:
+        """Charge output tokens to the model's tokens/min bucket and record the call"""
+        model = request.get("model", "unknown")
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, outcome="ok")
+        tokens = usage_to_dict(getattr(response, "usage", None))
+        for kind, count in tokens.items():
+            if count:
+                LLM_TOKENS.inc(count, model=model, kind=kind)
+        if tokens["output_tokens"]:
+            self._limits_for(model)["tokens"].debit(tokens["output_tokens"])
+
+    def _failed_attempt(self, request: Dict[str, Any], error: Exception, started: float, final: bool) -> None:
+        model = request.get("model", "unknown")
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, outcome="error")
+        if final:
+            self._count("failures")
+            record_error("llm_gateway", error, model=model)
+        else:
+            self._count("retries")
+            LLM_RETRIES.inc(model=model, error=type(error).__name__)
+
+    # ---- retry policy ----
+
+    def _next_delay(self, error: Exception, previous: float) -> float:
+        """Decorrelated jitter, overridden by the server's retry-after when present"""
+        server_delay = _retry_after(error)
+        if server_delay is not None:
+            return min(self.max_delay, server_delay + random.uniform(0, self.base_delay))
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+    def _check_deadline(self, deadline: Optional[float], wait: float) -> None:
+        if deadline is not None and time.monotonic() + wait >= deadline:
+            raise DeadlineExceeded("LLM call deadline exceeded")
+
+    def _attempt_timeout(self, timeout: Optional[float], deadline: Optional[float]) -> float:
+        attempt_timeout = timeout or self.timeout
+        if deadline is not None:
+            attempt_timeout = min(attempt_timeout, max(0.001, deadline - time.monotonic()))
+        return attempt_timeout
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _without_sdk_retries(client: Any) -> Any:
+        # The gateway owns the retry policy; stop the SDK retrying underneath it
+        # (pooled clients from agents.clients already have max_retries=0)
+        with_options = getattr(client, "with_options", None)
+        if not getattr(client, "max_retries", 0) or not callable(with_options):
+            return client
+        return with_options(max_retries=0)
+
+    # ---- sync ----
+
+    def create(
+        self,
+        client: Any,
+        request: Dict[str, Any],
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """
+        messages.create through the limiter and retry policy
+
+        Args:
+            client: anthropic.Anthropic (or compatible) client
+            request: messages.create keyword arguments
+            timeout: Seconds per attempt (defaults to the gateway timeout)
+            deadline: time.monotonic() value by which the call must finish
+        """
+        self._count("calls")
+        client = self._without_sdk_retries(client)
+        delay = self.base_delay
+
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(request)
+            self._check_deadline(deadline, wait)
+            if wait:
+                time.sleep(wait)
+
+            self._count("attempts")
+            started = time.perf_counter()
+            try:
+                response = client.messages.create(
+                    **request, timeout=self._attempt_timeout(timeout, deadline)
+                )
+                self._settle(request, response, started)
+                return response
+            except Exception as e:
+                final = not is_retryable(e) or attempt >= self.max_retries
+                self._failed_attempt(request, e, started, final)
+                if final:
+                    raise
+                delay = self._next_delay(e, delay)
+                self._check_deadline(deadline, delay)
+                time.sleep(delay)
+
+    # ---- async ----
+
+    async def acreate(
+        self,
+        client: Any,
+        request: Dict[str, Any],
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """Async counterpart of create() for anthropic.AsyncAnthropic clients"""
+        self._count("calls")
+        client = self._without_sdk_retries(client)
+        delay = self.base_delay
+
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(request)
+            self._check_deadline(deadline, wait)
+            if wait:
+                await asyncio.sleep(wait)
+
+            self._count("attempts")
+            started = time.perf_counter()
+            try:
+                response = await client.messages.create(
+                    **request, timeout=self._attempt_timeout(timeout, deadline)
+                )
+                self._settle(request, response, started)
+                return response
+            except Exception as e:
+                final = not is_retryable(e) or attempt >= self.max_retries
+                self._failed_attempt(request, e, started, final)
+                if final:
+                    raise
+                delay = self._next_delay(e, delay)
+                self._check_deadline(deadline, delay)
+                await asyncio.sleep(delay)
+
+    async def astream(
+        self,
+        client: Any,
+        request: Dict[str, Any],
+        on_text: Callable[[str], None],
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> Any:
+        """
+        messages.stream through the limiter; text deltas go to ``on_text``
+
+        A failed stream is only retried if no text has been delivered yet,
+        so callers never see duplicated output.
+        """
+        self._count("calls")
+        client = self._without_sdk_retries(client)
+        delay = self.base_delay
+
+        for attempt in range(self.max_retries + 1):
+            wait = self._reserve(request)
+            self._check_deadline(deadline, wait)
+            if wait:
+                await asyncio.sleep(wait)
+
+            self._count("attempts")
+            started = time.perf_counter()
+            delivered = False
+            try:
+                async with client.messages.stream(
+                    **request, timeout=self._attempt_timeout(timeout, deadline)
+                ) as stream:
+                    async for text in stream.text_stream:
+                        delivered = True
+                        on_text(text)
+                    response = await stream.get_final_message()
+                self._settle(request, response, started)
+                return response
+            except Exception as e:
+                final = not is_retryable(e) or delivered or attempt >= self.max_retries
+                self._failed_attempt(request, e, started, final)
+                if final:
+                    raise
+                delay = self._next_delay(e, delay)
+                self._check_deadline(deadline, delay)
+                await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway so every call site shares the same rate limits"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -0,0 +1,99 @@
+"""
+Content-addressed cache for persona critique responses
+
+Re-analyzing an unchanged slide with the same persona produces the same
+request, so the response can be served locally instead of paying for another
+LLM call. Entries are keyed by a hash of everything that shapes the response
+(persona system prompt, slide title/content/notes, round number, model and
+temperature) and live in an in-memory LRU, optionally backed by SQLite.
+
+Environment:
+    RESPONSE_CACHE_SIZE  In-memory entries (default: 512; 0 disables the cache)
+    RESPONSE_CACHE_TTL   Seconds an entry stays valid (default: 86400)
+    RESPONSE_CACHE_PATH  SQLite file for the on-disk tier (default: memory only)
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from utils.ttl_cache import TTLCache, SQLiteTTLCache
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache with hit/miss counters"""
+
+    def __init__(self, maxsize: int = 512, ttl: Optional[float] = 86400, path: Optional[str] = None):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SQLiteTTLCache(path, maxsize=maxsize * 20, ttl=ttl, table="responses") if path else None
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "writes": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(request: Dict[str, Any], round_number: int) -> str:
+        """Hash of a messages.create request plus the debate round it belongs to"""
+        material = {
+            "model": request.get("model"),
+            "temperature": request.get("temperature"),
+            "max_tokens": request.get("max_tokens"),
+            "system": request.get("system"),
+            "messages": request.get("messages"),
+            "round": round_number,
+        }
+        blob = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.memory.get(key)
+        from_disk = False
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                from_disk = True
+                self.memory.set(key, value)
+
+        with self._lock:
+            if value is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+                if from_disk:
+                    self.stats["disk_hits"] += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        with self._lock:
+            self.stats["writes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate_percent"] = round(stats["hits"] / lookups * 100, 1) if lookups else 0
+        stats["entries"] = len(self.memory)
+        return stats
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide ResponseCache configured from the environment (None if disabled)"""
+    global _cache
+    size = int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+    if size <= 0:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                maxsize=size,
+                ttl=float(os.getenv("RESPONSE_CACHE_TTL", 86400)),
+                path=os.getenv("RESPONSE_CACHE_PATH") or None
+            )
+        return _cache
@@ -0,0 +1,125 @@
+"""
+Token usage and prompt-cache accounting for Anthropic calls
+
+Every model call reports input, output, cache-creation and cache-read token
+counts. UsageTracker aggregates them per model, per phase and per persona so
+we can see which phase burns tokens and how much of the prompt is actually
+served from Anthropic's prompt cache.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+TOKEN_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+# Prompt-cache pricing relative to the base input-token price
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+
+def usage_to_dict(usage: Any) -> Dict[str, int]:
+    """Normalize an Anthropic ``usage`` object (or dict) to plain token counts"""
+    if usage is None:
+        return {field: 0 for field in TOKEN_FIELDS}
+    if isinstance(usage, dict):
+        return {field: int(usage.get(field) or 0) for field in TOKEN_FIELDS}
+    return {field: int(getattr(usage, field, 0) or 0) for field in TOKEN_FIELDS}
+
+
+def _empty_bucket() -> Dict[str, int]:
+    bucket = {"calls": 0}
+    bucket.update({field: 0 for field in TOKEN_FIELDS})
+    return bucket
+
+
+def _with_ratios(bucket: Dict[str, int]) -> Dict[str, Any]:
+    """Add cached-token ratio and input-cost savings to a token bucket"""
+    prompt_tokens = (
+        bucket["input_tokens"]
+        + bucket["cache_creation_input_tokens"]
+        + bucket["cache_read_input_tokens"]
+    )
+    result: Dict[str, Any] = dict(bucket)
+    result["prompt_tokens"] = prompt_tokens
+    if prompt_tokens:
+        result["cached_token_ratio"] = round(bucket["cache_read_input_tokens"] / prompt_tokens, 4)
+        saved = (
+            bucket["cache_read_input_tokens"] * (1 - CACHE_READ_MULTIPLIER)
+            - bucket["cache_creation_input_tokens"] * (CACHE_WRITE_MULTIPLIER - 1)
+        )
+        result["input_cost_savings_percent"] = round(saved / prompt_tokens * 100, 1)
+    else:
+        result["cached_token_ratio"] = 0.0
+        result["input_cost_savings_percent"] = 0.0
+    return result
+
+
+class UsageTracker:
+    """Thread-safe aggregation of per-call token usage"""
+
+    def __init__(self, keep_calls: bool = True, parent: Optional["UsageTracker"] = None):
+        """
+        Args:
+            keep_calls: Keep every recorded call (per-request trackers); the
+                process-wide tracker only keeps aggregates
+            parent: Tracker that also receives every recorded call
+        """
+        self.keep_calls = keep_calls
+        self.parent = parent
+        self.calls: List[Dict[str, Any]] = []
+        self._totals = _empty_bucket()
+        self._by_model: Dict[str, Dict[str, int]] = {}
+        self._by_phase: Dict[str, Dict[str, int]] = {}
+        self._by_persona: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, phase: str, usage: Any, persona_id: Optional[str] = None) -> Dict[str, int]:
+        """Record one call's usage and return the normalized token counts"""
+        tokens = usage_to_dict(usage)
+        with self._lock:
+            buckets = [
+                self._totals,
+                self._by_model.setdefault(model or "unknown", _empty_bucket()),
+                self._by_phase.setdefault(phase, _empty_bucket()),
+            ]
+            if persona_id:
+                buckets.append(self._by_persona.setdefault(persona_id, _empty_bucket()))
+            for bucket in buckets:
+                bucket["calls"] += 1
+                for field in TOKEN_FIELDS:
+                    bucket[field] += tokens[field]
+            if self.keep_calls:
+                self.calls.append({"model": model, "phase": phase, "persona_id": persona_id, **tokens})
+
+        if self.parent is not None:
+            self.parent.record(model, phase, tokens, persona_id)
+        return tokens
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            return _with_ratios(dict(self._totals))
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals plus per-model, per-phase and per-persona breakdowns"""
+        with self._lock:
+            summary = {
+                "totals": _with_ratios(dict(self._totals)),
+                "by_model": {k: _with_ratios(dict(v)) for k, v in self._by_model.items()},
+                "by_phase": {k: _with_ratios(dict(v)) for k, v in self._by_phase.items()},
+                "by_persona": {k: _with_ratios(dict(v)) for k, v in self._by_persona.items()},
+            }
+            if self.keep_calls:
+                summary["calls"] = [dict(c) for c in self.calls]
+        return summary
+
+
+_tracker = UsageTracker(keep_calls=False)
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Process-wide tracker that every engine's tracker reports into"""
+    return _tracker
@@ -2,32 +2,49 @@
 FastAPI wrapper around the existing pitch-deck-debater logic so a Next.js frontend
 can call it over HTTP. This keeps the same flows as the Streamlit UI:
 - List personas
-- Upload PPTX to parse slides and compute a summary
+- Upload PPTX to parse slides and compute a summary (kept server-side under a deck_id)
 - Analyze a selected slide with selected personas (individual + collaborative + synthesis)
+- Stream the same analysis as Server-Sent Events while each phase completes
+- Analyze a whole deck (or a subset of slides) concurrently in one request
+- Diff revised uploads against the previous version and reuse analyses of unchanged slides
+- Run analyses and report/deck generation as background jobs (poll or cancel)
 
 Run locally:
   uvicorn api_server:app --reload --port 8000
 
 The Next.js app is configured to proxy /api/python/* to http://localhost:8000/*.
 """
-from typing import List, Dict, Any
-import io
+from typing import List, Dict, Any, Optional
+import asyncio
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
 from agents.personas import (
     get_persona,
     get_all_personas,
     get_personas_by_category,
 )
-from agents.debate_engine import DebateEngine
-from utils.deck_parser import parse_deck, get_deck_summary, classify_deck_type
+from agents.debate_engine import AsyncDebateEngine
+from agents.llm_gateway import get_llm_gateway
+from agents.usage import get_usage_tracker
+from utils.deck_analytics import analyze_slides
+from utils.deck_parser import parse_deck
+from utils.deck_context import build_deck_context
+from utils.deck_diff import analysis_complete, analysis_key, carry_over_analyses, diff_decks
+from utils.deck_store import get_deck_store
+from utils.deck_generator import DeckGenerator
+from utils.jobs import JobContext, JobFile, JobQueueFull, get_job_manager
+from utils.metrics import REGISTRY
+from utils.uploads import UploadLimitMiddleware, spooled_upload
+from utils.report_generator import ReportGenerator
 from utils.tts_engine_edge import generate_audio_edge
 
 
@@ -42,6 +59,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Reject oversized decks with 413 (UPLOAD_MAX_BYTES) before they are spooled
+app.add_middleware(UploadLimitMiddleware, paths=("/upload",))
 
 
 @app.get("/health")
@@ -49,6 +68,20 @@ def health() -> Dict[str, Any]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Latency, queue-wait, token and error metrics in Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/usage")
+def usage_metrics() -> Dict[str, Any]:
+    """Token and prompt-cache usage, plus rate-limit/retry counters, since startup"""
+    summary = get_usage_tracker().summary()
+    summary["gateway"] = get_llm_gateway().get_stats()
+    return summary
+
+
 @app.get("/personas")
 def personas() -> Dict[str, Any]:
     ids = get_all_personas()
@@ -71,21 +104,52 @@ def personas() -> Dict[str, Any]:
 
 
 class UploadResponse(BaseModel):
+    deck_id: str
     slides: List[Dict[str, Any]]
     summary: Dict[str, Any]
     deck_type: str
+    # Extra statistics, keyword hits and per-category matches (utils.deck_analytics)
+    analytics: Optional[Dict[str, Any]] = None
+    # Set when the upload is a revision of previous_deck_id
+    previous_deck_id: Optional[str] = None
+    diff: Optional[Dict[str, Any]] = None
+
+
+def _stored_deck(deck_id: str) -> Dict[str, Any]:
+    deck = get_deck_store().get(deck_id)
+    if deck is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired deck_id; upload the deck again")
+    return deck
 
 
 @app.post("/upload", response_model=UploadResponse)
-async def upload(file: UploadFile = File(...)):
+async def upload(file: UploadFile = File(...), previous_deck_id: Optional[str] = Form(None)):
+    """
+    Parse a deck and store it under a new deck_id. Pass the deck_id of the
+    previous version as the previous_deck_id form field to get a slide diff
+    and carry over analyses of unchanged slides.
+    """
     if not file.filename.lower().endswith(".pptx"):
         raise HTTPException(status_code=400, detail="Only .pptx files are supported")
+    previous = _stored_deck(previous_deck_id) if previous_deck_id else None
+    deck_file = spooled_upload(file)
     try:
-        data = await file.read()
-        slides = parse_deck(io.BytesIO(data))
-        summary = get_deck_summary(slides)
-        deck_type = classify_deck_type(slides)
-        return UploadResponse(slides=slides, summary=summary, deck_type=deck_type)
+        # Parsed straight from the spooled upload, off the event loop
+        slides = await asyncio.to_thread(parse_deck, deck_file)
+        analytics = analyze_slides(slides)
+        summary, deck_type = analytics["summary"], analytics["deck_type"]
+        deck_context = build_deck_context(slides, summary, deck_type)
+        diff = diff_decks(previous["slides"], slides) if previous else None
+        deck_id = get_deck_store().put(
+            slides, summary, deck_type, filename=file.filename, deck_context=deck_context,
+            previous_deck_id=previous_deck_id,
+            analyses=carry_over_analyses(previous, slides) if previous else None
+        )
+        return UploadResponse(
+            deck_id=deck_id, slides=slides, summary=summary, deck_type=deck_type,
+            analytics={k: analytics[k] for k in ("stats", "keyword_hits", "category_matches")},
+            previous_deck_id=previous_deck_id, diff=diff
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -93,54 +157,381 @@ async def upload(file: UploadFile = File(...)):
 class AnalyzeRequest(BaseModel):
     slide_index: int
     personas: List[str]
-    slides: List[Dict[str, Any]]
-    deck_type: str = "AI/ML Platform"
+    deck_id: Optional[str] = None
+    slides: Optional[List[Dict[str, Any]]] = None
+    deck_type: Optional[str] = None
+    # Skip the local critique cache and force fresh LLM calls
+    bypass_cache: bool = False
+
+
+class DeckDiffRequest(BaseModel):
+    deck_id: str
+    previous_deck_id: str
+
+
+@app.post("/decks/diff")
+def deck_diff(req: DeckDiffRequest) -> Dict[str, Any]:
+    """
+    Compare two uploaded versions of a deck: unchanged, modified, added and
+    removed slides (by slide number in each version)
+    """
+    previous = _stored_deck(req.previous_deck_id)
+    current = _stored_deck(req.deck_id)
+    return {
+        "deck_id": req.deck_id,
+        "previous_deck_id": req.previous_deck_id,
+        **diff_decks(previous["slides"], current["slides"]),
+    }
+
+
+def _resolve_deck(deck_id: Optional[str], slides: Optional[List[Dict[str, Any]]], deck_type: Optional[str]):
+    """
+    Return (slides, deck_type, deck_context) for a request that carries either
+    a deck_id from /upload or the full slides list. The deck context is the
+    one built at upload, or built here from the posted slides.
+    """
+    if deck_id:
+        deck = _stored_deck(deck_id)
+        deck_context = deck.get("deck_context") or build_deck_context(deck["slides"], deck["summary"], deck["deck_type"])
+        return deck["slides"], deck_type or deck["deck_type"], deck_context
+
+    if not isinstance(slides, list) or not slides:
+        raise HTTPException(status_code=400, detail="Missing or invalid slides in payload")
+    deck_type = deck_type or "AI/ML Platform"
+    return slides, deck_type, build_deck_context(slides, deck_type=deck_type)
+
+
+def _selected_slide(req: AnalyzeRequest):
+    """Validate an analyze payload and return (slide, deck_type, deck_context)"""
+    slides, deck_type, deck_context = _resolve_deck(req.deck_id, req.slides, req.deck_type)
+    if req.slide_index < 0 or req.slide_index >= len(slides):
+        raise HTTPException(status_code=400, detail="slide_index out of range")
+    if not req.personas:
+        raise HTTPException(status_code=400, detail="No personas selected")
+
+    return slides[req.slide_index], deck_type, deck_context
 
 
 @app.post("/analyze")
-def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
+async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
     """
     Analyze a single slide with selected personas. The caller must POST JSON like:
       {
         "slide_index": 0,
         "personas": ["ai_architect", "data_science_lead"],
-        "slides": [...same structure returned from /upload...],
+        "deck_id": "...deck_id returned from /upload...",
         "deck_type": "AI/ML Platform"
       }
+    Instead of deck_id, the full "slides" list returned from /upload can be sent.
+    With a deck_id, an analysis of the same slide content, personas and deck
+    type (from this deck or a previous revision) is returned as stored, with
+    "reused": true and zeroed cache_stats/usage, unless bypass_cache is set.
+    Analyses where any model call failed are not stored.
     """
-    if not isinstance(req.slides, list) or not req.slides:
-        raise HTTPException(status_code=400, detail="Missing or invalid slides in payload")
-    if req.slide_index < 0 or req.slide_index >= len(req.slides):
-        raise HTTPException(status_code=400, detail="slide_index out of range")
-    if not req.personas:
-        raise HTTPException(status_code=400, detail="No personas selected")
-
-    slide = req.slides[req.slide_index]
+    slide, deck_type, deck_context = _selected_slide(req)
+    key = analysis_key(slide, req.personas, deck_type)
+    stored = _stored_analyses(req.deck_id, req.bypass_cache).get(key)
 
     try:
-        engine = DebateEngine()
-
-        # Phase 1: Individual critiques
-        debate_round = engine.create_debate_round(slide, req.personas, 1)
-
-        # Phase 2: Collaborative debate
-        collab = engine.collaborative_debate_round(debate_round, req.deck_type)
-
-        # Phase 3: Synthesis
-        synthesis = engine.synthesize_feedback(debate_round, req.deck_type)
+        engine = AsyncDebateEngine(bypass_cache=req.bypass_cache, deck_profile=deck_context)
+        if stored is not None:
+            # Same shape as a fresh run; the engine made no calls, so its
+            # cache stats and usage are zero
+            return {
+                **stored,
+                "reused": True,
+                "cache_stats": engine.get_cache_efficiency(),
+                "usage": engine.get_usage(),
+            }
+
+        # Phase 1 (individual critiques) feeds phases 2 (collaborative debate)
+        # and 3 (synthesis), which run concurrently
+        analysis = await engine.analyze_slide(slide, req.personas, deck_type)
+        if req.deck_id and analysis_complete(analysis):
+            get_deck_store().add_analyses(req.deck_id, {key: analysis})
 
         cache_stats = engine.get_cache_efficiency()
 
         return {
-            "debate_round": debate_round,
-            "collaborative_debate": collab,
-            "synthesis": synthesis,
+            **analysis,
+            "reused": False,
             "cache_stats": cache_stats,
+            "usage": engine.get_usage(),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class AnalyzeStreamRequest(AnalyzeRequest):
+    stream_tokens: bool = False
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(req: AnalyzeStreamRequest):
+    """
+    Same analysis as /analyze, delivered as Server-Sent Events: one `critique`
+    event per persona as soon as it finishes, then `debate_round`,
+    `collaborative_debate`, `synthesis` and finally `done` (or `error`).
+    Set "stream_tokens": true to also receive raw `token` deltas.
+    """
+    slide, deck_type, deck_context = _selected_slide(req)
+    engine = AsyncDebateEngine(bypass_cache=req.bypass_cache, deck_profile=deck_context)
+
+    async def events():
+        async for event, data in engine.stream_analysis(
+            slide, req.personas, deck_type, stream_tokens=req.stream_tokens
+        ):
+            yield _sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class AnalyzeDeckRequest(BaseModel):
+    personas: List[str]
+    deck_id: Optional[str] = None
+    slides: Optional[List[Dict[str, Any]]] = None
+    slide_indices: Optional[List[int]] = None
+    deck_type: Optional[str] = None
+    max_concurrency: Optional[int] = None
+    bypass_cache: bool = False
+
+
+def _selected_deck(req: AnalyzeDeckRequest):
+    """Validate an analyze/deck payload and return (slides, deck_type, deck_context)"""
+    slides, deck_type, deck_context = _resolve_deck(req.deck_id, req.slides, req.deck_type)
+    if not req.personas:
+        raise HTTPException(status_code=400, detail="No personas selected")
+    if req.slide_indices is not None and any(i < 0 or i >= len(slides) for i in req.slide_indices):
+        raise HTTPException(status_code=400, detail="slide_indices out of range")
+    if req.max_concurrency is not None and req.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency must be at least 1")
+
+    return slides, deck_type, deck_context
+
+
+def _stored_analyses(deck_id: Optional[str], bypass_cache: bool) -> Dict[str, Dict[str, Any]]:
+    """Complete analyses kept on the deck record (none for posted slides or when bypassing caches)"""
+    if not deck_id or bypass_cache:
+        return {}
+    deck = get_deck_store().get(deck_id)
+    return {
+        key: analysis
+        for key, analysis in ((deck or {}).get("analyses") or {}).items()
+        if analysis_complete(analysis)
+    }
+
+
+async def _analyze_deck_reusing(
+    req: AnalyzeDeckRequest,
+    slides: List[Dict[str, Any]],
+    deck_type: str,
+    deck_context: Dict[str, Any],
+    on_result=None
+) -> Dict[str, Any]:
+    """
+    AsyncDebateEngine.analyze_deck over the selected slides that have no
+    stored analysis; the rest are served from the deck record (listed under
+    "reused") and new complete analyses are stored for the next revision
+    """
+    indices = range(len(slides)) if req.slide_indices is None else req.slide_indices
+    stored = _stored_analyses(req.deck_id, req.bypass_cache)
+    reused: Dict[str, Dict[str, Any]] = {}
+    to_run: List[int] = []
+    for i in dict.fromkeys(indices):
+        analysis = stored.get(analysis_key(slides[i], req.personas, deck_type))
+        if analysis is None:
+            to_run.append(i)
+        else:
+            reused[str(slides[i]["number"])] = analysis
+            if on_result is not None:
+                on_result(str(slides[i]["number"]), analysis)
+
+    engine = AsyncDebateEngine(
+        max_inflight=req.max_concurrency,
+        bypass_cache=req.bypass_cache,
+        deck_profile=deck_context
+    )
+    outcome = await engine.analyze_deck(slides, req.personas, deck_type, to_run, on_result=on_result)
+
+    if req.deck_id:
+        complete: Dict[str, Dict[str, Any]] = {}
+        for i in to_run:
+            analysis = outcome["results"].get(str(slides[i]["number"]))
+            if analysis is not None and analysis_complete(analysis):
+                complete[analysis_key(slides[i], req.personas, deck_type)] = analysis
+        get_deck_store().add_analyses(req.deck_id, complete)
+    merged = {**reused, **outcome["results"]}
+    outcome["results"] = {
+        str(slides[i]["number"]): merged[str(slides[i]["number"])]
+        for i in dict.fromkeys(indices)
+        if str(slides[i]["number"]) in merged
+    }
+    outcome["reused"] = list(reused)
+    return outcome
+
+
+@app.post("/analyze/deck")
+async def analyze_deck(req: AnalyzeDeckRequest) -> Dict[str, Any]:
+    """
+    Analyze every slide (or only `slide_indices`) in one request. Slides run
+    concurrently; model calls in flight across all slides and personas are
+    capped at the connection pool size, and `max_concurrency` can lower that
+    cap. Results are keyed by slide number. With a deck_id,
+    slides whose content was already analyzed with the same personas (in this
+    deck or a previous revision) are reused instead of re-run; their numbers
+    are listed under "reused".
+    """
+    slides, deck_type, deck_context = _selected_deck(req)
+
+    try:
+        return await _analyze_deck_reusing(req, slides, deck_type, deck_context)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+JOB_KINDS = ("analyze", "analyze_deck", "report", "deck")
+
+
+class JobRequest(BaseModel):
+    kind: str
+    # Body of the matching endpoint: AnalyzeRequest for "analyze",
+    # AnalyzeDeckRequest for "analyze_deck", GenerateRequest for "report"/"deck"
+    params: Dict[str, Any]
+
+
+class GenerateRequest(BaseModel):
+    debate_results: Dict[str, Any]
+
+
+def _parse_params(model, params: Dict[str, Any]):
+    try:
+        return model(**params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
+
+def _analyze_job(req: AnalyzeRequest):
+    slide, deck_type, deck_context = _selected_slide(req)
+
+    async def run(ctx: JobContext) -> Dict[str, Any]:
+        engine = AsyncDebateEngine(bypass_cache=req.bypass_cache, deck_profile=deck_context)
+        critiques: List[Dict[str, Any]] = []
+        result: Dict[str, Any] = {}
+        async for event, data in engine.stream_analysis(slide, req.personas, deck_type):
+            if event == "error":
+                raise RuntimeError(data["error"])
+            if event == "critique":
+                critiques.append(data)
+                ctx.update(critiques=critiques)
+            elif event == "done":
+                result.update(data)
+            else:
+                result[event] = data
+                ctx.update(**{event: data})
+        return result
+
+    return run
+
+
+def _analyze_deck_job(req: AnalyzeDeckRequest):
+    slides, deck_type, deck_context = _selected_deck(req)
+
+    async def run(ctx: JobContext) -> Dict[str, Any]:
+        finished: Dict[str, Dict[str, Any]] = {}
+
+        def on_result(slide_number: str, analysis: Dict[str, Any]) -> None:
+            finished[slide_number] = analysis
+            ctx.update(results=finished)
+
+        return await _analyze_deck_reusing(req, slides, deck_type, deck_context, on_result=on_result)
+
+    return run
+
+
+def _generate_job(generator_class, filename: str, media_type: str, req: GenerateRequest):
+    async def run(ctx: JobContext) -> JobFile:
+        # Generation is sync (reportlab/python-pptx plus blocking model calls)
+        content = await asyncio.to_thread(generator_class().generate, req.debate_results)
+        return JobFile(content, filename, media_type)
+
+    return run
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(req: JobRequest) -> Dict[str, Any]:
+    """
+    Run an analysis or report/deck generation in the background. Poll
+    GET /jobs/{job_id} for status and partial results; DELETE cancels.
+      {"kind": "analyze", "params": {...same body as /analyze...}}
+      {"kind": "analyze_deck", "params": {...same body as /analyze/deck...}}
+      {"kind": "report" | "deck", "params": {"debate_results": {...}}}
+    """
+    if req.kind == "analyze":
+        runner = _analyze_job(_parse_params(AnalyzeRequest, req.params))
+    elif req.kind == "analyze_deck":
+        runner = _analyze_deck_job(_parse_params(AnalyzeDeckRequest, req.params))
+    elif req.kind == "report":
+        runner = _generate_job(ReportGenerator, "pitch_deck_report.pdf", "application/pdf",
+                               _parse_params(GenerateRequest, req.params))
+    elif req.kind == "deck":
+        runner = _generate_job(
+            DeckGenerator, "improved_pitch_deck.pptx",
+            "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            _parse_params(GenerateRequest, req.params)
+        )
+    else:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(JOB_KINDS)}")
+
+    try:
+        return get_job_manager().submit(req.kind, req.params, runner)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"{e}; retry later")
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return job
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """Download a finished report/deck job's file"""
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    result = manager.get_file(job_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job has no file result; see GET /jobs/{job_id}")
+    return Response(
+        content=result.content,
+        media_type=result.media_type,
+        headers={"Content-Disposition": f"attachment; filename={result.filename}"}
+    )
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a queued or running job (in-flight model calls of analysis jobs are cancelled too)"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return job
+
+
 class TTSRequest(BaseModel):
     text: str
     persona_id: str
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the analyze/report/deck pipeline (run: python -m benchmarks.run)
+"""
@@ -0,0 +1,301 @@
+"""
+End-to-end benchmarks on the offline stub LLM backend (no network, no tokens)
+
+Suites:
+    parse       parse_deck on synthetic 10/100/1000-slide decks
+    fanout      DebateEngine.create_debate_round across persona counts and concurrency limits
+    api         /upload and /analyze throughput through an in-process ASGI client
+    generators  ReportGenerator.generate and DeckGenerator.generate time and peak memory
+
+Usage (from pitch-deck-debater/):
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --suite parse --suite fanout --latency 0.05
+
+Results are one JSON document: ``meta`` (versions, commit, settings) and one
+entry per suite, so runs can be diffed across releases.
+"""
+import os
+
+# Offline, unthrottled and uncached unless the caller overrides it; set before
+# anything reads these settings
+os.environ.setdefault("LLM_BACKEND", "stub")
+os.environ.setdefault("LLM_RPM", str(10 ** 9))
+os.environ.setdefault("LLM_TPM", str(10 ** 12))
+os.environ.setdefault("RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("DECK_STORE_BACKEND", "memory")
+os.environ.setdefault("ANTHROPIC_API_KEY", "offline-benchmark")
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.coordinator import DebateCoordinator, _recommendations_cache
+from agents.debate_engine import DebateEngine
+from agents.llm_backends import offline_client
+from agents.personas import get_all_personas
+from benchmarks.synthetic import build_debate_results, build_pptx, build_slide
+from utils.deck_generator import DeckGenerator
+from utils.deck_parser import parse_deck
+from utils.report_generator import ReportGenerator
+
+SUITES = ("parse", "fanout", "api", "generators")
+
+
+def timings(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Wall-clock statistics over ``repeat`` calls of ``fn``"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min_s": round(min(samples), 6),
+        "median_s": round(statistics.median(samples), 6),
+        "mean_s": round(statistics.mean(samples), 6),
+        "max_s": round(max(samples), 6),
+    }
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated by Python during one call of ``fn`` (separate from timing runs)"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ---- suites ----
+
+def bench_parse(sizes: List[int], repeat: int, workers: int = 1, backend: str = "pptx") -> List[Dict[str, Any]]:
+    results = []
+    for size in sizes:
+        data = build_pptx(size)
+        run = lambda: parse_deck(io.BytesIO(data), workers=workers, backend=backend)
+        stats = timings(run, repeat)
+        results.append({
+            "slides": size,
+            "backend": backend,
+            "workers": workers,
+            "pptx_bytes": len(data),
+            **stats,
+            "slides_per_s": round(size / stats["median_s"], 1),
+            "peak_memory_bytes": peak_memory(run),
+        })
+    return results
+
+
+def bench_fanout(
+    persona_counts: List[int],
+    concurrency: List[int],
+    latency: float,
+    repeat: int
+) -> List[Dict[str, Any]]:
+    all_personas = get_all_personas()
+    slide = build_slide()
+    results = []
+    for count in persona_counts:
+        personas = (all_personas * (count // len(all_personas) + 1))[:count]
+        for limit in concurrency:
+            engine = DebateEngine(
+                client=offline_client("stub", latency=f"fixed:{latency}"),
+                max_concurrency=limit,
+                bypass_cache=True
+            )
+            stats = timings(lambda: engine.create_debate_round(slide, personas, max_concurrency=limit), repeat)
+            results.append({
+                "personas": count,
+                "max_concurrency": limit,
+                "llm_latency_s": latency,
+                **stats,
+                # Time beyond the ideal ceil(personas / limit) * latency
+                "overhead_s": round(stats["median_s"] - -(-count // limit) * latency, 6),
+            })
+    return results
+
+
+async def _api_load(
+    make_request: Callable[[Any], Any],
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Fire ``requests`` calls with at most ``concurrency`` in flight; latency and status stats"""
+    import httpx
+    from api_server import app
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await make_request(client)
+                latencies.append(time.perf_counter() - start)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        wall = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 6),
+        "requests_per_s": round(requests / wall, 2),
+        "p50_s": round(percentile(latencies, 50), 6),
+        "p95_s": round(percentile(latencies, 95), 6),
+        "max_s": round(max(latencies), 6),
+        "status_codes": statuses,
+    }
+
+
+def bench_api(requests: int, concurrency: int, upload_slides: int, personas: int) -> Dict[str, Any]:
+    deck = build_pptx(upload_slides)
+    persona_ids = get_all_personas()[:personas]
+
+    async def upload(client):
+        files = {"file": ("bench.pptx", deck, "application/vnd.openxmlformats-officedocument.presentationml.presentation")}
+        return await client.post("/upload", files=files)
+
+    async def run() -> Dict[str, Any]:
+        upload_stats = await _api_load(upload, requests, concurrency)
+
+        import httpx
+        from api_server import app
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            deck_id = (await upload(client)).json()["deck_id"]
+
+        async def analyze(client):
+            return await client.post("/analyze", json={
+                "slide_index": 0,
+                "personas": persona_ids,
+                "deck_id": deck_id,
+                "bypass_cache": True,
+            })
+
+        analyze_stats = await _api_load(analyze, requests, concurrency)
+        return {
+            "upload": {"slides": upload_slides, **upload_stats},
+            "analyze": {"personas": len(persona_ids), **analyze_stats},
+        }
+
+    return asyncio.run(run())
+
+
+def bench_generators(slide_counts: List[int], latency: float, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for count in slide_counts:
+        debate_results = build_debate_results(count)
+        client = offline_client("stub", latency=f"fixed:{latency}")
+        coordinator = DebateCoordinator(client=client)
+        report = ReportGenerator(coordinator=coordinator)
+        deck = DeckGenerator(coordinator=coordinator, client=client)
+
+        def fresh(generate: Callable[[Dict[str, Any]], bytes]) -> Callable[[], bytes]:
+            # Every run pays for recommendation extraction, as a new debate would
+            def run() -> bytes:
+                _recommendations_cache.clear()
+                return generate(debate_results)
+            return run
+
+        for name, generate in (("report", report.generate), ("deck", deck.generate)):
+            run = fresh(generate)
+            results.append({
+                "generator": name,
+                "slides": count,
+                "llm_latency_s": latency,
+                "output_bytes": len(run()),
+                **timings(run, repeat),
+                "peak_memory_bytes": peak_memory(run),
+            })
+    return results
+
+
+# ---- driver ----
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Benchmark the pitch-deck-debater pipeline offline")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency per call in seconds")
+    parser.add_argument("--parse-sizes", type=_ints, default=[10, 100, 1000])
+    parser.add_argument("--parse-workers", type=int, default=1, help="parse_deck worker processes (pool mode for large decks)")
+    parser.add_argument("--parse-backend", choices=("pptx", "ooxml"), default="pptx")
+    parser.add_argument("--personas", type=_ints, default=[1, 3, 6, 12])
+    parser.add_argument("--concurrency", type=_ints, default=[1, 3, 6])
+    parser.add_argument("--api-requests", type=int, default=50)
+    parser.add_argument("--api-concurrency", type=int, default=10)
+    parser.add_argument("--generator-slides", type=_ints, default=[10, 50])
+    args = parser.parse_args(argv)
+
+    # The API suite builds its engines from the environment
+    os.environ.setdefault("LLM_SYNTHETIC_LATENCY", f"fixed:{args.latency}")
+    suites = args.suite or list(SUITES)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "llm_backend": os.environ["LLM_BACKEND"],
+            "llm_latency_s": args.latency,
+            "repeat": args.repeat,
+        }
+    }
+
+    if "parse" in suites:
+        report["parse"] = bench_parse(args.parse_sizes, args.repeat, args.parse_workers, args.parse_backend)
+    if "fanout" in suites:
+        report["fanout"] = bench_fanout(args.personas, args.concurrency, args.latency, args.repeat)
+    if "api" in suites:
+        report["api"] = bench_api(args.api_requests, args.api_concurrency, upload_slides=10, personas=3)
+    if "generators" in suites:
+        report["generators"] = bench_generators(args.generator_slides, args.latency, args.repeat)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Synthetic pitch decks and debate results for benchmarks
+"""
+import io
+from typing import Any, Dict, List
+
+from pptx import Presentation
+
+from agents.personas import get_all_personas
+from utils.deck_parser import slide_content_hash
+
+SECTIONS = (
+    "Problem", "Solution", "Why Now", "AI Architecture", "Data Strategy", "Market",
+    "Business Model", "Traction", "Go-to-Market", "Competition", "Team", "Financials", "Ask",
+)
+
+
+def build_pptx(num_slides: int, bullets: int = 5, with_notes: bool = True) -> bytes:
+    """A .pptx with a title and bulleted body (plus speaker notes) on every slide"""
+    prs = Presentation()
+    layout = prs.slide_layouts[1]  # Title and Content
+
+    for i in range(num_slides):
+        section = SECTIONS[i % len(SECTIONS)]
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"{section} ({i + 1})"
+        body = slide.placeholders[1].text_frame
+        body.text = f"Our {section.lower()} uses a proprietary machine learning model with 95% accuracy"
+        for b in range(1, bullets):
+            body.add_paragraph().text = (
+                f"Point {b}: $ {10 * b}M ARR, {b * 7}% month-over-month growth, "
+                f"{b * 3} enterprise customers on our data platform"
+            )
+        if with_notes:
+            slide.notes_slide.notes_text_frame.text = (
+                f"Walk through the {section.lower()} and explain the inference cost per request."
+            )
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def build_slide(number: int = 1) -> Dict[str, Any]:
+    """One parsed slide, shaped like parse_deck output"""
+    section = SECTIONS[(number - 1) % len(SECTIONS)]
+    slide = {
+        "number": number,
+        "title": f"{section} ({number})",
+        "content": f"Our {section.lower()} uses a proprietary model with 95% accuracy\n\n$10M ARR",
+        "notes": "Explain the inference cost per request.",
+        "shape_count": 2,
+        "layout_name": "Title and Content",
+    }
+    slide["content_hash"] = slide_content_hash(slide)
+    return slide
+
+
+def build_debate_results(num_slides: int, rounds: int = 2) -> Dict[str, Any]:
+    """Debate results in the shape ReportGenerator and DeckGenerator consume"""
+    personas = get_all_personas()
+    return {
+        "deck_content": {
+            "metadata": {"title": f"Synthetic deck ({num_slides} slides)"},
+            "slides": [
+                {
+                    "slide_number": i,
+                    "title": f"{SECTIONS[(i - 1) % len(SECTIONS)]} ({i})",
+                    "content": ["Proprietary model with 95% accuracy", "$10M ARR", "3 enterprise pilots"],
+                }
+                for i in range(1, num_slides + 1)
+            ],
+        },
+        "rounds": [
+            [
+                {
+                    "persona": persona_id,
+                    "role": "Expert",
+                    "analysis": f"Round {r} view from {persona_id}: the accuracy claim needs a baseline. " * 8,
+                }
+                for persona_id in personas
+            ]
+            for r in range(1, rounds + 1)
+        ],
+        "synthesis": "Overall score 6/10. The deck is promising but unsupported claims weaken it. " * 20,
+        "total_rounds": rounds,
+        "status": "completed",
+    }
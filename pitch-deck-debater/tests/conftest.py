@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modules import each other as top-level packages (agents, utils), as when
+# the server runs from pitch-deck-debater/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
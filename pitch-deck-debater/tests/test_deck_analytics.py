@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from utils import deck_analytics
+from utils.deck_analytics import DEFAULT_TAXONOMY, KeywordMatcher, analyze_slides, classify
+from utils.deck_parser import classify_deck_type, get_deck_summary, parse_deck
+from benchmarks.synthetic import build_pptx
+
+
+def slide(number, title, content, notes=""):
+    return {"number": number, "title": title, "content": content, "notes": notes}
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(["ai", "model", "data", "machine learning", "neural network"])
+
+
+def test_keywords_match_whole_words_only(matcher):
+    assert matcher.count("we maintain our email pipeline") == {}
+    assert matcher.count("metadata and datasets") == {}
+    assert matcher.count("ai, ai. (ai) ai-first") == {"ai": 4}
+
+
+def test_plural_s_matches_but_other_suffixes_do_not(matcher):
+    assert matcher.count("one model, two models") == {"model": 2}
+    assert matcher.count("modeling and modelled") == {}
+
+
+def test_phrases_match_across_any_whitespace(matcher):
+    hits = matcher.count("machine learning, machine\n  learning and machine\tlearnings")
+    assert hits == {"machine learning": 3}
+
+
+def test_phrases_need_whole_words(matcher):
+    assert matcher.count("neural networking and machine learningx") == {}
+
+
+def test_keyword_normalization():
+    m = KeywordMatcher(["  Machine   Learning ", "AI", ""])
+    assert m.keywords == ["machine learning", "ai"]
+    assert m.count("machine learning ai") == {"machine learning": 1, "ai": 1}
+    assert KeywordMatcher([]).count("anything") == {}
+
+
+def test_keywords_do_not_span_slides():
+    slides = [slide(1, "Machine", "We use machine"), slide(2, "Learning", "learning from data")]
+    hits = analyze_slides(slides)["keyword_hits"]
+    assert "machine learning" not in hits
+    assert hits["data"] == 1
+
+
+def test_matching_is_case_insensitive_over_titles_and_content():
+    hits = analyze_slides([slide(1, "Our AI Model", "Proprietary DATA")])["keyword_hits"]
+    assert hits == {"ai": 1, "model": 1, "data": 1}
+
+
+@pytest.mark.parametrize("content, deck_type", [
+    ("machine learning deep learning neural network ai model", "AI/ML Platform"),
+    ("ai model data", "Data Science Product"),
+    ("ai model and more models", "Technology Company"),
+    ("a dashboard of insights", "Analytics Platform"),
+    ("we sell shoes", "Technology Company"),
+])
+def test_default_taxonomy(content, deck_type):
+    assert analyze_slides([slide(1, "Slide", content)])["deck_type"] == deck_type
+
+
+def test_category_matches_count_distinct_keywords():
+    result = classify({"ai": 3, "model": 1, "dashboard": 2}, DEFAULT_TAXONOMY)
+    assert result["category_matches"] == {"AI/ML Platform": 2, "Data Science Product": 2, "Analytics Platform": 1}
+    assert result["deck_type"] == "Analytics Platform"
+
+
+def test_empty_deck_is_unknown():
+    result = analyze_slides([])
+    assert result["deck_type"] == "Unknown"
+    assert result["summary"]["total_slides"] == 0
+    assert result["summary"]["avg_content_length"] == 0
+
+
+def test_custom_taxonomy_argument():
+    taxonomy = {
+        "default": "Other",
+        "categories": [{"label": "Fintech", "keywords": ["payments", "lending"], "min_matches": 2}],
+    }
+    assert analyze_slides([slide(1, "Payments", "and lending")], taxonomy)["deck_type"] == "Fintech"
+    assert analyze_slides([slide(1, "Payments", "only")], taxonomy)["deck_type"] == "Other"
+
+
+def test_taxonomy_from_environment(tmp_path, monkeypatch):
+    path = tmp_path / "taxonomy.json"
+    path.write_text(json.dumps({
+        "default": "Other",
+        "categories": [{"label": "Robotics", "keywords": ["robot"], "min_matches": 1}],
+    }))
+    monkeypatch.setenv("DECK_TAXONOMY_PATH", str(path))
+    monkeypatch.setattr(deck_analytics, "_taxonomy", None)
+    assert analyze_slides([slide(1, "Warehouse robots", "")])["deck_type"] == "Robotics"
+
+
+def test_summary_and_stats():
+    slides = [
+        slide(1, "Problem", "one two three", "notes here"),
+        slide(2, "Empty", "   "),
+        slide(3, "Solution", "one two three four five"),
+    ]
+    result = analyze_slides(slides)
+    assert result["summary"] == {
+        "total_slides": 3,
+        "avg_content_length": round((13 + 3 + 23) / 3),
+        "slides_with_notes": 1,
+        "slide_titles": ["Problem", "Empty", "Solution"],
+        "total_words": 8,
+    }
+    assert result["stats"]["empty_slides"] == 1
+    assert result["stats"]["notes_words"] == 2
+    assert result["stats"]["longest_slide"] == 3
+
+
+def test_parser_helpers_agree_with_analyze_slides(tmp_path):
+    path = tmp_path / "deck.pptx"
+    path.write_bytes(build_pptx(12))
+    slides = parse_deck(str(path))
+
+    result = analyze_slides(slides)
+    assert get_deck_summary(slides) == result["summary"]
+    assert classify_deck_type(slides) == result["deck_type"]
+    assert result["summary"]["total_slides"] == 12
+    assert result["keyword_hits"]
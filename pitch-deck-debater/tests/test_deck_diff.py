@@ -0,0 +1,159 @@
+from pptx import Presentation
+
+from utils.deck_diff import analysis_complete, analysis_key, carry_over_analyses, content_hash, diff_decks
+from utils.deck_parser import parse_deck, slide_content_hash
+
+
+def slide(number, title, content="Body text", notes=""):
+    return {"number": number, "title": title, "content": content, "notes": notes}
+
+
+def deck(*titles):
+    return [slide(i + 1, title) for i, title in enumerate(titles)]
+
+
+def pairs(diff, kind):
+    return [(p["old"], p["new"]) for p in diff[kind]]
+
+
+def write_deck(path, slides):
+    prs = Presentation()
+    for title, body, notes in slides:
+        s = prs.slides.add_slide(prs.slide_layouts[1])
+        s.shapes.title.text = title
+        s.placeholders[1].text = body
+        if notes:
+            s.notes_slide.notes_text_frame.text = notes
+    prs.save(path)
+
+
+def test_identical_decks_are_unchanged():
+    diff = diff_decks(deck("A", "B", "C"), deck("A", "B", "C"))
+    assert pairs(diff, "unchanged") == [(1, 1), (2, 2), (3, 3)]
+    assert diff["counts"] == {"unchanged": 3, "modified": 0, "added": 0, "removed": 0}
+
+
+def test_moved_slide_is_unchanged_not_removed_and_added():
+    diff = diff_decks(deck("A", "B", "C", "D"), deck("A", "C", "D", "B"))
+    assert pairs(diff, "unchanged") == [(1, 1), (3, 2), (4, 3), (2, 4)]
+    assert diff["modified"] == diff["added"] == diff["removed"] == []
+
+
+def test_duplicate_slides_each_pair_once():
+    diff = diff_decks(deck("A", "A", "B"), deck("A", "B", "A"))
+    unchanged = pairs(diff, "unchanged")
+    assert sorted(old for old, _ in unchanged) == [1, 2, 3]
+    assert sorted(new for _, new in unchanged) == [1, 2, 3]
+    assert diff["counts"]["unchanged"] == 3
+
+
+def test_removed_duplicates():
+    diff = diff_decks(deck("A", "B", "A"), deck("A"))
+    assert pairs(diff, "unchanged") == [(1, 1)]
+    assert diff["removed"] == [2, 3]
+
+
+def test_edited_slide_is_modified_in_place():
+    old = deck("A", "B", "C")
+    new = deck("A", "B", "C")
+    new[1]["content"] = "Revised body"
+    diff = diff_decks(old, new)
+    assert pairs(diff, "modified") == [(2, 2)]
+    assert pairs(diff, "unchanged") == [(1, 1), (3, 3)]
+
+
+def test_notes_change_counts_as_modified():
+    old = deck("A", "B")
+    new = deck("A", "B")
+    new[0]["notes"] = "Say this out loud"
+    assert pairs(diff_decks(old, new), "modified") == [(1, 1)]
+
+
+def test_added_and_removed_slides():
+    diff = diff_decks(deck("A", "B", "C"), deck("A", "C", "D"))
+    assert pairs(diff, "unchanged") == [(1, 1), (3, 2)]
+    assert diff["removed"] == [2]
+    assert diff["added"] == [3]
+
+
+def test_longer_edited_stretch_pairs_by_position_then_adds():
+    diff = diff_decks(deck("A", "B"), deck("A", "X", "Y"))
+    assert pairs(diff, "modified") == [(2, 2)]
+    assert diff["added"] == [3]
+    assert diff["removed"] == []
+
+
+def test_content_hash_ignores_number_and_falls_back_for_old_records():
+    a = slide(1, "Team", "Founders", "notes")
+    b = slide(7, "Team", "Founders", "notes")
+    assert content_hash(a) == content_hash(b) == slide_content_hash(a)
+    assert content_hash({**a, "content_hash": "stored"}) == "stored"
+
+
+def test_carry_over_keeps_only_analyses_of_slides_still_present():
+    old = deck("A", "B")
+    new = deck("A", "C")
+    personas = ["vc_partner", "ai_architect"]
+    analyses = {analysis_key(s, personas, "AI/ML Platform"): {"slide": s["title"]} for s in old}
+
+    carried = carry_over_analyses({"analyses": analyses}, new)
+    assert carried == {analysis_key(new[0], personas, "AI/ML Platform"): {"slide": "A"}}
+    assert analysis_key(new[0], personas, "Other") not in carried
+    assert carry_over_analyses({}, new) == {}
+
+
+def analysis(critique_error=False, debate_error=False, synthesis_error=False):
+    debates = [{"persona_id": "vc_partner", "critique": "Fine"}]
+    if critique_error:
+        debates.append({"persona_id": "ai_architect", "error": "overloaded"})
+    return {
+        "debate_round": {"debates": debates},
+        "collaborative_debate": {"error": "timeout"} if debate_error else {"consensus": "Ship it"},
+        "synthesis": {"error": "timeout"} if synthesis_error else {"summary": "Good"},
+    }
+
+
+def test_analysis_complete_rejects_any_failed_call():
+    assert analysis_complete(analysis())
+    assert not analysis_complete(analysis(critique_error=True))
+    assert not analysis_complete(analysis(debate_error=True))
+    assert not analysis_complete(analysis(synthesis_error=True))
+
+
+def test_carry_over_drops_failed_analyses():
+    slides = deck("A", "B")
+    personas = ["vc_partner"]
+    analyses = {
+        analysis_key(slides[0], personas, None): analysis(),
+        analysis_key(slides[1], personas, None): analysis(synthesis_error=True),
+    }
+    carried = carry_over_analyses({"analyses": analyses}, slides)
+    assert list(carried) == [analysis_key(slides[0], personas, None)]
+
+
+def test_diff_of_parsed_revisions(tmp_path):
+    v1 = tmp_path / "v1.pptx"
+    v2 = tmp_path / "v2.pptx"
+    write_deck(v1, [
+        ("Problem", "Analysts lose days to manual reports", "Open with the customer quote"),
+        ("Solution", "Automated reporting", ""),
+        ("Team", "Two ML founders", ""),
+        ("Ask", "$2M seed", ""),
+    ])
+    write_deck(v2, [
+        ("Problem", "Analysts lose days to manual reports", "Open with the customer quote"),
+        ("Solution", "Automated reporting with an LLM agent", ""),
+        ("Traction", "Three paying pilots", ""),
+        ("Team", "Two ML founders", ""),
+        ("Ask", "$2M seed", ""),
+    ])
+
+    old_slides = parse_deck(str(v1))
+    new_slides = parse_deck(str(v2))
+    assert all(s["content_hash"] for s in old_slides + new_slides)
+
+    diff = diff_decks(old_slides, new_slides)
+    assert pairs(diff, "unchanged") == [(1, 1), (3, 4), (4, 5)]
+    assert pairs(diff, "modified") == [(2, 2)]
+    assert diff["added"] == [3]
+    assert diff["removed"] == []
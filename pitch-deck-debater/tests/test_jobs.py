@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.jobs import JobManager, JobStore
+from utils.ttl_cache import SQLiteTTLCache
+
+
+def sqlite_store(path):
+    return JobStore(
+        SQLiteTTLCache(path, maxsize=100, ttl=3600, table="jobs"),
+        SQLiteTTLCache(path, maxsize=100, ttl=3600, table="job_files"),
+        SQLiteTTLCache(path, maxsize=10, ttl=None, table="jobs_active"),
+    )
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    """Two server workers sharing one SQLite job store"""
+    monkeypatch.setenv("JOB_CANCEL_POLL_INTERVAL", "0.05")
+    path = str(tmp_path / "jobs.sqlite3")
+    return JobManager(sqlite_store(path)), JobManager(sqlite_store(path))
+
+
+async def wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_cancel_from_another_worker_stops_the_owner(workers):
+    owner, other = workers
+    stopped = asyncio.Event()
+
+    async def runner(ctx):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            stopped.set()
+            raise
+
+    async def main():
+        job = owner.submit("analyze", {}, runner)
+        await wait_for(lambda: owner.get(job["job_id"])["status"] == "running")
+
+        assert other.cancel(job["job_id"])["status"] == "cancelled"
+        await asyncio.wait_for(stopped.wait(), 2)
+        await wait_for(lambda: not owner._tasks)
+
+        assert owner.get(job["job_id"])["status"] == "cancelled"
+        assert owner.store.active_count() == 0
+
+    asyncio.run(main())
+
+
+def test_local_cancel_still_cancels_the_task(workers):
+    owner, _ = workers
+
+    async def runner(ctx):
+        await asyncio.sleep(30)
+
+    async def main():
+        job = owner.submit("analyze", {}, runner)
+        await wait_for(lambda: owner.get(job["job_id"])["status"] == "running")
+        assert owner.cancel(job["job_id"])["status"] == "cancelled"
+        await wait_for(lambda: not owner._tasks)
+        assert owner.store.active_count() == 0
+
+    asyncio.run(main())
+
+
+def test_partial_results_are_batched_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_PARTIAL_INTERVAL", "0.05")
+    manager = JobManager(sqlite_store(str(tmp_path / "jobs.sqlite3")))
+    writes = []
+    put = manager.store.put
+
+    def counting_put(job):
+        if job["status"] == "running" and job["partial"]:
+            writes.append(threading.current_thread() is threading.main_thread())
+        put(job)
+
+    monkeypatch.setattr(manager.store, "put", counting_put)
+
+    async def runner(ctx):
+        finished = {}
+        for i in range(200):
+            finished[str(i)] = {"slide": i}
+            ctx.update(results=finished)
+            await asyncio.sleep(0.001)
+        return {"slides": len(finished)}
+
+    async def main():
+        job = manager.submit("analyze_deck", {}, runner)
+        await wait_for(lambda: manager.get(job["job_id"])["status"] == "succeeded", timeout=5)
+        return manager.get(job["job_id"])
+
+    job = asyncio.run(main())
+    assert 0 < len(writes) < 50
+    assert not any(writes)
+    assert len(job["partial"]["results"]) == 200
+    assert job["result"] == {"slides": 200}
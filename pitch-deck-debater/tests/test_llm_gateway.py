@@ -0,0 +1,150 @@
+import asyncio
+
+import anthropic
+import httpx
+import pytest
+
+from agents import llm_gateway
+from agents.llm_gateway import LLMGateway, is_retryable
+
+REQUEST = {"model": "test-model", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+
+
+def status_error(status, headers=None, cls=None):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    cls = cls or anthropic.APIStatusError
+    return cls(f"status {status}", response=response, body=None)
+
+
+class Reply:
+    usage = None
+
+
+class FakeMessages:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return Reply()
+
+
+class FakeClient:
+    max_retries = 0
+
+    def __init__(self, errors):
+        self.messages = FakeMessages(errors)
+
+
+class FakeAsyncMessages(FakeMessages):
+    async def create(self, **kwargs):
+        return FakeMessages.create(self, **kwargs)
+
+
+class FakeAsyncClient:
+    max_retries = 0
+
+    def __init__(self, errors):
+        self.messages = FakeAsyncMessages(errors)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(llm_gateway.time, "sleep", waited.append)
+    return waited
+
+
+def gateway(**kwargs):
+    return LLMGateway(default_rpm=1e9, default_tpm=1e12, model_limits={}, max_retries=3, base_delay=0.01, **kwargs)
+
+
+@pytest.mark.parametrize("status", [408, 409, 429, 500, 503, 529])
+def test_transient_statuses_are_retried(status, sleeps):
+    gw = gateway()
+    client = FakeClient([status_error(status)])
+    assert isinstance(gw.create(client, REQUEST), Reply)
+    assert client.messages.calls == 2
+    assert gw.get_stats()["retries"] == 1
+    assert gw.get_stats()["failures"] == 0
+
+
+def test_overloaded_error_is_retried(sleeps):
+    error = status_error(529, cls=getattr(anthropic, "OverloadedError", anthropic.APIStatusError))
+    gw = gateway()
+    client = FakeClient([error, error])
+    gw.create(client, REQUEST)
+    assert gw.get_stats()["attempts"] == 3
+    assert gw.get_stats()["retries"] == 2
+
+
+def test_rate_limit_error_is_retried(sleeps):
+    gw = gateway()
+    client = FakeClient([status_error(429, cls=anthropic.RateLimitError)])
+    gw.create(client, REQUEST)
+    assert gw.get_stats()["retries"] == 1
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 413, 422])
+def test_client_errors_are_not_retried(status, sleeps):
+    gw = gateway()
+    client = FakeClient([status_error(status)])
+    with pytest.raises(anthropic.APIStatusError):
+        gw.create(client, REQUEST)
+    assert client.messages.calls == 1
+    assert gw.get_stats()["failures"] == 1
+    assert sleeps == []
+
+
+def test_gives_up_after_max_retries(sleeps):
+    gw = gateway()
+    client = FakeClient([status_error(529)] * 10)
+    with pytest.raises(anthropic.APIStatusError):
+        gw.create(client, REQUEST)
+    assert client.messages.calls == 4
+    assert gw.get_stats()["retries"] == 3
+    assert gw.get_stats()["failures"] == 1
+
+
+def test_retry_after_header_sets_the_delay(sleeps):
+    gw = gateway()
+    gw.create(FakeClient([status_error(429, {"retry-after": "2"})]), REQUEST)
+    assert len(sleeps) == 1
+    assert 2.0 <= sleeps[0] <= 2.0 + gw.base_delay
+
+
+def test_retry_after_ms_header_wins(sleeps):
+    gw = gateway()
+    gw.create(FakeClient([status_error(529, {"retry-after-ms": "250", "retry-after": "9"})]), REQUEST)
+    assert 0.25 <= sleeps[0] <= 0.25 + gw.base_delay
+
+
+def test_retry_after_is_capped_at_max_delay(sleeps):
+    gw = gateway(max_delay=1.0)
+    gw.create(FakeClient([status_error(503, {"retry-after": "600"})]), REQUEST)
+    assert sleeps == [1.0]
+
+
+def test_async_create_retries_overloaded(monkeypatch):
+    waited = []
+
+    async def fake_sleep(seconds):
+        waited.append(seconds)
+
+    monkeypatch.setattr(llm_gateway.asyncio, "sleep", fake_sleep)
+    gw = gateway()
+    client = FakeAsyncClient([status_error(529, {"retry-after": "1"}), status_error(429)])
+    assert isinstance(asyncio.run(gw.acreate(client, REQUEST)), Reply)
+    assert client.messages.calls == 3
+    assert 1.0 <= waited[0] <= 1.0 + gw.base_delay
+
+
+def test_is_retryable():
+    assert is_retryable(status_error(529))
+    assert is_retryable(anthropic.APIConnectionError(request=httpx.Request("POST", "https://x")))
+    assert not is_retryable(status_error(400))
+    assert not is_retryable(ValueError("boom"))
@@ -0,0 +1,196 @@
+"""
+Deck statistics, keyword hits and deck-type classification in one pass
+
+analyze_slides walks the parsed slides once, measuring content and counting
+words, and runs a single compiled keyword matcher once over all titles and
+content. The summary (same keys as get_deck_summary), extra statistics,
+per-keyword hit counts and the deck type all come out of that pass.
+
+Keywords match whole words (or whole phrases, with any whitespace between
+words) plus a plural "s", so "ai" no longer matches inside "maintain" while
+"model" still matches "models". Each alternative starts with its literal
+first word and checks the word boundary behind it afterwards, which keeps
+the regex engine's fast literal scanning.
+
+The taxonomy is an ordered list of categories. A deck gets the first
+category whose keywords it matches at least ``min_matches`` distinct times,
+and ``default`` when none match. DEFAULT_TAXONOMY reproduces the original
+classify_deck_type rules. A JSON file of the same shape can replace it via
+DECK_TAXONOMY_PATH.
+
+Environment:
+    DECK_TAXONOMY_PATH  JSON taxonomy file (default: DEFAULT_TAXONOMY)
+"""
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+AI_ML_KEYWORDS = [
+    "machine learning", "deep learning", "neural network", "ai",
+    "model", "data", "algorithm", "prediction"
+]
+
+DEFAULT_TAXONOMY: Dict[str, Any] = {
+    "default": "Technology Company",
+    "categories": [
+        {"label": "AI/ML Platform", "keywords": AI_ML_KEYWORDS, "min_matches": 5},
+        {"label": "Data Science Product", "keywords": AI_ML_KEYWORDS, "min_matches": 3},
+        {"label": "Analytics Platform", "keywords": ["analytics", "insights", "dashboard"], "min_matches": 1},
+    ],
+}
+
+UNKNOWN_DECK_TYPE = "Unknown"
+
+
+def _normalize(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def _keyword_pattern(keyword: str) -> str:
+    words = [re.escape(w) for w in keyword.split()]
+    # "ai(?<!\wai)": the boundary before the keyword, checked after its first word
+    return words[0] + rf"(?<!\w{words[0]})" + "".join(r"\s+" + w for w in words[1:])
+
+
+class KeywordMatcher:
+    """One compiled alternation over every keyword of a taxonomy"""
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = sorted({_normalize(k) for k in keywords if k.strip()}, key=len, reverse=True)
+        self._known = set(self.keywords)
+        if self.keywords:
+            alternation = "|".join(_keyword_pattern(k) for k in self.keywords)
+            self.pattern = re.compile(rf"({alternation})s?(?!\w)")
+        else:
+            self.pattern = None
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Keyword hits in ``text`` (already lowercased), keyed by normalized keyword"""
+        hits: Dict[str, int] = {}
+        if self.pattern is None:
+            return hits
+        for found in self.pattern.findall(text):
+            # Phrases may have matched across runs of whitespace
+            keyword = found if found in self._known else _normalize(found)
+            hits[keyword] = hits.get(keyword, 0) + 1
+        return hits
+
+
+_matchers: Dict[str, KeywordMatcher] = {}
+_matchers_lock = threading.Lock()
+_taxonomy: Optional[Dict[str, Any]] = None
+
+
+def load_taxonomy() -> Dict[str, Any]:
+    """The taxonomy from DECK_TAXONOMY_PATH, or DEFAULT_TAXONOMY"""
+    global _taxonomy
+    with _matchers_lock:
+        if _taxonomy is None:
+            path = os.getenv("DECK_TAXONOMY_PATH")
+            if path:
+                with open(path, encoding="utf-8") as f:
+                    _taxonomy = json.load(f)
+            else:
+                _taxonomy = DEFAULT_TAXONOMY
+        return _taxonomy
+
+
+def get_matcher(taxonomy: Dict[str, Any]) -> KeywordMatcher:
+    """Compiled matcher for a taxonomy, built once per distinct taxonomy"""
+    key = json.dumps(taxonomy, sort_keys=True)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            keywords = [k for category in taxonomy.get("categories", []) for k in category.get("keywords", [])]
+            matcher = _matchers[key] = KeywordMatcher(keywords)
+        return matcher
+
+
+def classify(keyword_hits: Dict[str, int], taxonomy: Dict[str, Any]) -> Dict[str, Any]:
+    """Deck type and distinct keyword matches per category for a set of keyword hits"""
+    matches = {}
+    deck_type = None
+    for category in taxonomy.get("categories", []):
+        keywords = {_normalize(k) for k in category.get("keywords", [])}
+        distinct = sum(1 for k in keywords if keyword_hits.get(k))
+        matches[category["label"]] = distinct
+        if deck_type is None and distinct and distinct >= category.get("min_matches", 1):
+            deck_type = category["label"]
+    return {"deck_type": deck_type or taxonomy.get("default", UNKNOWN_DECK_TYPE), "category_matches": matches}
+
+
+def analyze_slides(slides: List[Dict], taxonomy: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Summary, statistics, keyword hits and deck type from one pass over the slides
+
+    Args:
+        slides: Slides as returned by parse_deck
+        taxonomy: Classification taxonomy (default: load_taxonomy())
+
+    Returns:
+        Dict with ``summary`` (get_deck_summary's keys), ``stats``,
+        ``keyword_hits``, ``category_matches`` and ``deck_type``
+    """
+    taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+    matcher = get_matcher(taxonomy)
+
+    total_chars = 0
+    total_words = 0
+    notes_words = 0
+    slides_with_notes = 0
+    empty_slides = 0
+    longest = (0, None)
+    titles = []
+    texts = []
+
+    for slide in slides:
+        title = slide.get("title", "")
+        content = slide.get("content", "")
+        notes = slide.get("notes", "")
+        words = len(content.split())
+
+        titles.append(title)
+        total_chars += len(content)
+        total_words += words
+        if notes:
+            slides_with_notes += 1
+            notes_words += len(notes.split())
+        if not content.strip():
+            empty_slides += 1
+        if words > longest[0]:
+            longest = (words, slide.get("number"))
+        texts.append(title)
+        texts.append(content)
+
+    # NUL never matches \s or \w, so keywords cannot span slides
+    keyword_hits = matcher.count("\0".join(texts).lower())
+
+    count = len(slides)
+    summary = {
+        "total_slides": count,
+        "avg_content_length": round(total_chars / count) if count else 0,
+        "slides_with_notes": slides_with_notes,
+        "slide_titles": titles,
+        "total_words": total_words,
+    }
+    stats = {
+        "total_characters": total_chars,
+        "avg_words_per_slide": round(total_words / count, 1) if count else 0,
+        "notes_words": notes_words,
+        "empty_slides": empty_slides,
+        "longest_slide": longest[1],
+    }
+
+    if not slides:
+        classification = {"deck_type": UNKNOWN_DECK_TYPE, "category_matches": {}}
+    else:
+        classification = classify(keyword_hits, taxonomy)
+
+    return {
+        "summary": summary,
+        "stats": stats,
+        "keyword_hits": keyword_hits,
+        **classification,
+    }
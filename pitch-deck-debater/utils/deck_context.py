@@ -0,0 +1,74 @@
+"""
+Deck-level context shared by every slide analysis of a deck
+
+Built once per deck (at upload) from the parsed slides: a condensed outline
+of slide titles, the get_deck_summary statistics and the classify_deck_type
+label. Its prompt block is placed right after the shared critique rubric, so
+all slide x persona calls for the same deck share one cacheable prefix and
+each persona sees where the slide sits in the deck.
+"""
+from typing import Dict, List, Optional
+
+from utils.deck_analytics import analyze_slides
+
+# Longest slide title kept in the outline
+MAX_OUTLINE_TITLE_CHARS = 80
+
+
+def build_deck_context(
+    slides: List[Dict],
+    summary: Optional[Dict] = None,
+    deck_type: Optional[str] = None
+) -> Dict:
+    """
+    Build the deck context for a parsed deck
+
+    Args:
+        slides: Slides as returned by parse_deck
+        summary: Precomputed get_deck_summary result (computed if omitted)
+        deck_type: Precomputed classify_deck_type result (computed if omitted)
+
+    Returns:
+        Dict with deck_type, summary, outline and the rendered prompt_block
+    """
+    if summary is None or not deck_type:
+        analytics = analyze_slides(slides)
+        summary = summary if summary is not None else analytics["summary"]
+        deck_type = deck_type or analytics["deck_type"]
+
+    outline = []
+    for slide in slides:
+        title = " ".join(str(slide.get("title", "")).split())
+        if len(title) > MAX_OUTLINE_TITLE_CHARS:
+            title = title[:MAX_OUTLINE_TITLE_CHARS - 3] + "..."
+        outline.append({
+            "number": slide.get("number"),
+            "title": title or "Untitled Slide",
+            "has_notes": bool(slide.get("notes")),
+            "words": len(str(slide.get("content", "")).split()),
+        })
+
+    return {
+        "deck_type": deck_type,
+        "summary": {k: v for k, v in summary.items() if k != "slide_titles"},
+        "outline": outline,
+        "prompt_block": _render_prompt_block(deck_type, summary, outline),
+    }
+
+
+def _render_prompt_block(deck_type: str, summary: Dict, outline: List[Dict]) -> str:
+    lines = [
+        "# Deck-level context",
+        "",
+        f"Deck type: {deck_type}",
+        f"Total slides: {summary.get('total_slides', len(outline))}",
+        f"Total words: {summary.get('total_words', 0)}",
+        f"Average content length: {summary.get('avg_content_length', 0)} characters",
+        f"Slides with speaker notes: {summary.get('slides_with_notes', 0)}",
+        "",
+        "Deck outline:",
+    ]
+    for item in outline:
+        notes = ", notes" if item["has_notes"] else ""
+        lines.append(f"{item['number']}. {item['title']} ({item['words']} words{notes})")
+    return "\n".join(lines)
@@ -0,0 +1,113 @@
+"""
+Diffs between revisions of the same deck, and reuse of prior analyses
+
+Founders re-upload v2, v3, ... of a deck with a few slides changed. Slides
+are compared by their parse_deck ``content_hash`` (title + content + notes):
+
+- unchanged  same content, possibly at a new position
+- modified   the slide at the matching position in an edited stretch of the deck
+- added      new slides with no counterpart
+- removed    old slides with no counterpart
+
+Analyses are stored on the deck record under analysis_key(), which is built
+from the content hash, personas and deck type. When a revision is uploaded
+with its previous deck_id, analyses of unchanged slides are carried over, so
+only modified and added slides go back through the debate engine. Only
+complete analyses (analysis_complete) are stored or carried over, so a
+slide whose critique, debate or synthesis call failed is re-run next time.
+"""
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.deck_parser import slide_content_hash
+
+
+def content_hash(slide: Dict) -> str:
+    """The slide's content hash (computed for slides stored before hashes existed)"""
+    return slide.get("content_hash") or slide_content_hash(slide)
+
+
+def diff_decks(old_slides: List[Dict], new_slides: List[Dict]) -> Dict[str, Any]:
+    """
+    Compare two parsed revisions of a deck
+
+    Returns:
+        ``unchanged`` and ``modified`` as lists of {"old": n, "new": n} slide
+        number pairs, ``added`` (new slide numbers), ``removed`` (old slide
+        numbers) and per-category ``counts``
+    """
+    old_hashes = [content_hash(s) for s in old_slides]
+    new_hashes = [content_hash(s) for s in new_slides]
+
+    opcodes = SequenceMatcher(None, old_hashes, new_hashes, autojunk=False).get_opcodes()
+    unchanged: List[Tuple[int, int]] = []
+    for op, i1, i2, j1, j2 in opcodes:
+        if op == "equal":
+            unchanged.extend(zip(range(i1, i2), range(j1, j2)))
+
+    # Slides outside the aligned stretches that still have an identical
+    # counterpart were moved, not changed
+    spare_old: Dict[str, List[int]] = {}
+    for op, i1, i2, _, _ in opcodes:
+        if op != "equal":
+            for i in range(i1, i2):
+                spare_old.setdefault(old_hashes[i], []).append(i)
+    moved_old, moved_new = set(), set()
+    for op, _, _, j1, j2 in opcodes:
+        if op != "equal":
+            for j in range(j1, j2):
+                candidates = spare_old.get(new_hashes[j])
+                if candidates:
+                    i = candidates.pop(0)
+                    unchanged.append((i, j))
+                    moved_old.add(i)
+                    moved_new.add(j)
+
+    # What is left of each edited stretch pairs up by position
+    modified: List[Tuple[int, int]] = []
+    added: List[int] = []
+    removed: List[int] = []
+    for op, i1, i2, j1, j2 in opcodes:
+        if op == "equal":
+            continue
+        old_left = [i for i in range(i1, i2) if i not in moved_old]
+        new_left = [j for j in range(j1, j2) if j not in moved_new]
+        pairs = min(len(old_left), len(new_left))
+        modified.extend(zip(old_left[:pairs], new_left[:pairs]))
+        removed.extend(old_left[pairs:])
+        added.extend(new_left[pairs:])
+
+    def number(slides: List[Dict], index: int) -> int:
+        return slides[index].get("number", index + 1)
+
+    diff = {
+        "unchanged": [{"old": number(old_slides, i), "new": number(new_slides, j)} for i, j in sorted(unchanged, key=lambda p: p[1])],
+        "modified": [{"old": number(old_slides, i), "new": number(new_slides, j)} for i, j in sorted(modified, key=lambda p: p[1])],
+        "added": [number(new_slides, j) for j in sorted(added)],
+        "removed": [number(old_slides, i) for i in sorted(removed)],
+    }
+    diff["counts"] = {kind: len(diff[kind]) for kind in ("unchanged", "modified", "added", "removed")}
+    return diff
+
+
+def analysis_key(slide: Dict, personas: List[str], deck_type: Optional[str]) -> str:
+    """Key of a stored slide analysis: same content, personas and deck type"""
+    return f"{content_hash(slide)}:{deck_type or ''}:{','.join(personas)}"
+
+
+def analysis_complete(analysis: Dict[str, Any]) -> bool:
+    """True when no persona critique, the collaborative debate nor the synthesis failed"""
+    debates = (analysis.get("debate_round") or {}).get("debates") or []
+    if any("error" in d for d in debates):
+        return False
+    return not any("error" in (analysis.get(phase) or {}) for phase in ("collaborative_debate", "synthesis"))
+
+
+def carry_over_analyses(previous: Dict[str, Any], new_slides: List[Dict]) -> Dict[str, Dict]:
+    """Analyses from a previous deck record that apply to slides of the new revision"""
+    hashes = {content_hash(s) for s in new_slides}
+    return {
+        key: analysis
+        for key, analysis in (previous.get("analyses") or {}).items()
+        if key.split(":", 1)[0] in hashes and analysis_complete(analysis)
+    }
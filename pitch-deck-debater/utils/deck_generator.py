@@ -3,19 +3,80 @@ PowerPoint deck generator
 """
 from pptx import Presentation
 from pptx.util import Inches, Pt
-from typing import Dict, Any, List
-from anthropic import Anthropic
+from typing import Dict, Any, List, Optional
 import io
 import os
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from agents.clients import get_anthropic_client
+from agents.coordinator import DebateCoordinator
+from agents.llm_gateway import get_llm_gateway
+from utils.metrics import timed
+
+
+IMPROVEMENT_MODES = ("batched", "concurrent", "serial")
+
+DEFAULT_SLIDE_IMPROVEMENTS = "- Review and strengthen content\n- Ensure clarity and focus\n- Add supporting data"
+
+SLIDE_IMPROVEMENTS_TOOL = {
+    "name": "record_slide_improvements",
+    "description": "Record 3-5 specific improvements for each requested slide.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "slides": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "slide_number": {"type": "integer"},
+                        "improvements": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["slide_number", "improvements"]
+                }
+            }
+        },
+        "required": ["slides"]
+    }
+}
 
 
 class DeckGenerator:
     """Generate improved PowerPoint presentations"""
 
-    def __init__(self):
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
+    def __init__(
+        self,
+        coordinator: Optional[DebateCoordinator] = None,
+        improvements_mode: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        client: Optional[Any] = None
+    ):
+        """
+        Args:
+            coordinator: Shared coordinator (recommendations are memoized there)
+            improvements_mode: How per-slide improvements are extracted:
+                "batched" (several slides per structured call, default),
+                "concurrent" (one call per slide, in parallel) or "serial"
+            batch_size: Slides per call in batched mode
+            max_workers: Calls in flight at once in batched/concurrent mode
+            client: Anthropic client (the process-wide pooled client by default)
+        """
+        self.client = client if client is not None else get_anthropic_client()
+        # Rate limits and retries are shared with the debate engine and coordinator
+        self.gateway = get_llm_gateway()
+        # Recommendations are memoized by the coordinator, so a report built
+        # from the same debate results shares the extraction with this deck
+        self.coordinator = coordinator or DebateCoordinator(client=self.client)
+        self.improvements_mode = improvements_mode or os.getenv("DECK_IMPROVEMENTS_MODE", "batched")
+        if self.improvements_mode not in IMPROVEMENT_MODES:
+            raise ValueError(f"improvements_mode must be one of {', '.join(IMPROVEMENT_MODES)}")
+        self.batch_size = max(1, batch_size or int(os.getenv("DECK_IMPROVEMENTS_BATCH_SIZE", 15)))
+        self.max_workers = max(1, max_workers or int(os.getenv("DECK_IMPROVEMENTS_WORKERS", 8)))
+
+    @timed("deck_generate")
     def generate(self, debate_results: Dict[str, Any]) -> bytes:
         """
         Generate an improved PowerPoint deck based on debate results
@@ -90,8 +151,11 @@ class DeckGenerator:
         original_slides = debate_results.get("deck_content", {}).get("slides", [])
         synthesis = debate_results.get("synthesis", "")
 
+        # Gather every slide's improvements before touching the presentation
+        all_improvements = self._collect_slide_improvements(original_slides, synthesis)
+
         # Process ALL slides (not just first 5)
-        for slide_data in original_slides:
+        for slide_data, slide_improvements in zip(original_slides, all_improvements):
             slide_layout = prs.slide_layouts[1]
             slide = prs.slides.add_slide(slide_layout)
 
@@ -108,13 +172,6 @@ class DeckGenerator:
             text_frame = textbox.text_frame
             text_frame.word_wrap = True
 
-            # Extract actual improvements from debate for this specific slide
-            slide_improvements = self._extract_slide_improvements(
-                slide_data,
-                synthesis,
-                slide_data['slide_number']
-            )
-
             improvements = f"Original Content:\n{slide_data.get('title', 'No title')}\n\n"
             improvements += "Recommended Improvements:\n"
             improvements += slide_improvements
@@ -147,6 +204,97 @@ class DeckGenerator:
         p.text = recommendations
         p.font.size = Pt(14)
 
+    def _collect_slide_improvements(self, original_slides: List[Dict[str, Any]], synthesis: str) -> List[str]:
+        """Improvement text for every slide, in slide order, using the configured mode"""
+        if not original_slides:
+            return []
+
+        if self.improvements_mode == "serial":
+            return [
+                self._extract_slide_improvements(s, synthesis, s['slide_number'])
+                for s in original_slides
+            ]
+
+        if self.improvements_mode == "concurrent":
+            return self._extract_slide_improvements_concurrently(original_slides, synthesis)
+
+        batches = [
+            original_slides[i:i + self.batch_size]
+            for i in range(0, len(original_slides), self.batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            batch_results = list(pool.map(lambda batch: self._extract_batch_improvements(batch, synthesis), batches))
+
+        improvements = {}
+        for result in batch_results:
+            improvements.update(result)
+
+        # Slides the batched call skipped get their own call
+        missing = [s for s in original_slides if s['slide_number'] not in improvements]
+        if missing:
+            for slide_data, text in zip(missing, self._extract_slide_improvements_concurrently(missing, synthesis)):
+                improvements[slide_data['slide_number']] = text
+
+        return [improvements[s['slide_number']] for s in original_slides]
+
+    def _extract_slide_improvements_concurrently(self, slides: List[Dict[str, Any]], synthesis: str) -> List[str]:
+        """One improvements call per slide, run in parallel; results keep slide order"""
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(slides))) as pool:
+            return list(pool.map(
+                lambda s: self._extract_slide_improvements(s, synthesis, s['slide_number']),
+                slides
+            ))
+
+    def _extract_batch_improvements(self, slides: List[Dict[str, Any]], synthesis: str) -> Dict[int, str]:
+        """
+        Improvements for several slides from one structured call
+
+        Returns:
+            Bulleted improvements by slide number, for the slides the model covered
+        """
+        slides_text = "\n\n".join(
+            f"Slide {s['slide_number']}:\nTitle: {s.get('title', '')}\nContent: {s.get('content', [])}"
+            for s in slides
+        )
+        prompt = f"""Based on the debate synthesis, provide 3-5 specific improvements for each of the following slides.
+
+Slides:
+{slides_text}
+
+Debate Synthesis:
+{synthesis[:1500]}
+
+Record the improvements for every slide above with the record_slide_improvements tool."""
+
+        try:
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": min(8192, 400 * len(slides) + 256),
+                "tools": [SLIDE_IMPROVEMENTS_TOOL],
+                "tool_choice": {"type": "tool", "name": SLIDE_IMPROVEMENTS_TOOL["name"]},
+                "messages": [{"role": "user", "content": prompt}]
+            })
+        except Exception:
+            return {}
+
+        payload = next(
+            (block.input for block in response.content if getattr(block, "type", None) == "tool_use"),
+            None
+        )
+        if not isinstance(payload, dict) or not isinstance(payload.get("slides"), list):
+            return {}
+
+        wanted = {s['slide_number'] for s in slides}
+        improvements = {}
+        for item in payload["slides"]:
+            if not isinstance(item, dict):
+                continue
+            number = item.get("slide_number")
+            bullets = [b.strip() for b in item.get("improvements") or [] if isinstance(b, str) and b.strip()]
+            if number in wanted and bullets:
+                improvements[number] = "\n".join(b if b.startswith("-") else f"- {b}" for b in bullets)
+        return improvements
+
     def _extract_slide_improvements(self, slide_data: Dict[str, Any], synthesis: str, slide_num: int) -> str:
         """Extract specific improvements for a slide from debate synthesis"""
         slide_content = f"Title: {slide_data.get('title', '')}\n"
@@ -163,17 +311,38 @@ Debate Synthesis:
 Return ONLY the bulleted improvements (one per line starting with '-'), no other text."""
 
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=512,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 512,
+                "messages": [{"role": "user", "content": prompt}]
+            })
             return response.content[0].text
         except:
-            return "- Review and strengthen content\n- Ensure clarity and focus\n- Add supporting data"
+            return DEFAULT_SLIDE_IMPROVEMENTS
 
     def _extract_top_recommendations(self, debate_results: Dict[str, Any]) -> str:
-        """Extract top priority recommendations from debate"""
+        """Top priority recommendations, from the shared (memoized) recommendations"""
+        try:
+            actions = self.coordinator.get_recommendations(debate_results).get("improvement_actions", [])
+        except Exception:
+            actions = []
+
+        order = {"high": 0, "medium": 1, "low": 2}
+        actions = sorted(
+            (a for a in actions if isinstance(a, dict) and a.get("action")),
+            key=lambda a: order.get(a.get("priority"), 3)
+        )
+        if actions:
+            lines = []
+            for i, action in enumerate(actions[:7], 1):
+                slide_info = f" (Slide {action.get('slide')})" if action.get('slide') else ""
+                lines.append(f"{i}. {action['action']}{slide_info}")
+            return "\n".join(lines)
+
+        return self._extract_top_recommendations_text(debate_results)
+
+    def _extract_top_recommendations_text(self, debate_results: Dict[str, Any]) -> str:
+        """Extract top priority recommendations from debate as free text"""
         synthesis = debate_results.get("synthesis", "")
 
         prompt = f"""Extract the top 5-7 priority recommendations from this debate synthesis.
@@ -184,11 +353,11 @@ Synthesis:
 Return ONLY a numbered list (1., 2., 3., etc.) of actionable recommendations, no other text."""
 
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            response = self.gateway.create(self.client, {
+                "model": "claude-3-5-haiku-20241022",
+                "max_tokens": 1024,
+                "messages": [{"role": "user", "content": prompt}]
+            })
             return response.content[0].text
         except:
             return "1. Strengthen value proposition\n2. Add market validation\n3. Improve financial projections"
@@ -1,105 +1,449 @@
 """
 PowerPoint deck parsing utilities
+
+Each slide dict carries a ``content_hash`` of its title, content and notes,
+stable across uploads, so revised decks can be diffed (utils.deck_diff).
+
+parse_deck has two backends producing the same slide dicts:
+
+- pptx (default): python-pptx, walking each slide's shape tree once. For
+  decks with at least DECK_PARSE_POOL_MIN_SLIDES slides and
+  DECK_PARSE_WORKERS > 1, the raw slide, notes and layout XML parts are
+  read from the zip (no Presentation is built) and split across a
+  process pool instead.
+- ooxml: reads only the slide, notes and layout XML parts straight from the
+  zip and stream-parses them with iterparse. Media and every other part are
+  never read, so large media-heavy decks parse in a fraction of the time
+  and memory.
+
+Environment:
+    DECK_PARSE_BACKEND         pptx (default) | ooxml
+    DECK_PARSE_WORKERS         Worker processes for large decks (default: 1, in-process)
+    DECK_PARSE_POOL_MIN_SLIDES Smallest deck handed to the pool (default: 200)
 """
 from pptx import Presentation
-from typing import List, Dict
-import io
+from lxml import etree
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import zipfile
+
+from utils.deck_analytics import analyze_slides
+from utils.metrics import timed
+
+# Non-seekable streams are copied in chunks of this size into a spooled
+# temp file (in memory up to SPOOL_MAX_MEMORY, on disk beyond)
+SPOOL_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# Slides handed to a pool worker per task
+POOL_CHUNK_SIZE = 25
+
+
+def _open_source(pptx_file):
+    """
+    Return something python-pptx can open without buffering the deck again
+
+    Paths and seekable file objects (uploads spooled to disk, open files,
+    BytesIO) are used as-is; zipfile only reads the parts it needs from them.
+    """
+    if not hasattr(pptx_file, 'read'):
+        return pptx_file
+    seekable = getattr(pptx_file, 'seekable', None)
+    if seekable is not None and seekable():
+        pptx_file.seek(0)
+        return pptx_file
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(pptx_file, spooled, SPOOL_CHUNK_SIZE)
+    spooled.seek(0)
+    return spooled
+
+
+@timed("parse_deck")
+def parse_deck(pptx_file, workers: Optional[int] = None, backend: Optional[str] = None) -> List[Dict]:
+    """
+    Extract content from PowerPoint deck (a path or a file-like object)
 
-def parse_deck(pptx_file) -> List[Dict]:
-    """Extract content from PowerPoint deck"""
-    if hasattr(pptx_file, 'read'):
-        prs = Presentation(io.BytesIO(pptx_file.read()))
+    Args:
+        pptx_file: Path or file-like object of a .pptx
+        workers: Worker processes for large decks (default: DECK_PARSE_WORKERS;
+            pptx backend only)
+        backend: pptx or ooxml (default: DECK_PARSE_BACKEND)
+    """
+    source = _open_source(pptx_file)
+    backend = (backend or os.getenv("DECK_PARSE_BACKEND", "pptx")).lower()
+    if backend == "ooxml":
+        slides = _parse_ooxml(source)
+    elif backend == "pptx":
+        slides = _parse_pptx(source, workers)
     else:
-        prs = Presentation(pptx_file)
-    
+        raise ValueError(f"Unknown deck parser backend: {backend}")
+
+    for slide in slides:
+        slide["content_hash"] = slide_content_hash(slide)
+    return slides
+
+
+def slide_content_hash(slide: Dict) -> str:
+    """Stable hash of a slide's title, content and notes"""
+    material = json.dumps([slide.get("title", ""), slide.get("content", ""), slide.get("notes", "")], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _parse_pptx(source, workers: Optional[int]) -> List[Dict]:
+    workers = int(workers or os.getenv("DECK_PARSE_WORKERS", 1))
+    if workers > 1:
+        slides = _parse_in_pool(source, workers, int(os.getenv("DECK_PARSE_POOL_MIN_SLIDES", 200)))
+        if slides is not None:
+            return slides
+        if hasattr(source, 'seek'):
+            source.seek(0)
+
+    prs = Presentation(source)
     slides = []
-    
     for idx, slide in enumerate(prs.slides):
-        slide_data = {
+        title, content, shape_count = _extract_shapes(slide.shapes)
+        slides.append({
             "number": idx + 1,
-            "title": _get_slide_title(slide),
-            "content": _extract_slide_text(slide),
+            "title": title,
+            "content": content,
             "notes": _get_speaker_notes(slide),
-            "shape_count": len(slide.shapes),
-            "layout_name": slide.slide_layout.name if hasattr(slide.slide_layout, 'name') else "Unknown"
-        }
-        slides.append(slide_data)
-    
+            "shape_count": shape_count,
+            "layout_name": _layout_name(slide)
+        })
+
     return slides
 
-def _get_slide_title(slide) -> str:
-    """Extract slide title"""
-    if hasattr(slide, 'shapes') and hasattr(slide.shapes, 'title'):
-        if slide.shapes.title and hasattr(slide.shapes.title, 'text'):
-            title_text = slide.shapes.title.text.strip()
-            if title_text:
-                return title_text
-    
-    for shape in slide.shapes:
-        if hasattr(shape, "text") and shape.text.strip():
-            return shape.text.strip()[:100]
-    
-    return "Untitled Slide"
-
-def _extract_slide_text(slide) -> str:
-    """Extract all text from slide"""
+
+def _extract_shapes(shapes) -> Tuple[str, str, int]:
+    """
+    Title, text and shape count of a slide in one pass over its shapes
+
+    The title is the title placeholder's text (placeholder idx 0, as
+    ``shapes.title``), else the first non-empty text (up to 100 chars),
+    else "Untitled Slide". Each shape's text is read once.
+    """
+    title = None
+    first_text = None
     text_parts = []
-    
-    for shape in slide.shapes:
-        if hasattr(shape, "text") and shape.text.strip():
-            text_parts.append(shape.text.strip())
-    
-    return "\n\n".join(text_parts)
+    shape_count = 0
+
+    for shape in shapes:
+        shape_count += 1
+        text = getattr(shape, "text", None)
+        stripped = text.strip() if text is not None else ""
+        if stripped:
+            text_parts.append(stripped)
+            if first_text is None:
+                first_text = stripped
+        if title is None and shape.is_placeholder and shape.placeholder_format.idx == 0:
+            # Only the first title placeholder counts, even when it is empty
+            title = stripped
+
+    if not title:
+        title = first_text[:100] if first_text else "Untitled Slide"
+    return title, "\n\n".join(text_parts), shape_count
+
+
+def _layout_name(slide) -> str:
+    return slide.slide_layout.name if hasattr(slide.slide_layout, 'name') else "Unknown"
+
 
 def _get_speaker_notes(slide) -> str:
     """Extract speaker notes"""
     try:
         if slide.has_notes_slide:
-            notes_slide = slide.notes_slide
-            if hasattr(notes_slide, 'notes_text_frame'):
-                return notes_slide.notes_text_frame.text.strip()
+            return _notes_text(slide.notes_slide)
     except:
         pass
     return ""
 
-def get_deck_summary(slides: List[Dict]) -> Dict:
-    """Get high-level deck statistics - FIXED FOR DIVISION BY ZERO"""
-    if not slides:
-        return {
-            "total_slides": 0,
-            "avg_content_length": 0,
-            "slides_with_notes": 0,
-            "slide_titles": [],
-            "total_words": 0
-        }
-    
-    total_content_length = sum(len(s['content']) for s in slides)
-    
+
+def _notes_text(notes_slide) -> str:
+    if hasattr(notes_slide, 'notes_text_frame'):
+        return notes_slide.notes_text_frame.text.strip()
+    return ""
+
+
+# ---- process-pool mode ----
+
+# Layout part -> raw XML, and the layout names resolved from it, in a pool worker
+_pool_layouts: Dict[str, bytes] = {}
+_pool_layout_names: Dict[str, str] = {}
+
+
+def _parse_in_pool(source, workers: int, min_slides: int) -> Optional[List[Dict]]:
+    """
+    Split slide XML parts across worker processes (None below ``min_slides``)
+
+    The parent only walks the package: it finds each slide's slide, notes
+    and layout parts through presentation.xml and the part rels (as the
+    ooxml backend does) and reads their raw XML, so no Presentation is
+    built and no python-pptx objects cross the process boundary. Workers
+    parse and extract the slides and resolve layout names.
+    """
+    with zipfile.ZipFile(source) as package:
+        parts = _slide_parts(package)
+        if len(parts) < min_slides:
+            return None
+        items = [
+            (idx + 1, package.read(slide), package.read(notes) if notes else None, layout)
+            for idx, (slide, notes, layout) in enumerate(parts)
+        ]
+        layouts = {layout: package.read(layout) for _, _, layout in parts if layout}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker, initargs=(layouts,)) as pool:
+        return list(pool.map(_extract_slide_xml, items, chunksize=POOL_CHUNK_SIZE))
+
+
+def _init_pool_worker(layouts: Dict[str, bytes]) -> None:
+    global _pool_layouts
+    _pool_layouts = layouts
+    _pool_layout_names.clear()
+
+
+def _pool_layout_name(layout: Optional[str]) -> str:
+    """Layout name (p:cSld/@name, as ``slide_layout.name``), parsed once per worker"""
+    if layout is None or layout not in _pool_layouts:
+        return ""
+    if layout not in _pool_layout_names:
+        c_sld = etree.fromstring(_pool_layouts[layout]).find("p:cSld", _NS)
+        _pool_layout_names[layout] = c_sld.get("name", "") if c_sld is not None else ""
+    return _pool_layout_names[layout]
+
+
+def _extract_slide_xml(item: Tuple[int, bytes, Optional[bytes], Optional[str]]) -> Dict:
+    """Worker: one slide dict from raw slide and notes XML"""
+    from pptx.oxml import parse_xml
+    from pptx.shapes.shapetree import SlideShapes
+    from pptx.slide import NotesSlide
+
+    number, slide_xml, notes_xml, layout = item
+    title, content, shape_count = _extract_shapes(SlideShapes(parse_xml(slide_xml).cSld.spTree, None))
+
+    notes = ""
+    if notes_xml is not None:
+        try:
+            notes = _notes_text(NotesSlide(parse_xml(notes_xml), None))
+        except:
+            pass
+
     return {
-        "total_slides": len(slides),
-        "avg_content_length": round(total_content_length / len(slides)),
-        "slides_with_notes": sum(1 for s in slides if s['notes']),
-        "slide_titles": [s['title'] for s in slides],
-        "total_words": sum(len(s['content'].split()) for s in slides)
+        "number": number,
+        "title": title,
+        "content": content,
+        "notes": notes,
+        "shape_count": shape_count,
+        "layout_name": _pool_layout_name(layout)
     }
 
+
+# ---- ooxml backend ----
+
+_NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_P = "{%s}" % _NS["p"]
+_A = "{%s}" % _NS["a"]
+
+# Direct spTree children that python-pptx counts as shapes
+_SHAPE_TAGS = {_P + tag for tag in ("sp", "grpSp", "graphicFrame", "cxnSp", "pic", "contentPart")}
+_TEXT_RUN_TAGS = (_A + "r", _A + "fld")
+
+_RT_OFFICE_DOCUMENT = "/officeDocument"
+_RT_SLIDE_LAYOUT = "/slideLayout"
+_RT_NOTES_SLIDE = "/notesSlide"
+
+
+def _iterparse(package: zipfile.ZipFile, member: str, events=("end",)):
+    """
+    iterparse over a zip member, closing the member when iteration ends
+
+    Callers that stop early close the generator (contextlib.closing) so the
+    member is not left open until garbage collection.
+    """
+    with package.open(member) as stream:
+        # Same parser settings as python-pptx, so whitespace-only text nodes match
+        yield from etree.iterparse(stream, events=events, remove_blank_text=True, resolve_entities=False)
+
+
+def _part_rels(package: zipfile.ZipFile, member: str) -> Dict[str, Tuple[str, str]]:
+    """rId -> (relationship type, zip member of the target) for an internal part"""
+    directory, name = posixpath.split(member)
+    rels_member = posixpath.join(directory, "_rels", name + ".rels")
+    if rels_member not in package.NameToInfo:
+        return {}
+    rels = {}
+    for _, rel in _iterparse(package, rels_member):
+        if rel.tag != "{%s}Relationship" % _NS["rel"] or rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        rels[rel.get("Id")] = (rel.get("Type", ""), target)
+    return rels
+
+
+def _related(rels: Dict[str, Tuple[str, str]], rel_type: str) -> Optional[str]:
+    for kind, target in rels.values():
+        if kind.endswith(rel_type):
+            return target
+    return None
+
+
+def _iter_tree_shapes(package: zipfile.ZipFile, member: str):
+    """
+    Stream the direct children of a slide's p:cSld/p:spTree
+
+    Each shape element is yielded once it is fully parsed and cleared right
+    after, so only one top-level shape is held in memory at a time.
+    """
+    depth = 0
+    tree_depth = None
+    with closing(_iterparse(package, member, events=("start", "end"))) as events:
+        for event, elem in events:
+            if event == "start":
+                depth += 1
+                if tree_depth is None and elem.tag == _P + "spTree" and depth == 3:
+                    tree_depth = depth
+                continue
+
+            if tree_depth is not None and depth == tree_depth + 1 and elem.tag in _SHAPE_TAGS:
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            depth -= 1
+
+
+def _ph(shape) -> Optional[etree._Element]:
+    """The shape's p:ph (under its first child's p:nvPr), as python-pptx finds it"""
+    first = shape.find("*")
+    if first is None:
+        return None
+    return first.find("p:nvPr/p:ph", _NS)
+
+
+def _shape_text(shape) -> Optional[str]:
+    """Text of a p:sp as python-pptx's ``shape.text``; None for shapes without text"""
+    if shape.tag != _P + "sp":
+        return None
+    body = shape.find("p:txBody", _NS)
+    if body is None:
+        return ""
+    paragraphs = []
+    for paragraph in body.iterchildren(_A + "p"):
+        parts = []
+        for child in paragraph.iterchildren(_A + "r", _A + "br", _A + "fld"):
+            if child.tag == _A + "br":
+                parts.append("\v")
+            else:
+                t = child.find("a:t", _NS)
+                parts.append((t.text or "") if t is not None else "")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _ooxml_slide_shapes(package: zipfile.ZipFile, member: str) -> Tuple[str, str, int]:
+    """Title, text and shape count from raw slide XML, with _extract_shapes' rules"""
+    title = None
+    first_text = None
+    text_parts = []
+    shape_count = 0
+
+    for shape in _iter_tree_shapes(package, member):
+        shape_count += 1
+        text = _shape_text(shape)
+        stripped = text.strip() if text is not None else ""
+        if stripped:
+            text_parts.append(stripped)
+            if first_text is None:
+                first_text = stripped
+        if title is None:
+            ph = _ph(shape)
+            if ph is not None and int(ph.get("idx", 0)) == 0:
+                title = stripped
+
+    if not title:
+        title = first_text[:100] if first_text else "Untitled Slide"
+    return title, "\n\n".join(text_parts), shape_count
+
+
+def _ooxml_notes(package: zipfile.ZipFile, member: str) -> str:
+    """Text of the notes slide's body placeholder (as ``notes_text_frame``)"""
+    try:
+        with closing(_iter_tree_shapes(package, member)) as shapes:
+            for shape in shapes:
+                ph = _ph(shape)
+                if ph is not None and ph.get("type", "obj") == "body":
+                    return (_shape_text(shape) or "").strip()
+    except Exception:
+        pass
+    return ""
+
+
+def _ooxml_layout_name(package: zipfile.ZipFile, member: str) -> str:
+    with closing(_iterparse(package, member, events=("start",))) as events:
+        for _, elem in events:
+            if elem.tag == _P + "cSld":
+                return elem.get("name", "")
+    return ""
+
+
+def _slide_parts(package: zipfile.ZipFile) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """(slide, notes, layout) zip members of every slide, in presentation order"""
+    presentation = _related(_part_rels(package, ""), _RT_OFFICE_DOCUMENT)
+    if presentation is None:
+        raise ValueError("Not a PowerPoint package: no main document part")
+    presentation_rels = _part_rels(package, presentation)
+
+    parts = []
+    for _, elem in _iterparse(package, presentation):
+        if elem.tag == _P + "sldId":
+            member = presentation_rels[elem.get("{%s}id" % _NS["r"])][1]
+            rels = _part_rels(package, member)
+            parts.append((member, _related(rels, _RT_NOTES_SLIDE), _related(rels, _RT_SLIDE_LAYOUT)))
+    return parts
+
+
+def _parse_ooxml(source) -> List[Dict]:
+    """parse_deck's slide dicts read straight from the package XML"""
+    with zipfile.ZipFile(source) as package:
+        layout_names: Dict[str, str] = {}
+        slides = []
+        for idx, (member, notes_member, layout_member) in enumerate(_slide_parts(package)):
+            title, content, shape_count = _ooxml_slide_shapes(package, member)
+
+            if layout_member is not None and layout_member not in layout_names:
+                layout_names[layout_member] = _ooxml_layout_name(package, layout_member)
+
+            slides.append({
+                "number": idx + 1,
+                "title": title,
+                "content": content,
+                "notes": _ooxml_notes(package, notes_member) if notes_member else "",
+                "shape_count": shape_count,
+                "layout_name": layout_names.get(layout_member, "")
+            })
+
+    return slides
+
+
+def get_deck_summary(slides: List[Dict]) -> Dict:
+    """Get high-level deck statistics (see utils.deck_analytics for the full set)"""
+    return analyze_slides(slides)["summary"]
+
 def classify_deck_type(slides: List[Dict]) -> str:
-    """Classify the type of pitch deck based on content"""
-    if not slides:
-        return "Unknown"
-    
-    all_text = " ".join([s['title'] + " " + s['content'] for s in slides]).lower()
-    
-    ai_ml_keywords = ['machine learning', 'deep learning', 'neural network', 'ai', 
-                      'model', 'data', 'algorithm', 'prediction']
-    
-    keyword_count = sum(1 for keyword in ai_ml_keywords if keyword in all_text)
-    
-    if keyword_count >= 5:
-        return "AI/ML Platform"
-    elif keyword_count >= 3:
-        return "Data Science Product"
-    elif any(word in all_text for word in ['analytics', 'insights', 'dashboard']):
-        return "Analytics Platform"
-    else:
-        return "Technology Company"
\ No newline at end of file
+    """Classify the type of pitch deck based on content (configurable taxonomy in utils.deck_analytics)"""
+    return analyze_slides(slides)["deck_type"]
@@ -0,0 +1,100 @@
+"""
+Server-side storage for parsed decks
+
+/upload parses a deck once and stores it under a deck ID; /analyze and
+friends can then reference the deck by ID instead of re-sending every slide.
+Decks live in an in-process TTL/LRU cache by default, or in SQLite when
+DECK_STORE_BACKEND=sqlite (useful with several uvicorn workers).
+
+Each deck record also keeps the slide analyses run against it (keyed by
+utils.deck_diff.analysis_key) and the deck_id of the revision it replaced,
+so a re-uploaded deck only re-analyzes the slides that changed.
+
+Environment:
+    DECK_STORE_BACKEND   memory (default) | sqlite
+    DECK_STORE_PATH      SQLite file (default: deck_store.sqlite3)
+    DECK_STORE_TTL       Seconds a deck is kept after upload (default: 86400)
+    DECK_STORE_MAX_DECKS Maximum number of decks kept (default: 256)
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from utils.ttl_cache import TTLCache, SQLiteTTLCache
+
+
+class DeckStore:
+    """Stores parsed decks by ID on top of a TTLCache-compatible backend"""
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else TTLCache(maxsize=256, ttl=86400)
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        slides: List[Dict],
+        summary: Dict,
+        deck_type: str,
+        filename: Optional[str] = None,
+        deck_context: Optional[Dict] = None,
+        previous_deck_id: Optional[str] = None,
+        analyses: Optional[Dict[str, Dict]] = None
+    ) -> str:
+        """Store a parsed deck (and its prebuilt deck context) and return its new deck ID"""
+        deck_id = uuid.uuid4().hex
+        self.backend.set(deck_id, {
+            "deck_id": deck_id,
+            "filename": filename,
+            "slides": slides,
+            "summary": summary,
+            "deck_type": deck_type,
+            "deck_context": deck_context,
+            "previous_deck_id": previous_deck_id,
+            "analyses": analyses or {},
+            "created_at": time.time()
+        })
+        return deck_id
+
+    def get(self, deck_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored deck, or None if unknown or expired"""
+        return self.backend.get(deck_id)
+
+    def add_analyses(self, deck_id: str, analyses: Dict[str, Dict]) -> None:
+        """Merge slide analyses into a stored deck (no-op if it expired)"""
+        if not analyses:
+            return
+        with self._lock:
+            deck = self.backend.get(deck_id)
+            if deck is None:
+                return
+            deck.setdefault("analyses", {}).update(analyses)
+            self.backend.set(deck_id, deck)
+
+    def delete(self, deck_id: str) -> bool:
+        return self.backend.delete(deck_id)
+
+
+_store: Optional[DeckStore] = None
+_store_lock = threading.Lock()
+
+
+def get_deck_store() -> DeckStore:
+    """Process-wide DeckStore configured from the environment"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            ttl = float(os.getenv("DECK_STORE_TTL", 86400))
+            max_decks = int(os.getenv("DECK_STORE_MAX_DECKS", 256))
+            if os.getenv("DECK_STORE_BACKEND", "memory").lower() == "sqlite":
+                backend = SQLiteTTLCache(
+                    os.getenv("DECK_STORE_PATH", "deck_store.sqlite3"),
+                    maxsize=max_decks,
+                    ttl=ttl,
+                    table="decks"
+                )
+            else:
+                backend = TTLCache(maxsize=max_decks, ttl=ttl)
+            _store = DeckStore(backend)
+        return _store
@@ -0,0 +1,330 @@
+"""
+Bulk offline deck ingestion: parse a directory of .pptx files on every core
+
+Walks a directory for .pptx files and parses them in a process pool
+(parse_deck, then deck_analytics for the summary, statistics and deck type).
+Results are appended to a JSONL file, one deck per line, so nothing goes
+through the HTTP API.
+
+- Resumable: each finished file is recorded in a manifest (JSONL, next to
+  the output) under the sha256 of its bytes; files whose content was
+  already ingested are skipped on the next run, even if renamed. Failed
+  files are retried.
+- Error isolation: a file that fails to parse becomes an error record; a
+  file that crashes its worker process is retried on its own and recorded
+  as an error, and the rest of the run continues.
+- Columnar output: --parquet also writes the results as a Parquet table
+  (needs pyarrow).
+
+Usage (from pitch-deck-debater/):
+    python -m utils.ingest decks/ --output decks.jsonl
+    python -m utils.ingest decks/ --output decks.jsonl --parquet decks.parquet --workers 8 --backend ooxml
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from utils.deck_analytics import analyze_slides
+from utils.deck_parser import parse_deck
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Content hashes already ingested; set in each worker by _init_worker
+_done_hashes: Set[str] = set()
+
+
+def find_decks(root: str, pattern: str = "*.pptx") -> List[str]:
+    """Deck files under ``root`` in a stable order (Office lock files skipped)"""
+    found = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.startswith("~$") or not fnmatch.fnmatch(name.lower(), pattern.lower()):
+                continue
+            found.append(os.path.join(directory, name))
+    return found
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    """Latest manifest entry per content hash (missing file: empty)"""
+    entries: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            entries[entry["file_hash"]] = entry
+    return entries
+
+
+def _init_worker(done_hashes: Set[str]) -> None:
+    global _done_hashes
+    _done_hashes = done_hashes
+
+
+def ingest_file(path: str, root: str, backend: Optional[str], include_slides: bool) -> Dict[str, Any]:
+    """Parse one deck into an output record; never raises"""
+    record: Dict[str, Any] = {"path": os.path.relpath(path, root)}
+    try:
+        record["file_hash"] = file_hash(path)
+        record["size_bytes"] = os.path.getsize(path)
+        if record["file_hash"] in _done_hashes:
+            record["status"] = "skipped"
+            return record
+
+        start = time.perf_counter()
+        # One process per file already; no nested parse pool
+        slides = parse_deck(path, workers=1, backend=backend)
+        analytics = analyze_slides(slides)
+        record.update(
+            status="ok",
+            deck_type=analytics["deck_type"],
+            summary=analytics["summary"],
+            analytics={k: analytics[k] for k in ("stats", "keyword_hits", "category_matches")},
+            parse_seconds=round(time.perf_counter() - start, 4),
+        )
+        if include_slides:
+            record["slides"] = slides
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    return record
+
+
+def _run_pool(
+    paths: List[str],
+    workers: int,
+    args: tuple,
+    done_hashes: Set[str],
+    on_record: Callable[[Dict[str, Any]], None]
+) -> List[str]:
+    """Run ``paths`` through a pool; returns the ones left unfinished if a worker died"""
+    finished: Set[str] = set()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(done_hashes,)) as pool:
+            futures = {pool.submit(ingest_file, path, *args): path for path in paths}
+            for future in as_completed(futures):
+                on_record(future.result())
+                finished.add(futures[future])
+    except BrokenProcessPool:
+        pass
+    return [path for path in paths if path not in finished]
+
+
+def _run_isolated(
+    paths: List[str],
+    args: tuple,
+    done_hashes: Set[str],
+    on_record: Callable[[Dict[str, Any]], None]
+) -> None:
+    """One file at a time, so a file that kills its worker is identified and skipped"""
+    remaining = list(paths)
+    while remaining:
+        with ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(done_hashes,)) as pool:
+            while remaining:
+                path = remaining.pop(0)
+                try:
+                    on_record(pool.submit(ingest_file, path, *args).result())
+                except BrokenProcessPool:
+                    on_record({
+                        "path": os.path.relpath(path, args[0]),
+                        "file_hash": file_hash(path),
+                        "status": "error",
+                        "error": "worker process crashed",
+                    })
+                    break
+
+
+class Progress:
+    """Throttled one-line progress report on stderr"""
+
+    def __init__(self, total: int, enabled: bool = True, interval: float = 0.5):
+        self.total = total
+        self.enabled = enabled
+        self.interval = interval
+        self.counts = {"ok": 0, "skipped": 0, "error": 0}
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, status: str) -> None:
+        self.counts[status] = self.counts.get(status, 0) + 1
+        now = time.perf_counter()
+        if self.enabled and now - self._last >= self.interval:
+            self._last = now
+            sys.stderr.write(f"\r{self.line()}")
+            sys.stderr.flush()
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        return (
+            f"[{self.done}/{self.total}] ok={self.counts['ok']} skipped={self.counts['skipped']} "
+            f"errors={self.counts['error']} {rate:.1f} files/s"
+        )
+
+    def finish(self) -> None:
+        if self.enabled:
+            sys.stderr.write(f"\r{self.line()}\n")
+            sys.stderr.flush()
+
+
+def ingest(
+    root: str,
+    output: str,
+    manifest: Optional[str] = None,
+    workers: Optional[int] = None,
+    backend: Optional[str] = None,
+    include_slides: bool = True,
+    pattern: str = "*.pptx",
+    progress: bool = True
+) -> Dict[str, Any]:
+    """
+    Ingest every deck under ``root`` into ``output`` (JSONL, appended)
+
+    Returns:
+        Counts per status, the failed files and the elapsed time
+    """
+    manifest = manifest or output + ".manifest.jsonl"
+    workers = max(1, workers or os.cpu_count() or 1)
+    done_hashes = {h for h, entry in load_manifest(manifest).items() if entry.get("status") == "ok"}
+    paths = find_decks(root, pattern)
+    report = Progress(len(paths), enabled=progress)
+    failed: List[Dict[str, str]] = []
+    written: Set[str] = set()
+
+    with open(output, "a", encoding="utf-8") as out, open(manifest, "a", encoding="utf-8") as log:
+        def on_record(record: Dict[str, Any]) -> None:
+            status = record["status"]
+            content_hash = record.get("file_hash")
+            if status == "ok" and content_hash in written:
+                # Same bytes under another name earlier in this run
+                status = record["status"] = "skipped"
+            if status != "skipped":
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                if content_hash:
+                    log.write(json.dumps({
+                        "file_hash": content_hash,
+                        "path": record["path"],
+                        "status": status,
+                        "error": record.get("error"),
+                        "finished_at": time.time(),
+                    }) + "\n")
+                    log.flush()
+            if status == "ok":
+                written.add(content_hash)
+            elif status == "error":
+                failed.append({"path": record["path"], "error": record["error"]})
+            report.update(status)
+
+        args = (root, backend, include_slides)
+        crashed = _run_pool(paths, workers, args, done_hashes, on_record)
+        if crashed:
+            _run_isolated(crashed, args, done_hashes | written, on_record)
+
+    report.finish()
+    return {
+        "files": len(paths),
+        **report.counts,
+        "failed": failed,
+        "elapsed_s": round(time.perf_counter() - report.start, 3),
+        "output": output,
+        "manifest": manifest,
+    }
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def write_parquet(jsonl_path: str, parquet_path: str) -> int:
+    """
+    Columnar copy of the ingested decks: the latest ok record per content
+    hash, with summary/analytics fields flattened into columns
+
+    Returns the number of rows written. Needs pandas and pyarrow.
+    """
+    import pandas as pd
+
+    latest: Dict[str, Dict[str, Any]] = {}
+    for record in iter_records(jsonl_path):
+        if record.get("status") == "ok":
+            latest[record["file_hash"]] = record
+    frame = pd.json_normalize(list(latest.values()), max_level=1)
+    frame.to_parquet(parquet_path, index=False)
+    return len(frame)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse a directory of .pptx decks in parallel into JSONL")
+    parser.add_argument("directory", help="Directory searched recursively for decks")
+    parser.add_argument("--output", default="decks.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--manifest", help="Resume manifest (default: <output>.manifest.jsonl)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--backend", choices=("pptx", "ooxml"), help="parse_deck backend (default: DECK_PARSE_BACKEND)")
+    parser.add_argument("--pattern", default="*.pptx", help="File name pattern")
+    parser.add_argument("--no-slides", action="store_true", help="Leave per-slide content out of the records")
+    parser.add_argument("--parquet", help="Also write the ingested decks as a Parquet table here")
+    parser.add_argument("--quiet", action="store_true", help="No progress output")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+
+    result = ingest(
+        args.directory,
+        args.output,
+        manifest=args.manifest,
+        workers=args.workers,
+        backend=args.backend,
+        include_slides=not args.no_slides,
+        pattern=args.pattern,
+        progress=not args.quiet
+    )
+
+    if args.parquet:
+        try:
+            result["parquet_rows"] = write_parquet(args.output, args.parquet)
+            result["parquet"] = args.parquet
+        except ImportError as e:
+            print(f"Parquet output needs pandas and pyarrow: {e}", file=sys.stderr)
+            result["parquet_error"] = str(e)
+
+    print(json.dumps(result, indent=2))
+    return 1 if result["failed"] or "parquet_error" in result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
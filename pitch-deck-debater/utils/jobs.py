@@ -0,0 +1,381 @@
+"""
+Background jobs for long-running analyses and report/deck generation
+
+POST /jobs returns a job ID immediately; the work runs on a bounded
+in-process worker pool, GET /jobs/{id} polls status and partial results,
+and DELETE /jobs/{id} cancels it. Async jobs (slide and deck analysis) are
+cancelled at their next await, which also cancels their in-flight model
+calls; sync jobs (report/deck generation) run in a worker thread, where
+cancellation stops the job from being reported but the thread finishes its
+current call.
+
+Job records are persisted in SQLite by default, so finished results survive
+a restart; JOB_STORE_BACKEND=memory keeps them in an in-process TTL/LRU
+cache instead (the utils.deck_store backends). Binary results (PDF/PPTX)
+are kept next to the record and served by GET /jobs/{id}/result.
+Queued and running jobs are kept apart from finished ones and are never
+evicted; once JOB_MAX_ACTIVE jobs are queued or running, new submissions
+are rejected (503) until some finish. Jobs still queued or running when
+the process stops are not resumed: get_job_manager marks persisted active
+jobs whose process is gone as failed ("interrupted by restart"). Jobs owned
+by a live process (another server worker sharing the SQLite file) or by
+another host are left alone.
+
+Several server workers can share the SQLite store. A DELETE that reaches a
+worker other than the one running the job only marks the record cancelled.
+Each worker checks the stored status of its own running jobs every
+JOB_CANCEL_POLL_INTERVAL seconds and cancels those marked cancelled
+elsewhere. With the memory backend each worker has its own jobs, so the
+server must run as a single worker.
+
+Environment:
+    JOB_WORKERS        Jobs running at once (default: 4)
+    JOB_MAX_ACTIVE     Jobs queued or running at once before submissions are rejected (default: 1024)
+    JOB_STORE_BACKEND  sqlite (default) | memory
+    JOB_STORE_PATH     SQLite file (default: job_store.sqlite3)
+    JOB_STORE_TTL      Seconds a finished job is kept (default: 86400)
+    JOB_STORE_MAX_JOBS Maximum number of finished jobs kept (default: 1024)
+    JOB_PARTIAL_INTERVAL      Minimum seconds between partial-result writes per job (default: 0.5)
+    JOB_CANCEL_POLL_INTERVAL  Seconds between checks for jobs cancelled by another worker (default: 1)
+"""
+import asyncio
+import base64
+import copy
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from utils.metrics import QUEUE_WAIT_SECONDS, record_error
+from utils.ttl_cache import TTLCache, SQLiteTTLCache
+
+ACTIVE_STATES = ("queued", "running")
+FINAL_STATES = ("succeeded", "failed", "cancelled")
+INTERRUPTED_ERROR = "interrupted by restart"
+
+
+def _owner() -> Dict[str, Any]:
+    """The process running a job (jobs only ever run where they were submitted)"""
+    return {"host": socket.gethostname(), "pid": os.getpid()}
+
+
+def _owner_gone(owner: Optional[Dict[str, Any]]) -> bool:
+    """Whether a job's process has stopped; unknown for other hosts (False)"""
+    if not owner or owner.get("host") != socket.gethostname():
+        return not owner
+    if owner.get("pid") == os.getpid():
+        # A restarted server reusing the pid (e.g. PID 1 in a container)
+        return True
+    try:
+        os.kill(owner["pid"], 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+class JobFile:
+    """Binary job result (e.g. a generated PDF or PPTX)"""
+
+    def __init__(self, content: bytes, filename: str, media_type: str):
+        self.content = content
+        self.filename = filename
+        self.media_type = media_type
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when the active job store is full"""
+
+
+class JobStore:
+    """
+    Stores job records (and binary results) on TTLCache-compatible backends
+
+    Queued and running jobs are kept in ``active``, which never expires and
+    is never allowed to fill up (JobManager stops admitting jobs first), so
+    an active job cannot be evicted. Finished jobs move to ``backend``,
+    where TTL and LRU eviction apply.
+    """
+
+    def __init__(self, backend=None, files=None, active=None):
+        self.backend = backend if backend is not None else TTLCache(maxsize=1024, ttl=86400)
+        self.files = files if files is not None else TTLCache(maxsize=1024, ttl=86400)
+        self.active = active if active is not None else TTLCache(maxsize=1024, ttl=None)
+
+    def put(self, job: Dict[str, Any]) -> None:
+        job["updated_at"] = time.time()
+        if job["status"] in ACTIVE_STATES:
+            self.active.set(job["job_id"], job)
+        else:
+            self.backend.set(job["job_id"], job)
+            self.active.delete(job["job_id"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        # A finished record wins over a stale active one, e.g. a job cancelled
+        # by another worker while its owner was still writing partial results
+        job = self.backend.get(job_id)
+        return job if job is not None else self.active.get(job_id)
+
+    def discard_active(self, job_id: str) -> None:
+        self.active.delete(job_id)
+
+    def active_count(self) -> int:
+        return len(self.active)
+
+    def put_file(self, job_id: str, result: JobFile) -> None:
+        self.files.set(job_id, {
+            "filename": result.filename,
+            "media_type": result.media_type,
+            "content": base64.b64encode(result.content).decode("ascii"),
+        })
+
+    def get_file(self, job_id: str) -> Optional[JobFile]:
+        stored = self.files.get(job_id)
+        if stored is None:
+            return None
+        return JobFile(base64.b64decode(stored["content"]), stored["filename"], stored["media_type"])
+
+    def delete(self, job_id: str) -> bool:
+        self.files.delete(job_id)
+        active = self.active.delete(job_id)
+        return self.backend.delete(job_id) or active
+
+
+class JobContext:
+    """
+    Handed to a job runner so it can publish partial results while it works
+
+    Updates are merged in memory and written to the store at most every
+    ``manager.partial_interval`` seconds, in a worker thread, so a deck
+    analysis publishing every finished slide neither rewrites the whole
+    record per slide nor blocks the event loop on SQLite.
+    """
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+        self._pending: Dict[str, Any] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writing: Optional[asyncio.Future] = None
+        self._last_write = 0.0
+
+    def update(self, **partial: Any) -> None:
+        """Merge ``partial`` into the job's partial results (persisted shortly)"""
+        self._pending.update(partial)
+        if self._timer is not None:
+            return
+        delay = self._last_write + self.manager.partial_interval - time.monotonic()
+        self._timer = asyncio.get_running_loop().call_later(max(0.0, delay), self._flush)
+
+    def _flush(self) -> None:
+        self._timer = None
+        if not self._pending:
+            return
+        if self._writing is not None and not self._writing.done():
+            # One write at a time; try again once this one has landed
+            self._timer = asyncio.get_running_loop().call_later(self.manager.partial_interval, self._flush)
+            return
+        # Snapshot the containers: runners keep mutating them (e.g. the dict
+        # of finished slides) while the thread serializes the record
+        partial = {key: copy.copy(value) for key, value in self._pending.items()}
+        self._pending = {}
+        self._last_write = time.monotonic()
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, partial))
+
+    def _write(self, partial: Dict[str, Any]) -> None:
+        job = self.manager.store.get(self.job_id)
+        if job is None or job["status"] != "running":
+            return
+        job["partial"].update(partial)
+        self.manager.store.put(job)
+
+    async def close(self) -> None:
+        """Write any pending partial results and wait for writes in flight"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._writing is not None:
+            await asyncio.shield(self._writing)
+        if self._pending:
+            partial, self._pending = self._pending, {}
+            await asyncio.to_thread(self._write, partial)
+
+
+Runner = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobManager:
+    """Runs submitted jobs on a bounded pool and tracks them in a JobStore"""
+
+    def __init__(self, store: Optional[JobStore] = None, max_workers: Optional[int] = None):
+        self.store = store if store is not None else JobStore()
+        self.max_workers = max(1, int(max_workers or os.getenv("JOB_WORKERS", 4)))
+        # Admission limit: the active store must never need to evict
+        self.max_active = self.store.active.maxsize
+        self.cancel_poll_interval = float(os.getenv("JOB_CANCEL_POLL_INTERVAL", 1))
+        self.partial_interval = float(os.getenv("JOB_PARTIAL_INTERVAL", 0.5))
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._watcher: Optional[asyncio.Task] = None
+
+    def submit(self, kind: str, params: Dict[str, Any], runner: Runner) -> Dict[str, Any]:
+        """
+        Queue a job; must be called from the server's event loop
+
+        Args:
+            kind: Job kind (analyze, analyze_deck, report, deck)
+            params: The request that created the job (echoed back on GET)
+            runner: Coroutine function doing the work; returns a JSON-able
+                result or a JobFile
+
+        Raises:
+            JobQueueFull: ``max_active`` jobs are already queued or running
+        """
+        if self.store.active_count() >= self.max_active:
+            raise JobQueueFull(f"{self.max_active} jobs are already queued or running")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "params": params,
+            "partial": {},
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "owner": _owner(),
+        }
+        self.store.put(job)
+        self._tasks[job["job_id"]] = asyncio.ensure_future(self._run(job["job_id"], kind, runner))
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.ensure_future(self._watch_cancellations())
+        return job
+
+    async def _run(self, job_id: str, kind: str, runner: Runner) -> None:
+        try:
+            async with self._slots:
+                job = self.store.get(job_id)
+                if job is None or job["status"] != "queued":
+                    return
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                self.store.put(job)
+                QUEUE_WAIT_SECONDS.observe(job["started_at"] - job["created_at"], queue="jobs")
+
+                ctx = JobContext(self, job_id)
+                try:
+                    result = await runner(ctx)
+                finally:
+                    # Partial writes must land before the final record
+                    await ctx.close()
+                self._finish(job_id, "succeeded", result=result)
+        except asyncio.CancelledError:
+            self._finish(job_id, "cancelled")
+        except Exception as e:
+            record_error("jobs", e, phase=kind)
+            self._finish(job_id, "failed", error=str(e))
+        finally:
+            self._tasks.pop(job_id, None)
+            # Whatever happened, this job is no longer queued or running here
+            self.store.discard_active(job_id)
+
+    def _cancelled_elsewhere(self, job_ids: Iterable[str]) -> List[str]:
+        """Jobs running here whose stored record another worker has cancelled"""
+        cancelled: List[str] = []
+        for job_id in job_ids:
+            job = self.store.get(job_id)
+            if job is not None and job["status"] == "cancelled":
+                cancelled.append(job_id)
+        return cancelled
+
+    async def _watch_cancellations(self) -> None:
+        """Cancel local tasks of jobs cancelled through another worker; stops when idle"""
+        while self._tasks:
+            await asyncio.sleep(self.cancel_poll_interval)
+            for job_id in await asyncio.to_thread(self._cancelled_elsewhere, list(self._tasks)):
+                task = self._tasks.get(job_id)
+                if task is not None:
+                    task.cancel()
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINAL_STATES:
+            return
+        if isinstance(result, JobFile):
+            self.store.put_file(job_id, result)
+            result = {"filename": result.filename, "media_type": result.media_type, "size": len(result.content)}
+        job.update(status=status, result=result, error=error, finished_at=time.time())
+        self.store.put(job)
+
+    def fail_interrupted(self) -> int:
+        """
+        Mark persisted queued/running jobs whose process is gone as failed
+
+        Called once at startup; returns the number of jobs marked.
+        """
+        interrupted = 0
+        for job in self.store.active.values():
+            if job["job_id"] not in self._tasks and _owner_gone(job.get("owner")):
+                self._finish(job["job_id"], "failed", error=INTERRUPTED_ERROR)
+                interrupted += 1
+        return interrupted
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def get_file(self, job_id: str) -> Optional[JobFile]:
+        return self.store.get_file(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued or running job; returns the updated record (None if unknown)
+
+        A job running in another worker is marked cancelled here and stopped
+        by that worker's next cancellation check.
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        if job["status"] in ACTIVE_STATES:
+            task = self._tasks.get(job_id)
+            if task is not None:
+                task.cancel()
+            self._finish(job_id, "cancelled")
+        return self.store.get(job_id)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide JobManager configured from the environment"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            ttl = float(os.getenv("JOB_STORE_TTL", 86400))
+            max_jobs = int(os.getenv("JOB_STORE_MAX_JOBS", 1024))
+            max_active = max(1, int(os.getenv("JOB_MAX_ACTIVE", 1024)))
+            if os.getenv("JOB_STORE_BACKEND", "sqlite").lower() == "sqlite":
+                path = os.getenv("JOB_STORE_PATH", "job_store.sqlite3")
+                store = JobStore(
+                    SQLiteTTLCache(path, maxsize=max_jobs, ttl=ttl, table="jobs"),
+                    SQLiteTTLCache(path, maxsize=max_jobs, ttl=ttl, table="job_files"),
+                    SQLiteTTLCache(path, maxsize=max_active, ttl=None, table="jobs_active")
+                )
+            else:
+                store = JobStore(
+                    TTLCache(maxsize=max_jobs, ttl=ttl),
+                    TTLCache(maxsize=max_jobs, ttl=ttl),
+                    TTLCache(maxsize=max_active, ttl=None)
+                )
+            _manager = JobManager(store)
+            _manager.fail_interrupted()
+        return _manager
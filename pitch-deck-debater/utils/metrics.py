@@ -0,0 +1,216 @@
+"""
+In-process metrics with Prometheus text exposition (served at /metrics)
+
+A small dependency-free registry of labelled counters and histograms. The
+debate engine, LLM gateway, deck parser, report/deck generators, TTS and
+job manager record into the process-wide REGISTRY:
+
+- pitchdeck_operation_seconds / _cpu_seconds   wall vs CPU time of local work
+                                               (parse_deck, generators, synth_voice)
+- pitchdeck_phase_seconds                      wall time per debate phase
+- pitchdeck_phase_llm_seconds                  time spent waiting on the model,
+                                               per phase/persona/model
+- pitchdeck_llm_request_seconds                per attempt, per model and outcome
+- pitchdeck_queue_wait_seconds                 rate limiter, in-flight slots, job queue
+- pitchdeck_llm_tokens_total / pitchdeck_phase_tokens_total
+- pitchdeck_errors_total                       by component, phase, persona, model
+
+Wall minus LLM time per phase is the time spent in our own code.
+"""
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # bucket counts..., sum, count
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(count)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    """Named metrics rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        lines.append("# HELP pitchdeck_process_cpu_seconds Total CPU time of this process")
+        lines.append("# TYPE pitchdeck_process_cpu_seconds gauge")
+        lines.append(f"pitchdeck_process_cpu_seconds {_format_value(time.process_time())}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+OPERATION_SECONDS = REGISTRY.histogram(
+    "pitchdeck_operation_seconds", "Wall time of local operations", ["operation"])
+OPERATION_CPU_SECONDS = REGISTRY.histogram(
+    "pitchdeck_operation_cpu_seconds", "CPU time of local operations (calling thread)", ["operation"])
+PHASE_SECONDS = REGISTRY.histogram(
+    "pitchdeck_phase_seconds", "Wall time of debate phases", ["phase"])
+PHASE_LLM_SECONDS = REGISTRY.histogram(
+    "pitchdeck_phase_llm_seconds", "Time debate phases spend waiting on the model", ["phase", "persona", "model"])
+PHASE_TOKENS = REGISTRY.counter(
+    "pitchdeck_phase_tokens_total", "Tokens by debate phase and persona", ["phase", "persona", "model", "kind"])
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "pitchdeck_llm_request_seconds", "Duration of each model call attempt", ["model", "outcome"])
+LLM_TOKENS = REGISTRY.counter(
+    "pitchdeck_llm_tokens_total", "Tokens by model across every call site", ["model", "kind"])
+LLM_RETRIES = REGISTRY.counter(
+    "pitchdeck_llm_retries_total", "Model call retries", ["model", "error"])
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "pitchdeck_queue_wait_seconds", "Time spent waiting for a slot before work starts", ["queue"])
+ERRORS = REGISTRY.counter(
+    "pitchdeck_errors_total", "Errors by component", ["component", "phase", "persona", "model", "error"])
+
+
+def record_error(component: str, error: BaseException, phase: str = "", persona: str = "", model: str = "") -> None:
+    ERRORS.inc(component=component, phase=phase, persona=persona, model=model, error=type(error).__name__)
+
+
+def timed(operation: str) -> Callable:
+    """
+    Decorator recording wall time, CPU time and errors of a function
+
+    CPU time is the calling thread's, so for coroutines only wall time is
+    meaningful; it is still recorded for both.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start, cpu_start = time.perf_counter(), time.thread_time()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    record_error(operation, e)
+                    raise
+                finally:
+                    OPERATION_SECONDS.observe(time.perf_counter() - start, operation=operation)
+                    OPERATION_CPU_SECONDS.observe(time.thread_time() - cpu_start, operation=operation)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start, cpu_start = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                record_error(operation, e)
+                raise
+            finally:
+                OPERATION_SECONDS.observe(time.perf_counter() - start, operation=operation)
+                OPERATION_CPU_SECONDS.observe(time.thread_time() - cpu_start, operation=operation)
+        return wrapper
+
+    return decorator
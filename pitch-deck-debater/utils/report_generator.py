@@ -6,22 +6,27 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
 from reportlab.lib import colors
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import io
 from datetime import datetime
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from agents.coordinator import DebateCoordinator
+from utils.metrics import timed
 
 
 class ReportGenerator:
     """Generate PDF reports of debate results"""
 
-    def __init__(self):
+    def __init__(self, coordinator: Optional[DebateCoordinator] = None):
+        """
+        Args:
+            coordinator: Shared coordinator (defaults to one on the pooled client)
+        """
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
-        self.coordinator = DebateCoordinator()
+        self.coordinator = coordinator or DebateCoordinator()
 
     def _setup_custom_styles(self):
         """Setup custom paragraph styles"""
@@ -63,6 +68,7 @@ class ReportGenerator:
             leftIndent=20
         ))
 
+    @timed("report_generate")
     def generate(self, debate_results: Dict[str, Any]) -> bytes:
         """
         Generate PDF report from debate results
@@ -0,0 +1,155 @@
+"""
+Bounded key/value caches with per-entry expiry
+
+TTLCache keeps entries in process memory with LRU eviction; SQLiteTTLCache
+offers the same interface backed by a SQLite file (values stored as JSON) so
+entries survive restarts and can be shared by several worker processes.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = 3600):
+        """
+        Args:
+            maxsize: Maximum number of entries; least recently used go first
+            ttl: Seconds an entry stays valid (None = never expires)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def values(self) -> List[Any]:
+        """Unexpired values (without refreshing their LRU position)"""
+        now = time.time()
+        with self._lock:
+            return [value for value, expires_at in self._data.values() if expires_at is None or expires_at > now]
+
+    def __contains__(self, key: str) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SQLiteTTLCache:
+    """TTLCache-compatible cache persisted to SQLite; values must be JSON-serializable"""
+
+    def __init__(self, path: str, maxsize: int = 1024, ttl: Optional[float] = 3600, table: str = "cache"):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            maxsize: Maximum number of rows; least recently used go first
+            ttl: Seconds an entry stays valid (None = never expires)
+            table: Table name, so several caches can share one file
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return default
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now)
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,)
+            )
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def values(self) -> List[Any]:
+        """Unexpired values (without refreshing their LRU position)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT value FROM {self.table} WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+            ).fetchall()
+        return [json.loads(value) for (value,) in rows]
+
+    def __contains__(self, key: str) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
@@ -4,6 +4,8 @@ import hashlib
 from pathlib import Path
 import edge_tts
 
+from utils.metrics import timed
+
 AUDIO_DIR = Path("audio")
 AUDIO_DIR.mkdir(exist_ok=True)
 
@@ -29,6 +31,7 @@ async def _synth_async(text: str, voice: str, out_path: Path, rate: str, volume:
     communicate = edge_tts.Communicate(text=text, voice=voice, rate=rate, volume=volume)
     await communicate.save(str(out_path))
 
+@timed("synth_voice")
 def synth_voice(persona_id: str, voice: str, text: str, rate: str = "+0%", volume: str = "+0%") -> str:
     """
     Generate full speech for the provided text and return the .mp3 path.
@@ -60,6 +63,7 @@ def list_voices() -> list:
         return await edge_tts.list_voices()
     return asyncio.run(_list())
 
+@timed("generate_audio_edge")
 async def generate_audio_edge(text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> bytes:
     """
     Generate audio and return as bytes for API responses.
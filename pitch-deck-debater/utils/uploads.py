@@ -0,0 +1,112 @@
+"""
+Size-bounded deck uploads
+
+Starlette already receives multipart file parts in chunks into a
+SpooledTemporaryFile (kept in memory up to 1MB, on disk beyond that), so an
+upload never has to be held in memory as a whole. This module adds the
+missing bound: UploadLimitMiddleware rejects uploads larger than
+UPLOAD_MAX_BYTES with 413, up front from Content-Length when the client
+sends one and otherwise as soon as the streamed body crosses the limit, and
+spooled_upload() hands the spooled file to parse_deck without copying it.
+
+Environment:
+    UPLOAD_MAX_BYTES  Largest accepted upload request in bytes (default: 268435456, 256MB)
+"""
+import json
+import os
+from typing import BinaryIO, Iterable, Optional
+
+from fastapi import HTTPException, UploadFile
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("UPLOAD_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+
+def _too_large_detail(limit: int) -> str:
+    return f"Upload exceeds the limit of {limit} bytes"
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware capping the request body size on upload routes
+
+    Requests whose Content-Length is over the limit are answered with 413
+    before any of the body is read. Bodies without a (truthful)
+    Content-Length are counted while they stream in; once the limit is
+    crossed the rest of the body is not read and the response becomes 413.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = ("/upload",), max_bytes: Optional[int] = None):
+        self.app = app
+        self.paths = tuple(paths)
+        self.max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await self._reject(send, limit)
+                return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if exceeded:
+                # The app saw a truncated body; whatever it answers, the answer is 413
+                return
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._reject(send, limit)
+
+    @staticmethod
+    async def _reject(send, limit: int) -> None:
+        body = json.dumps({"detail": _too_large_detail(limit)}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def spooled_upload(file: UploadFile, max_bytes: Optional[int] = None) -> BinaryIO:
+    """
+    Return the upload's spooled file, rewound, for parse_deck (no copy)
+
+    Raises HTTPException(413) when the part itself is over the limit, which
+    the middleware normally catches first.
+    """
+    limit = max_bytes if max_bytes is not None else max_upload_bytes()
+    if file.size is not None and file.size > limit:
+        raise HTTPException(status_code=413, detail=_too_large_detail(limit))
+    file.file.seek(0)
+    return file.file
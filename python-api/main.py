@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -19,9 +20,10 @@ from agents.personas import (
     get_persona_image,
     get_persona_voice,
 )
-from agents.debate_engine import DebateEngine
-from utils.deck_parser import parse_deck, get_deck_summary, classify_deck_type
-from io import BytesIO
+from agents.debate_engine import AsyncDebateEngine
+from utils.deck_analytics import analyze_slides
+from utils.deck_parser import parse_deck
+from utils.uploads import UploadLimitMiddleware, spooled_upload
 from dotenv import load_dotenv
 
 
@@ -38,6 +40,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Reject oversized decks with 413 (UPLOAD_MAX_BYTES) before they are spooled
+app.add_middleware(UploadLimitMiddleware, paths=("/upload",))
 
 
 class AnalyzeRequest(BaseModel):
@@ -75,11 +79,10 @@ def personas() -> Dict[str, Any]:
 
 @app.post("/upload")
 async def upload(file: UploadFile = File(...)) -> Dict[str, Any]:
-    # Parse the incoming PPTX using existing helpers
-    data = await file.read()
-    slides = parse_deck(BytesIO(data))
-    summary = get_deck_summary(slides)
-    deck_type = classify_deck_type(slides)
+    # Parse the incoming PPTX straight from the spooled upload, off the event loop
+    slides = await asyncio.to_thread(parse_deck, spooled_upload(file))
+    analytics = analyze_slides(slides)
+    summary, deck_type = analytics["summary"], analytics["deck_type"]
     return {
         "deck_name": file.filename,
         "slides": slides,
@@ -89,23 +92,17 @@ async def upload(file: UploadFile = File(...)) -> Dict[str, Any]:
 
 
 @app.post("/analyze")
-def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
-    engine = DebateEngine()
+async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
+    engine = AsyncDebateEngine()
 
-    # Round 1: individual critiques
-    debate_round = engine.create_debate_round(req.slide, req.personas, 1)
-
-    # Round 2: collaborative debate
-    collab = engine.collaborative_debate_round(debate_round, req.deck_context)
-
-    # Round 3: synthesis
-    synthesis = engine.synthesize_feedback(debate_round, req.deck_context)
+    # Round 1 (individual critiques) feeds rounds 2 (collaborative debate)
+    # and 3 (synthesis), which run concurrently
+    analysis = await engine.analyze_slide(req.slide, req.personas, req.deck_context)
 
     return {
-        "debate_round": debate_round,
-        "collaborative_debate": collab,
-        "synthesis": synthesis,
+        **analysis,
         "cache_stats": engine.get_cache_efficiency(),
+        "usage": engine.get_usage(),
     }
 
 